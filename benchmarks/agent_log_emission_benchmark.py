@@ -0,0 +1,192 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from typing import Any
+from typing import Dict
+from typing import List
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+
+from neuro_san_web_client.agent_log_processor import AgentLogProcessor
+from neuro_san_web_client.wire_format import WIRE_FORMATS
+from neuro_san_web_client.wire_format import WireFormat
+
+
+class CountingSocketIO:
+    """
+    Stands in for the SocketIO server: serializes each event like the real server does,
+    and counts the frames and bytes instead of sending them.
+    """
+
+    def __init__(self):
+        self.frames: int = 0
+        self.bytes: int = 0
+        # The WebSocket frames, to compress them afterwards
+        self.payloads: List[bytes] = []
+        self.lock = threading.Lock()
+
+    def emit(self, event: str, data: Any, room: str = None):
+        if isinstance(data, bytes):
+            # Binary data goes in a frame of its own, after a text frame with a placeholder
+            payloads = [json.dumps([event, {"_placeholder": True, "num": 0}]).encode("utf-8"), data]
+        else:
+            payloads = [json.dumps([event, data]).encode("utf-8")]
+        with self.lock:
+            self.frames += len(payloads)
+            self.bytes += sum(len(payload) for payload in payloads)
+            self.payloads.extend(payloads)
+
+    @staticmethod
+    def sleep(seconds: float):
+        time.sleep(seconds)
+
+    @staticmethod
+    def start_background_task(target, *args, **kwargs) -> threading.Thread:
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+
+class AgentLogEmissionBenchmark:
+    """
+    Compares the number of Socket.IO frames, the bytes and the CPU time it takes to send the agent messages of a turn
+    to the UI, with one event per message versus batched events, and with each wire format.
+    The bytes are also given compressed with per-message deflate, as the WebSocket transport sends them
+    to the browsers that offer it.
+    """
+
+    def __init__(self):
+        self.args = None
+
+    @staticmethod
+    def create_messages(num_messages: int, origin_depth: int, text_length: int) -> List[Dict[str, Any]]:
+        """
+        :return: A turn worth of agent messages
+        """
+        # Varied text, for the compressed sizes to be realistic
+        words = ["network", "the", "customer", "outage", "agent", "check", "status", "of", "ticket", "router",
+                 "billing", "is", "and", "to", "escalate", "region", "latency", "plan", "upgrade", "report"]
+        generator = random.Random(42)
+        messages = []
+        for index in range(num_messages):
+            origin = [{"tool": f"agent_{depth}_{index % 7}", "instantiation_index": 1}
+                      for depth in range(origin_depth)]
+            text = ""
+            while len(text) < text_length:
+                text += generator.choice(words) + " "
+            messages.append({"text": text[:text_length], "origin": origin})
+        return messages
+
+    @staticmethod
+    def get_deflated_bytes(payloads: List[bytes]) -> int:
+        """
+        :param payloads: The WebSocket frames of a connection
+        :return: Their total size once compressed with per-message deflate, keeping the context between frames
+        """
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+        total = 0
+        for payload in payloads:
+            compressed = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            # The empty block ending each frame is not sent
+            total += len(compressed) - 4
+        return total
+
+    def run_scenario(self, messages: List[Dict[str, Any]], num_turns: int, max_batch_size: int,
+                     flush_interval_in_seconds: float, wire_format: str = 'text') -> Dict[str, Any]:
+        """
+        Sends the messages of num_turns turns through an AgentLogProcessor
+        :return: The frames per turn, bytes per turn and CPU time per turn
+        """
+        socketio = CountingSocketIO()
+        processor = AgentLogProcessor(socketio, "benchmark_sid", max_batch_size=max_batch_size,
+                                      flush_interval_in_seconds=flush_interval_in_seconds,
+                                      wire_format=WireFormat(wire_format))
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for _ in range(num_turns):
+            for message in messages:
+                processor.process_message(message, ChatMessageType.AGENT)
+            # The app flushes the buffered messages at the end of each turn
+            processor.flush()
+        cpu_time = time.process_time() - cpu_start
+        wall_time = time.perf_counter() - wall_start
+        deflate_cpu_start = time.process_time()
+        deflated_bytes = self.get_deflated_bytes(socketio.payloads)
+        deflate_cpu_time = time.process_time() - deflate_cpu_start
+        return {
+            "max_batch_size": max_batch_size,
+            "wire_format": wire_format,
+            "frames_per_turn": socketio.frames / num_turns,
+            "bytes_per_turn": socketio.bytes / num_turns,
+            "deflated_bytes_per_turn": deflated_bytes / num_turns,
+            "cpu_seconds_per_turn": cpu_time / num_turns,
+            "deflate_cpu_seconds_per_turn": deflate_cpu_time / num_turns,
+            "wall_seconds_per_turn": wall_time / num_turns,
+        }
+
+    def parse_args(self):
+        """
+        Parse command line arguments into member variables
+        """
+        arg_parser = argparse.ArgumentParser(
+            description="Compares per-message and batched agent_log emission, and the wire formats."
+        )
+        arg_parser.add_argument("--messages_per_turn", type=int, default=500,
+                                help="Number of agent messages in each turn")
+        arg_parser.add_argument("--turns", type=int, default=20,
+                                help="Number of turns to run for each scenario")
+        arg_parser.add_argument("--origin_depth", type=int, default=4,
+                                help="Number of agents in the origin chain of each message")
+        arg_parser.add_argument("--text_length", type=int, default=200,
+                                help="Number of characters in each message")
+        arg_parser.add_argument("--batch_size", type=int, default=32,
+                                help="Batch size of the batched scenario")
+        arg_parser.add_argument("--flush_interval", type=float, default=0.05,
+                                help="Flush interval of the batched scenario, in seconds")
+        arg_parser.add_argument("--wire_formats", type=str, default=",".join(WIRE_FORMATS),
+                                help="Comma-separated wire formats to compare with batched events")
+        arg_parser.add_argument("--output_file", type=str, default=None,
+                                help="Path to a .json file to write the results to, instead of stdout")
+        self.args = arg_parser.parse_args()
+
+    def main(self):
+        self.parse_args()
+        messages = self.create_messages(self.args.messages_per_turn, self.args.origin_depth, self.args.text_length)
+        results = {
+            "benchmark": "agent_log_emission",
+            "messages_per_turn": self.args.messages_per_turn,
+            "scenarios": {
+                # A batch size of 1 sends one event per message, like the unbatched path did
+                "per_message": self.run_scenario(messages, self.args.turns, 1, self.args.flush_interval),
+                "batched": self.run_scenario(messages, self.args.turns, self.args.batch_size,
+                                             self.args.flush_interval),
+            },
+            "wire_formats": {
+                wire_format: self.run_scenario(messages, self.args.turns, self.args.batch_size,
+                                               self.args.flush_interval, wire_format)
+                for wire_format in self.args.wire_formats.split(",")
+            }
+        }
+        output = json.dumps(results, indent=2)
+        if self.args.output_file:
+            with open(self.args.output_file, "w", encoding="utf-8") as file:
+                file.write(output)
+        print(output)
+
+
+if __name__ == '__main__':
+    AgentLogEmissionBenchmark().main()
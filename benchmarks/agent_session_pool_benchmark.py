@@ -0,0 +1,113 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import argparse
+import json
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+import requests
+
+from neuro_san_web_client.agent_session_pool import AgentSessionPool
+
+from benchmarks.load_benchmark import STUB_AGENT_NAME
+from benchmarks.load_benchmark import summarize
+from benchmarks.stub_neuro_san_server import StubNeuroSanServer
+
+
+class AgentSessionPoolBenchmark:
+    """
+    Measures what sharing the agent sessions saves: the time to get an agent session, new or pooled,
+    and the time and number of TCP connections of the requests made on a pooled session,
+    compared with a client keeping its connection alive.
+    """
+
+    def __init__(self):
+        self.args = None
+
+    def time_calls(self, call: Callable[[], Any]) -> Dict[str, Any]:
+        """
+        :param call: The function to time
+        :return: The p50, p95 and p99 of its duration over --calls calls, in seconds
+        """
+        durations = []
+        for _ in range(self.args.calls):
+            start = time.perf_counter()
+            call()
+            durations.append(time.perf_counter() - start)
+        return summarize(durations)
+
+    def count_connections(self, stub_server: StubNeuroSanServer, call: Callable[[], Any]) -> Dict[str, Any]:
+        """
+        :param stub_server: The stub neuro-san server the function calls
+        :param call: The function making one request to the stub server
+        :return: Its duration, and the number of TCP connections the stub server accepted per request
+        """
+        before = stub_server.num_connections
+        durations = self.time_calls(call)
+        return {
+            "request_seconds": durations,
+            "connections_per_request": (stub_server.num_connections - before) / self.args.calls,
+        }
+
+    def parse_args(self):
+        """
+        Parse command line arguments into member variables
+        """
+        arg_parser = argparse.ArgumentParser(
+            description="Measures the agent session pool against a stub neuro-san server."
+        )
+        arg_parser.add_argument("--calls", type=int, default=200,
+                                help="Number of times each operation is timed")
+        arg_parser.add_argument("--output_file", type=str, default=None,
+                                help="Path to a .json file to write the results to, instead of stdout")
+        self.args = arg_parser.parse_args()
+
+    def main(self):
+        self.parse_args()
+        stub_server = StubNeuroSanServer()
+        stub_server.start()
+        try:
+            host = "127.0.0.1"
+            port = stub_server.port
+
+            # max_size=0 evicts every session as soon as it is created: each acquire() creates a new one
+            new_sessions = AgentSessionPool(max_size=0)
+            pooled_sessions = AgentSessionPool()
+            pooled_sessions.release(pooled_sessions.acquire(host, port, STUB_AGENT_NAME))
+            agent_session = pooled_sessions.acquire(host, port, STUB_AGENT_NAME)["session"]
+            url = f"http://{host}:{port}/api/v1/{STUB_AGENT_NAME}/function"
+            with requests.Session() as keep_alive_session:
+                results = {
+                    "benchmark": "agent_session_pool",
+                    "new_session_seconds": self.time_calls(
+                        lambda: new_sessions.release(new_sessions.acquire(host, port, STUB_AGENT_NAME))),
+                    "pooled_session_seconds": self.time_calls(
+                        lambda: pooled_sessions.release(pooled_sessions.acquire(host, port, STUB_AGENT_NAME))),
+                    "agent_session_request": self.count_connections(stub_server,
+                                                                    lambda: agent_session.function({})),
+                    "keep_alive_request": self.count_connections(
+                        stub_server, lambda: keep_alive_session.get(url, json={}, timeout=10).json()),
+                }
+        finally:
+            stub_server.stop()
+
+        output = json.dumps(results, indent=2)
+        if self.args.output_file:
+            with open(self.args.output_file, "w", encoding="utf-8") as file:
+                file.write(output)
+        print(output)
+
+
+if __name__ == '__main__':
+    AgentSessionPoolBenchmark().main()
@@ -0,0 +1,149 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+from pyhocon import ConfigFactory
+
+from neuro_san_web_client.agents_diagram_builder import DiagramBuilder
+
+
+class DiagramBenchmark:
+    """
+    Times the steps of building an agent network diagram over synthetic networks of increasing sizes:
+    parsing the .hocon file, extracting the agent graph, computing the layout
+    and rendering the JSON graph and the .html diagram.
+    """
+
+    def __init__(self):
+        self.args = None
+
+    @staticmethod
+    def create_network(num_agents: int, branching: int, extra_calls: int = 0) -> Dict[str, Any]:
+        """
+        Creates a synthetic agent network: a tree where each agent calls up to `branching` agents,
+        plus one call to an agent that is not defined, to exercise the missing nodes.
+        :param num_agents: The number of agents
+        :param branching: The number of agents each agent calls
+        :param extra_calls: The number of calls between random agents added to the tree,
+                            which create edge crossings and cycles for the layout to handle
+        :return: The agent network definition
+        """
+        tools = []
+        for index in range(num_agents):
+            children = [f"agent_{child}" for child in range(index * branching + 1,
+                                                            min(num_agents, index * branching + branching + 1))]
+            tools.append({
+                "name": f"agent_{index}",
+                "instructions": f"You are agent {index}. Delegate to your tools when needed.",
+                "class": "Agent",
+                "tools": children,
+            })
+        tools[0]["tools"].append("missing_agent")
+        # Seeded, so that the runs are comparable
+        randomizer = random.Random(num_agents)
+        for _ in range(extra_calls):
+            tools[randomizer.randrange(num_agents)]["tools"].append(f"agent_{randomizer.randrange(num_agents)}")
+        return {"tools": tools}
+
+    @staticmethod
+    def time_step(step: Callable[[], Any], repeats: int) -> Dict[str, float]:
+        """
+        :return: The median and minimum durations of a step, in seconds
+        """
+        durations = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            step()
+            durations.append(time.perf_counter() - start)
+        return {"median": statistics.median(durations), "min": min(durations)}
+
+    def run_size(self, num_agents: int, work_dir: str) -> Dict[str, Any]:
+        """
+        Times the diagram building steps for a network of num_agents agents
+        """
+        hocon_file = os.path.join(work_dir, f"network_{num_agents}.hocon")
+        # JSON is valid HOCON
+        with open(hocon_file, "w", encoding="utf-8") as file:
+            json.dump(self.create_network(num_agents, self.args.branching,
+                                          int(num_agents * self.args.extra_call_ratio)), file)
+        output_html = os.path.join(work_dir, f"network_{num_agents}.html")
+
+        agent_data = ConfigFactory.parse_file(hocon_file, resolve=False)
+        agent_graph = DiagramBuilder.parse_agent_definitions(agent_data)
+        node_names, _, edges = DiagramBuilder.get_nodes_and_edges(agent_graph)
+        graph_json = json.dumps(DiagramBuilder.create_graph_data(agent_graph), separators=(",", ":"))
+        return {
+            "agents": num_agents,
+            "hocon_parse_seconds": self.time_step(lambda: ConfigFactory.parse_file(hocon_file, resolve=False),
+                                                  self.args.repeats),
+            "graph_parse_seconds": self.time_step(lambda: DiagramBuilder.parse_agent_definitions(agent_data),
+                                                  self.args.repeats),
+            "layout_seconds": self.time_step(lambda: DiagramBuilder.compute_layout(node_names, edges),
+                                             self.args.repeats),
+            # Includes the layout
+            "graph_json_seconds": self.time_step(
+                lambda: json.dumps(DiagramBuilder.create_graph_data(agent_graph), separators=(",", ":")),
+                self.args.repeats),
+            "graph_json_bytes": len(graph_json),
+            # Includes the layout
+            "html_build_seconds": self.time_step(
+                lambda: DiagramBuilder.create_interactive_agent_graph(agent_graph, output_html), self.args.repeats),
+            "html_bytes": os.path.getsize(output_html),
+        }
+
+    def parse_args(self):
+        """
+        Parse command line arguments into member variables
+        """
+        arg_parser = argparse.ArgumentParser(
+            description="Times the agent network diagram building steps over synthetic networks."
+        )
+        arg_parser.add_argument("--sizes", type=str, default="10,100,1000,5000",
+                                help="Comma-separated numbers of agents, one synthetic network each")
+        arg_parser.add_argument("--branching", type=int, default=8,
+                                help="Number of agents each agent calls")
+        arg_parser.add_argument("--extra_call_ratio", type=float, default=0.1,
+                                help="Number of calls between random agents added to the tree, per agent")
+        arg_parser.add_argument("--repeats", type=int, default=3,
+                                help="Number of times each step is timed")
+        arg_parser.add_argument("--output_file", type=str, default=None,
+                                help="Path to a .json file to write the results to, instead of stdout")
+        self.args = arg_parser.parse_args()
+
+    def main(self):
+        self.parse_args()
+        with tempfile.TemporaryDirectory() as work_dir:
+            sizes = [self.run_size(int(num_agents), work_dir) for num_agents in self.args.sizes.split(",")]
+        results = {
+            "benchmark": "diagram",
+            "branching": self.args.branching,
+            "extra_call_ratio": self.args.extra_call_ratio,
+            "sizes": sizes,
+        }
+        output = json.dumps(results, indent=2)
+        if self.args.output_file:
+            with open(self.args.output_file, "w", encoding="utf-8") as file:
+                file.write(output)
+        print(output)
+
+
+if __name__ == '__main__':
+    DiagramBenchmark().main()
@@ -0,0 +1,278 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import argparse
+import json
+import os
+import platform
+import queue
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import socketio
+
+from benchmarks.stub_neuro_san_server import StubNeuroSanServer
+from benchmarks.stub_neuro_san_server import load_trace
+
+STUB_AGENT_NAME = "stub_network"
+
+
+def get_free_port() -> int:
+    """
+    :return: A TCP port nobody listens on
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_percentile(values: List[float], percentile: float) -> Optional[float]:
+    """
+    :param values: The values
+    :param percentile: The percentile to compute, between 0 and 100
+    :return: The nearest-rank percentile of the values, or None if there are none
+    """
+    if not values:
+        return None
+    sorted_values = sorted(values)
+    rank = max(0, min(len(sorted_values) - 1, int(round(percentile / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """
+    :return: The p50, p95 and p99 of the values
+    """
+    return {
+        "p50": get_percentile(values, 50),
+        "p95": get_percentile(values, 95),
+        "p99": get_percentile(values, 99),
+    }
+
+
+def get_rss_bytes(pid: int) -> Optional[int]:
+    """
+    Reads the resident memory of the web client process from /proc.
+    The web client runs with debug off, so that there is no werkzeug reloader process next to it.
+    :param pid: The process ID
+    :return: The resident memory in bytes, or None if /proc is not available
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class LoadBenchmark:
+    """
+    Starts the web client against a stub neuro-san server, drives simulated Socket.IO users through it
+    and reports turn latencies, time to first agent log, frames per turn, throughput and server memory,
+    for increasing numbers of concurrent sessions, in one or more server modes of the web client.
+    """
+
+    def __init__(self):
+        self.args = None
+
+    def get_app_command(self, stub_port: int, web_client_port: int) -> List[str]:
+        """
+        :return: The command line starting the web client
+        """
+        return [sys.executable, "-m", "neuro_san_web_client.app",
+                "--server-host", "127.0.0.1",
+                "--server-port", str(stub_port),
+                "--web-client-host", "127.0.0.1",
+                "--web-client-port", str(web_client_port),
+                "--default-agent-name", STUB_AGENT_NAME] + self.args.app_args
+
+    @staticmethod
+    def wait_until_ready(url: str, timeout_in_seconds: float) -> float:
+        """
+        Polls the web client until it serves its index page
+        :return: The time it took, in seconds
+        """
+        start = time.perf_counter()
+        while time.perf_counter() - start < timeout_in_seconds:
+            try:
+                with urllib.request.urlopen(url, timeout=1):
+                    return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.05)
+        raise TimeoutError(f"The web client did not start within {timeout_in_seconds}s")
+
+    def run_session(self, url: str, session_index: int, results: List[Dict[str, Any]]):
+        """
+        Plays one user: connects, sends the turns one after the other and records their measurements
+        """
+        client = socketio.Client()
+        events = queue.Queue()
+
+        @client.on('*')
+        def on_event(event, _data):
+            events.put((time.perf_counter(), event))
+
+        client.connect(url, transports=["websocket"], wait_timeout=self.args.turn_timeout)
+        try:
+            for turn_index in range(self.args.turns):
+                start = time.perf_counter()
+                client.emit('user_input', {'message': f"session {session_index} turn {turn_index}"})
+                frames = 0
+                time_to_first_agent_log = None
+                while True:
+                    event_time, event = events.get(timeout=self.args.turn_timeout)
+                    frames += 1
+                    if event in ("agent_log", "agent_logs") and time_to_first_agent_log is None:
+                        time_to_first_agent_log = event_time - start
+                    if event == "agent_response":
+                        break
+                results.append({
+                    "latency": event_time - start,
+                    "time_to_first_agent_log": time_to_first_agent_log,
+                    "frames": frames
+                })
+        finally:
+            client.disconnect()
+
+    def run_scenario(self, url: str, num_sessions: int, app_pid: int) -> Dict[str, Any]:
+        """
+        Runs num_sessions users at the same time
+        :return: The measurements of the scenario
+        """
+        results: List[Dict[str, Any]] = []
+        threads = [threading.Thread(target=self.run_session, args=(url, index, results))
+                   for index in range(num_sessions)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = [result["latency"] for result in results]
+        first_logs = [result["time_to_first_agent_log"] for result in results
+                      if result["time_to_first_agent_log"] is not None]
+        frames = [result["frames"] for result in results]
+        return {
+            "sessions": num_sessions,
+            "turns": len(results),
+            "failed_turns": num_sessions * self.args.turns - len(results),
+            "turn_latency_seconds": summarize(latencies),
+            "time_to_first_agent_log_seconds": summarize(first_logs),
+            "frames_per_turn": sum(frames) / len(frames) if frames else None,
+            "throughput_turns_per_second": len(results) / elapsed if elapsed > 0 else None,
+            "server_rss_bytes": get_rss_bytes(app_pid),
+        }
+
+    def parse_args(self):
+        """
+        Parse command line arguments into member variables
+        """
+        arg_parser = argparse.ArgumentParser(
+            description="Load tests the web client against a stub neuro-san server. "
+                        "Extra arguments are passed to the web client."
+        )
+        arg_parser.add_argument("--sessions", type=str, default="1,2,4,8,16",
+                                help="Comma-separated numbers of concurrent sessions, one scenario each")
+        arg_parser.add_argument("--server_modes", type=str, default="eventlet",
+                                help="Comma-separated server modes of the web client to compare, "
+                                     "e.g. eventlet,asgi, each one running all the scenarios")
+        arg_parser.add_argument("--turns", type=int, default=5,
+                                help="Number of turns each session sends, one after the other")
+        arg_parser.add_argument("--fan_out", type=int, default=5,
+                                help="Number of sub-agents the stub front man calls each turn")
+        arg_parser.add_argument("--messages_per_agent", type=int, default=4,
+                                help="Number of messages each stub sub-agent sends")
+        arg_parser.add_argument("--delay", type=float, default=0.1,
+                                help="Time each stub agent takes to answer, in seconds")
+        arg_parser.add_argument("--agent_delays", type=str, default=None,
+                                help="JSON object of agent name -> delay in seconds, overriding --delay")
+        arg_parser.add_argument("--replay_trace", type=str, default=None,
+                                help="Path to a turn trace saved from the web client's /traces/<trace_id>: "
+                                     "the stub server replays it each turn instead of generating the turns")
+        arg_parser.add_argument("--turn_timeout", type=float, default=120.0,
+                                help="Maximum time to wait for any event during a turn, in seconds")
+        arg_parser.add_argument("--output_file", type=str, default=None,
+                                help="Path to a .json file to write the results to, instead of stdout")
+        self.args, app_args = arg_parser.parse_known_args()
+        self.args.app_args = app_args
+
+    def run_server_mode(self, server_mode: str, stub_port: int) -> Dict[str, Any]:
+        """
+        Starts the web client in a server mode and runs all the scenarios against it
+        :param server_mode: The server mode of the web client, 'eventlet' or 'asgi'
+        :param stub_port: The port of the stub neuro-san server
+        :return: The measurements of the scenarios
+        """
+        web_client_port = get_free_port()
+        url = f"http://127.0.0.1:{web_client_port}"
+        env = dict(os.environ, NEURO_SAN_WEB_CLIENT_SERVER_MODE=server_mode)
+        app_process = subprocess.Popen(self.get_app_command(stub_port, web_client_port),
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                       start_new_session=True, env=env)
+        try:
+            time_to_ready = self.wait_until_ready(url, timeout_in_seconds=60)
+            scenarios = [self.run_scenario(url, int(num_sessions), app_process.pid)
+                         for num_sessions in self.args.sessions.split(",")]
+        finally:
+            os.killpg(app_process.pid, signal.SIGTERM)
+            app_process.wait()
+        return {
+            "server_mode": server_mode,
+            "time_to_ready_seconds": time_to_ready,
+            "scenarios": scenarios,
+        }
+
+    def main(self):
+        self.parse_args()
+        stub_server = StubNeuroSanServer(
+            fan_out=self.args.fan_out, messages_per_agent=self.args.messages_per_agent,
+            default_delay_in_seconds=self.args.delay,
+            agent_delays_in_seconds=json.loads(self.args.agent_delays) if self.args.agent_delays else None,
+            replay_trace=load_trace(self.args.replay_trace) if self.args.replay_trace else None)
+        stub_server.start()
+        try:
+            server_modes = [self.run_server_mode(server_mode, stub_server.port)
+                            for server_mode in self.args.server_modes.split(",")]
+        finally:
+            stub_server.stop()
+
+        results = {
+            "benchmark": "load",
+            "app_args": self.args.app_args,
+            "turns_per_session": self.args.turns,
+            "agent_messages_per_turn": self.args.fan_out * self.args.messages_per_agent,
+            "stub_delay_seconds": self.args.delay,
+            "python_version": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "server_modes": server_modes,
+        }
+        output = json.dumps(results, indent=2)
+        if self.args.output_file:
+            with open(self.args.output_file, "w", encoding="utf-8") as file:
+                file.write(output)
+        print(output)
+
+
+if __name__ == '__main__':
+    LoadBenchmark().main()
@@ -0,0 +1,177 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import argparse
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+
+import socketio
+
+from benchmarks.load_benchmark import LoadBenchmark
+from benchmarks.load_benchmark import get_free_port
+from benchmarks.load_benchmark import summarize
+from benchmarks.stub_neuro_san_server import StubNeuroSanServer
+
+# Times the import of the web client in a fresh interpreter, as a module the way gunicorn or uvicorn would
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import neuro_san_web_client.app
+print(time.perf_counter() - start)
+"""
+
+
+class StartupBenchmark(LoadBenchmark):
+    """
+    Measures how long the web client takes to start:
+    the import time of its module, and the time from launching it to its first request,
+    to /ready reporting ready and to the end of the first turn, with and without the warm-up.
+    """
+
+    def measure_import_time(self) -> Dict[str, Any]:
+        """
+        Imports the web client in fresh interpreters
+        :return: The import times, and the packages taking the longest to import
+        """
+        import_times = []
+        for _ in range(self.args.import_runs):
+            output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True,
+                                    check=True)
+            import_times.append(float(output.stdout.strip().splitlines()[-1]))
+
+        # -X importtime lists the time each module takes to import, on stderr
+        output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import neuro_san_web_client.app"],
+                                capture_output=True, text=True, check=True)
+        package_times: Dict[str, int] = {}
+        for line in output.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            self_us, _, module = [field.strip() for field in line[len("import time:"):].split("|")]
+            if not self_us.isdigit():
+                # The header line
+                continue
+            package = module.split(".")[0]
+            package_times[package] = package_times.get(package, 0) + int(self_us)
+        slowest = sorted(package_times.items(), key=lambda item: item[1], reverse=True)[:self.args.top_packages]
+        return {
+            "import_seconds": summarize(import_times),
+            "slowest_packages_seconds": {package: self_us / 1e6 for package, self_us in slowest},
+        }
+
+    def run_first_turn(self, url: str) -> float:
+        """
+        Plays one user sending one turn
+        :return: The time from connecting to the agent's response, in seconds
+        """
+        client = socketio.Client()
+        events = queue.Queue()
+
+        @client.on('*')
+        def on_event(event, _data):
+            events.put(event)
+
+        start = time.perf_counter()
+        client.connect(url, transports=["websocket"])
+        try:
+            client.emit('user_input', {'message': "first turn"})
+            while events.get(timeout=self.args.turn_timeout) != "agent_response":
+                pass
+            return time.perf_counter() - start
+        finally:
+            client.disconnect()
+
+    def run_startup(self, warm_up: bool, stub_port: int) -> Dict[str, Any]:
+        """
+        Starts the web client and measures its first request, readiness and first turn
+        :param warm_up: True to start the web client with its warm-up
+        :param stub_port: The port of the stub neuro-san server
+        :return: The measurements
+        """
+        web_client_port = get_free_port()
+        url = f"http://127.0.0.1:{web_client_port}"
+        command = self.get_app_command(stub_port, web_client_port) + ["--warm-up" if warm_up else "--no-warm-up"]
+        start = time.perf_counter()
+        app_process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                       start_new_session=True)
+        try:
+            time_to_first_request = self.wait_until_ready(url, timeout_in_seconds=60)
+            # /ready answers 503 until the web client is ready
+            self.wait_until_ready(f"{url}/ready", timeout_in_seconds=60)
+            time_to_ready = time.perf_counter() - start
+            first_turn = self.run_first_turn(url)
+        finally:
+            os.killpg(app_process.pid, signal.SIGTERM)
+            app_process.wait()
+        return {
+            "time_to_first_request_seconds": time_to_first_request,
+            "time_to_ready_seconds": time_to_ready,
+            "first_turn_seconds": first_turn,
+        }
+
+    def parse_args(self):
+        """
+        Parse command line arguments into member variables
+        """
+        arg_parser = argparse.ArgumentParser(
+            description="Measures the import time and the startup of the web client against a stub neuro-san server. "
+                        "Extra arguments are passed to the web client."
+        )
+        arg_parser.add_argument("--import_runs", type=int, default=5,
+                                help="Number of fresh interpreters importing the web client")
+        arg_parser.add_argument("--top_packages", type=int, default=10,
+                                help="Number of packages taking the longest to import to list")
+        arg_parser.add_argument("--startup_runs", type=int, default=3,
+                                help="Number of times the web client is started, with and without the warm-up each")
+        arg_parser.add_argument("--delay", type=float, default=0.01,
+                                help="Time each stub agent takes to answer, in seconds")
+        arg_parser.add_argument("--turn_timeout", type=float, default=60.0,
+                                help="Maximum time to wait for any event during the first turn, in seconds")
+        arg_parser.add_argument("--output_file", type=str, default=None,
+                                help="Path to a .json file to write the results to, instead of stdout")
+        self.args, app_args = arg_parser.parse_known_args()
+        self.args.app_args = app_args
+
+    def main(self):
+        self.parse_args()
+        results: Dict[str, Any] = {
+            "benchmark": "startup",
+            "app_args": self.args.app_args,
+            "import": self.measure_import_time(),
+        }
+        stub_server = StubNeuroSanServer(fan_out=1, messages_per_agent=1, default_delay_in_seconds=self.args.delay)
+        stub_server.start()
+        try:
+            for warm_up in (False, True):
+                runs: List[Dict[str, Any]] = [self.run_startup(warm_up, stub_server.port)
+                                              for _ in range(self.args.startup_runs)]
+                results["warm_up" if warm_up else "no_warm_up"] = {
+                    measure: summarize([run[measure] for run in runs]) for measure in runs[0]
+                }
+        finally:
+            stub_server.stop()
+
+        output = json.dumps(results, indent=2)
+        if self.args.output_file:
+            with open(self.args.output_file, "w", encoding="utf-8") as file:
+                file.write(output)
+        print(output)
+
+
+if __name__ == '__main__':
+    StartupBenchmark().main()
@@ -0,0 +1,282 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+
+FRONT_MAN = "front_man"
+
+
+class StubNeuroSanServer:
+    """
+    A fake neuro-san HTTP server serving a single agent network, to benchmark the web client
+    without any LLM behind it.
+
+    Each turn, the front man calls fan_out sub-agents one after the other. Each sub-agent waits for its delay,
+    then sends messages_per_agent AGENT messages. The front man then sends its AI answer, with the chat context.
+
+    Alternatively, each turn replays a turn recorded by the web client, from /traces/<trace_id>:
+    the same agents send messages of the same types and lengths at the same times.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fan_out: int = 5, messages_per_agent: int = 4,
+                 default_delay_in_seconds: float = 0.1, agent_delays_in_seconds: Dict[str, float] = None,
+                 text_length: int = 200, replay_trace: Dict[str, Any] = None):
+        """
+        Constructor
+        :param host: The host to listen on
+        :param port: The port to listen on. 0 picks a free port.
+        :param fan_out: The number of sub-agents the front man calls each turn
+        :param messages_per_agent: The number of messages each sub-agent sends
+        :param default_delay_in_seconds: The time each agent takes to answer
+        :param agent_delays_in_seconds: Agent name -> time that agent takes to answer, overriding the default
+        :param text_length: The number of characters of each message
+        :param replay_trace: A turn trace recorded by the web client, to replay instead of the generated turns
+        """
+        self.fan_out: int = fan_out
+        self.messages_per_agent: int = messages_per_agent
+        self.default_delay_in_seconds: float = default_delay_in_seconds
+        self.agent_delays_in_seconds: Dict[str, float] = agent_delays_in_seconds or {}
+        self.text_length: int = text_length
+        self.replay_trace: Dict[str, Any] = replay_trace
+        self.num_turns: int = 0
+        # Number of TCP connections accepted, to tell whether the clients keep them alive
+        self.num_connections: int = 0
+        self.lock = threading.Lock()
+        self.http_server = ThreadingHTTPServer((host, port), self.create_handler_class())
+        self.http_server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def port(self) -> int:
+        return self.http_server.server_address[1]
+
+    def start(self):
+        """
+        Serves requests from a background thread
+        """
+        self.thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+    def get_delay(self, agent_name: str) -> float:
+        return self.agent_delays_in_seconds.get(agent_name, self.default_delay_in_seconds)
+
+    def generate_turn(self, request_dict: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generates the responses of one turn, sleeping for the agents' delays as it goes
+        :param request_dict: The chat request
+        :return: An iterator over the responses, in the neuro-san streaming_chat format
+        """
+        with self.lock:
+            self.num_turns += 1
+        user_text = request_dict.get("user_message", {}).get("text", "")
+        if self.replay_trace is not None:
+            yield from self.replay_turn(user_text)
+            return
+        front_man_origin = [{"tool": FRONT_MAN, "instantiation_index": 1}]
+        filler = "x" * self.text_length
+        for index in range(self.fan_out):
+            agent_name = f"agent_{index}"
+            time.sleep(self.get_delay(agent_name))
+            origin = front_man_origin + [{"tool": agent_name, "instantiation_index": 1}]
+            for message_index in range(self.messages_per_agent):
+                yield {"response": {"type": "AGENT", "origin": origin,
+                                    "text": f"{agent_name} message {message_index}: {filler}"}}
+
+        time.sleep(self.get_delay(FRONT_MAN))
+        yield self.create_answer(FRONT_MAN, user_text)
+
+    @staticmethod
+    def create_answer(front_man: str, user_text: str) -> Dict[str, Any]:
+        """
+        :return: The front man's AI answer that ends a turn, with the chat context
+        """
+        front_man_origin = [{"tool": front_man, "instantiation_index": 1}]
+        answer = f"Answer to: {user_text}"
+        chat_context = {
+            "chat_histories": [{
+                "origin": front_man_origin,
+                "messages": [{"type": "HUMAN", "text": user_text}, {"type": "AI", "text": answer}]
+            }]
+        }
+        return {"response": {"type": "AI", "origin": front_man_origin, "text": answer, "chat_context": chat_context}}
+
+    def get_front_man(self) -> str:
+        """
+        :return: The name of the front man: the first agent of the replayed trace, if any
+        """
+        if self.replay_trace is not None and self.replay_trace["spans"]:
+            return self.replay_trace["spans"][0]["agent"]
+        return FRONT_MAN
+
+    def get_connectivity(self) -> List[Dict[str, Any]]:
+        """
+        :return: The agents and the tools they call, in the neuro-san connectivity format
+        """
+        if self.replay_trace is None:
+            return [{"origin": FRONT_MAN, "tools": [f"agent_{index}" for index in range(self.fan_out)]}]
+        # The callers and callees seen in the replayed trace
+        connectivity = {}
+        stack = list(self.replay_trace["spans"])
+        while stack:
+            span = stack.pop()
+            tools = connectivity.setdefault(span["agent"], [])
+            for child in span["children"]:
+                if child["agent"] not in tools:
+                    tools.append(child["agent"])
+                stack.append(child)
+        return [{"origin": agent, "tools": tools} for agent, tools in connectivity.items()]
+
+    def replay_turn(self, user_text: str) -> Iterator[Dict[str, Any]]:
+        """
+        Replays the messages of the recorded turn at their recorded times, with filler texts of the same lengths.
+        The front man's last AI message becomes the answer to the user's message.
+        :param user_text: The user's message
+        :return: An iterator over the responses, in the neuro-san streaming_chat format
+        """
+        messages = self.replay_trace["messages"]
+        front_man = self.get_front_man()
+        answer_index = next((index for index in range(len(messages) - 1, -1, -1)
+                             if messages[index]["type"] == "AI" and messages[index]["origin"] == [front_man]), None)
+        start = time.monotonic()
+        for index, message in enumerate(messages):
+            delay = message["time"] - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+            if index == answer_index:
+                yield self.create_answer(front_man, user_text)
+                return
+            origin = [{"tool": agent_name, "instantiation_index": 1} for agent_name in message["origin"]]
+            yield {"response": {"type": message["type"], "origin": origin, "text": "x" * message["text_length"]}}
+        # No answer in the recorded messages: answer at the end of the recorded turn
+        delay = self.replay_trace["duration"] - (time.monotonic() - start)
+        if delay > 0:
+            time.sleep(delay)
+        yield self.create_answer(front_man, user_text)
+
+    def create_handler_class(self):
+        """
+        :return: The request handler class of the HTTP server
+        """
+        stub_server = self
+
+        class StubRequestHandler(BaseHTTPRequestHandler):
+            """
+            Serves the neuro-san HTTP API: /api/v1/<agent>/function, /connectivity and /streaming_chat
+            """
+            protocol_version = "HTTP/1.1"
+            # The headers and the body go out in separate writes: don't let Nagle's algorithm hold the body back
+            # on kept-alive connections
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub_server.lock:
+                    stub_server.num_connections += 1
+
+            # pylint: disable=invalid-name
+            def do_GET(self):
+                self.handle_request()
+
+            # pylint: disable=invalid-name
+            def do_POST(self):
+                self.handle_request()
+
+            def handle_request(self):
+                content_length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(content_length) if content_length else b""
+                request_dict = json.loads(body) if body else {}
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                if method == "function":
+                    self.send_json({"function": {"description": "Stub agent network"}})
+                elif method == "connectivity":
+                    self.send_json({"connectivity_info": stub_server.get_connectivity()})
+                elif method == "streaming_chat":
+                    self.send_stream(stub_server.generate_turn(request_dict))
+                else:
+                    self.send_error(404)
+
+            def send_json(self, response_dict: Dict[str, Any]):
+                payload = json.dumps(response_dict).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def send_stream(self, responses):
+                # Newline-delimited JSON, sent as each response is generated
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for response in responses:
+                    chunk = (json.dumps(response) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            # pylint: disable=redefined-builtin
+            def log_message(self, format, *args):
+                # Keep the benchmark output clean
+                pass
+
+        return StubRequestHandler
+
+
+def load_trace(trace_file: str) -> Dict[str, Any]:
+    """
+    :param trace_file: Path to a turn trace saved from the web client's /traces/<trace_id>
+    :return: The trace
+    """
+    with open(trace_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Runs a fake neuro-san HTTP server for benchmarks.")
+    arg_parser.add_argument("--host", type=str, default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("--fan_out", type=int, default=5,
+                            help="Number of sub-agents the front man calls each turn")
+    arg_parser.add_argument("--messages_per_agent", type=int, default=4,
+                            help="Number of messages each sub-agent sends")
+    arg_parser.add_argument("--delay", type=float, default=0.1,
+                            help="Time each agent takes to answer, in seconds")
+    arg_parser.add_argument("--agent_delays", type=str, default=None,
+                            help="JSON object of agent name -> delay in seconds, overriding --delay")
+    arg_parser.add_argument("--replay_trace", type=str, default=None,
+                            help="Path to a turn trace saved from the web client's /traces/<trace_id>, "
+                                 "to replay instead of generating the turns")
+    args = arg_parser.parse_args()
+
+    server = StubNeuroSanServer(host=args.host, port=args.port, fan_out=args.fan_out,
+                                messages_per_agent=args.messages_per_agent, default_delay_in_seconds=args.delay,
+                                agent_delays_in_seconds=json.loads(args.agent_delays) if args.agent_delays else None,
+                                replay_trace=load_trace(args.replay_trace) if args.replay_trace else None)
+    print(f"Stub neuro-san server listening on {args.host}:{server.port}")
+    server.http_server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from typing import Any
+from typing import Dict
+from typing import List
+
+import socketio
+
+from benchmarks.load_benchmark import LoadBenchmark
+from benchmarks.load_benchmark import get_free_port
+from benchmarks.stub_neuro_san_server import StubNeuroSanServer
+
+
+class TurnCancellationBenchmark:
+    """
+    Checks that the turns nobody will read are stopped: simulated users send messages to the web client,
+    with a slow stub neuro-san server, and disconnect in the middle of their turns.
+    Reports how many cancelled turns were still running over time, which must drop to zero
+    within about one stub agent delay, instead of lasting until the end of the turns.
+    """
+
+    def __init__(self):
+        self.args = None
+
+    def get_stats(self, url: str) -> Dict[str, Any]:
+        """
+        :return: The stats of the web client
+        """
+        with urllib.request.urlopen(f"{url}/stats", timeout=5) as response:
+            return json.loads(response.read())
+
+    def run_session(self, url: str, session_index: int, first_logs: List[float]):
+        """
+        Plays one user: connects, sends its messages at once, waits for the first agent logs and disconnects
+        """
+        client = socketio.Client()
+        got_logs = threading.Event()
+
+        @client.on('agent_logs')
+        def on_agent_logs(_data):
+            got_logs.set()
+
+        client.connect(url, transports=["websocket"], wait_timeout=self.args.turn_timeout)
+        start = time.perf_counter()
+        for message_index in range(self.args.messages):
+            client.emit('user_input', {'message': f"session {session_index} message {message_index}"})
+        if got_logs.wait(timeout=self.args.turn_timeout):
+            first_logs.append(time.perf_counter() - start)
+        time.sleep(self.args.abandon_after)
+        client.disconnect()
+
+    def run(self, url: str) -> Dict[str, Any]:
+        """
+        Runs the sessions, then polls the stats of the web client until no cancelled turn is running anymore
+        :return: The measurements
+        """
+        first_logs: List[float] = []
+        threads = [threading.Thread(target=self.run_session, args=(url, index, first_logs))
+                   for index in range(self.args.sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        disconnected = time.perf_counter()
+        samples = []
+        while True:
+            stats = self.get_stats(url)["turns"]
+            elapsed = time.perf_counter() - disconnected
+            samples.append({"seconds": elapsed, "abandoned_turns_running": stats["abandoned_turns_running"]})
+            # The disconnections are handled asynchronously: wait until the running turns are all cancelled
+            all_cancelled = stats["cancelled_turns"].get("disconnected", 0) >= len(first_logs)
+            if (all_cancelled and stats["abandoned_turns_running"] == 0) or elapsed > self.args.turn_timeout:
+                break
+            time.sleep(0.05)
+        return {
+            "sessions": self.args.sessions,
+            "messages_per_session": self.args.messages,
+            "sessions_with_agent_logs": len(first_logs),
+            "abandoned_turns_peak": max(sample["abandoned_turns_running"] for sample in samples),
+            "abandoned_turns_running_at_end": samples[-1]["abandoned_turns_running"],
+            "drain_seconds": samples[-1]["seconds"],
+            "turns": stats,
+            "samples": samples,
+        }
+
+    def parse_args(self):
+        """
+        Parse command line arguments into member variables
+        """
+        arg_parser = argparse.ArgumentParser(
+            description="Checks that the turns of disconnected users stop. "
+                        "Extra arguments are passed to the web client."
+        )
+        arg_parser.add_argument("--sessions", type=int, default=16,
+                                help="Number of users disconnecting in the middle of their turns")
+        arg_parser.add_argument("--messages", type=int, default=1,
+                                help="Number of messages each user sends at once, to exercise the turn queue policy")
+        arg_parser.add_argument("--abandon_after", type=float, default=0.5,
+                                help="Time between the first agent logs and the disconnection, in seconds")
+        arg_parser.add_argument("--fan_out", type=int, default=5,
+                                help="Number of sub-agents the stub front man calls each turn")
+        arg_parser.add_argument("--messages_per_agent", type=int, default=4,
+                                help="Number of messages each stub sub-agent sends")
+        arg_parser.add_argument("--delay", type=float, default=0.5,
+                                help="Time each stub agent takes to answer, in seconds")
+        arg_parser.add_argument("--turn_timeout", type=float, default=120.0,
+                                help="Maximum time to wait for the first agent logs, and for the turns to stop")
+        arg_parser.add_argument("--output_file", type=str, default=None,
+                                help="Path to a .json file to write the results to, instead of stdout")
+        self.args, app_args = arg_parser.parse_known_args()
+        self.args.app_args = app_args
+
+    def main(self):
+        self.parse_args()
+        stub_server = StubNeuroSanServer(fan_out=self.args.fan_out, messages_per_agent=self.args.messages_per_agent,
+                                         default_delay_in_seconds=self.args.delay)
+        stub_server.start()
+
+        web_client_port = get_free_port()
+        url = f"http://127.0.0.1:{web_client_port}"
+        load_benchmark = LoadBenchmark()
+        load_benchmark.args = self.args
+        app_process = subprocess.Popen(load_benchmark.get_app_command(stub_server.port, web_client_port),
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                       start_new_session=True)
+        try:
+            LoadBenchmark.wait_until_ready(url, timeout_in_seconds=60)
+            results = self.run(url)
+        finally:
+            os.killpg(app_process.pid, signal.SIGTERM)
+            app_process.wait()
+            stub_server.stop()
+
+        results = dict(benchmark="turn_cancellation", app_args=self.args.app_args, **results)
+        output = json.dumps(results, indent=2)
+        if self.args.output_file:
+            with open(self.args.output_file, "w", encoding="utf-8") as file:
+                file.write(output)
+        print(output)
+        if results["abandoned_turns_running_at_end"] != 0:
+            sys.exit(f"{results['abandoned_turns_running_at_end']} cancelled turns were still running "
+                     f"after {self.args.turn_timeout} seconds")
+
+
+if __name__ == '__main__':
+    TurnCancellationBenchmark().main()
@@ -1,4 +1,3 @@
-
 # Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
 # All Rights Reserved.
 # Issued under the Academic Public License.
@@ -10,6 +9,8 @@
 #
 # END COPYRIGHT
 
+import logging
+import threading
 from typing import Any
 from typing import Dict
 from typing import List
@@ -20,18 +21,58 @@ from flask_socketio import SocketIO
 from neuro_san.internals.messages.chat_message_type import ChatMessageType
 from neuro_san.message_processing.message_processor import MessageProcessor
 
+from neuro_san_web_client.metrics import AGENT_MESSAGES
+from neuro_san_web_client.metrics import EMIT_SECONDS
+from neuro_san_web_client.wire_format import WireFormat
+
+
+logger = logging.getLogger(__name__)
+
+LOG_HEADER = "---------- ChatMessage ----------"
+
 
 class AgentLogProcessor(MessageProcessor):
     """
-    Tells the UI there's an agent message to process.
+    Tells the UI there are agent messages to process.
+    Messages are buffered and sent as a single 'agent_logs' event when the buffer is full
+    or when the oldest buffered message has waited for flush_interval_in_seconds,
+    instead of one event per message.
+    With a compact wire format, the messages are sent as 'agent_logs_compact' events instead:
+    each agent name is sent once, with the first message it appears in, and referred to by its id afterwards.
+    The first event of each processor has "reset": true, for the browser to forget the names of a previous one,
+    e.g. before a reconnection or the eviction of an idle session, as the ids start from 0 again.
+    The browser formats the messages.
     """
 
-    def __init__(self, socketio: SocketIO, sid: str):
+    def __init__(self, socketio: SocketIO, sid: str, max_batch_size: int = 32,
+                 flush_interval_in_seconds: float = 0.05, wire_format: WireFormat = None):
         """
         Constructor
+        :param socketio: The SocketIO server to send the messages with
+        :param sid: The Socket.IO session ID of the user to send the messages to
+        :param max_batch_size: The number of buffered messages that triggers a flush
+        :param flush_interval_in_seconds: The maximum time a message stays in the buffer
+        :param wire_format: How the messages are sent to the browser. The 'text' wire format if None.
         """
         self.socketio: SocketIO = socketio
         self.sid: str = sid
+        self.max_batch_size: int = max_batch_size
+        self.flush_interval_in_seconds: float = flush_interval_in_seconds
+        self.wire_format: WireFormat = wire_format or WireFormat()
+        # Formatted strings, or [agent ids of the origin chain, text] with a compact wire format
+        self.pending_logs: List[Any] = []
+        self.last_agent_name: str = None
+        # With a compact wire format: agent name -> id, for this session, and the names not sent yet
+        self.agent_ids: Dict[str, int] = {}
+        self.pending_agent_names: List[str] = []
+        # Whether the next compact event is the first one, which resets the agent names of the browser
+        self.first_batch: bool = True
+        self.flush_scheduled: bool = False
+        # Set once the user disconnected: nothing is sent anymore
+        self.closed: bool = False
+        self.lock = threading.Lock()
+        # Keeps the events in order, as a batch may refer to the agent names sent in the previous one
+        self.emit_lock = threading.Lock()
 
     def process_message(self, chat_message_dict: Dict[str, Any], message_type: ChatMessageType):
         """
@@ -56,11 +97,15 @@ class AgentLogProcessor(MessageProcessor):
         # Get the list of agents that participated in the message and the name of the last agent,
         # which is the one that sent the message.
         origin_chain, last_agent_name = self.get_origin(chat_message_dict)
+        AGENT_MESSAGES.inc(last_agent_name)
 
-        header = "---------- ChatMessage ----------"
-        log_message = f"{header}\n{origin_chain}: {log_text}"
-        # Log the message
-        print(log_message)
+        log_message = f"{LOG_HEADER}\n{origin_chain}: {log_text}"
+        # Log the message. Handlers are queued by the app so this does not block on stdout.
+        logger.info(log_message)
+        if self.wire_format.is_compact():
+            # The browser adds the header and the names of the agents
+            origin_ids = self.intern_agent_names([tool['tool'] for tool in chat_message_dict.get("origin")])
+            log_message = [origin_ids, log_text]
         # Highlight the last agent name in the network diagram
         # and display the log message in the Agents Communication panel
         self.display_message_in_ui(last_agent_name, log_message)
@@ -82,18 +127,110 @@ class AgentLogProcessor(MessageProcessor):
 
         return origin_str, last_agent_name
 
-    def display_message_in_ui(self, agent_name: str, message_log: str) -> None:
+    def intern_agent_names(self, agent_names: List[str]) -> List[int]:
+        """
+        :param agent_names: Names of agents
+        :return: Their ids in this session. The new ones are sent with the next flush.
+        """
+        agent_ids = []
+        with self.lock:
+            for agent_name in agent_names:
+                agent_id = self.agent_ids.get(agent_name)
+                if agent_id is None:
+                    agent_id = len(self.agent_ids)
+                    self.agent_ids[agent_name] = agent_id
+                    self.pending_agent_names.append(agent_name)
+                agent_ids.append(agent_id)
+        return agent_ids
+
+    def display_message_in_ui(self, agent_name: str, message_log: Any) -> None:
         """
         Displays the agent message in the UI
-        Sends the agent name and its log to the UI to:
+        Buffers the agent name and its log until the next flush, which sends them to the UI to:
          - Highlight the agent node in the network diagram
          - Display the agent log in the Agents Communication panel
 
         """
-        log_dict = {
-            "agent_name": agent_name,
-            "log": message_log
-        }
-        self.socketio.emit('agent_log', log_dict, room=self.sid)
+        with self.lock:
+            if self.closed:
+                return
+            self.pending_logs.append(message_log)
+            self.last_agent_name = agent_name
+            batch_is_full = len(self.pending_logs) >= self.max_batch_size
+            schedule_flush = not batch_is_full and not self.flush_scheduled
+            if schedule_flush:
+                self.flush_scheduled = True
+
+        if batch_is_full:
+            self.flush()
+        elif schedule_flush:
+            self.schedule_flush()
+
+    def schedule_flush(self) -> None:
+        """
+        Flushes the buffered messages once the flush interval has elapsed.
+        A server offering call_later(), like the asgi bridge, times the interval on its event loop
+        and flushes in a thread of its timer pool, instead of starting a thread per flush.
+        Otherwise, e.g. with eventlet, a background green thread sleeps, then flushes.
+        """
+        call_later = getattr(self.socketio, "call_later", None)
+        if call_later is not None:
+            call_later(self.flush_interval_in_seconds, self.flush)
+        else:
+            self.socketio.start_background_task(self.flush_later)
+
+    def flush_later(self) -> None:
+        """
+        Flushes the buffered messages once the flush interval has elapsed, in a background task
+        """
+        self.socketio.sleep(self.flush_interval_in_seconds)
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Sends all the buffered messages to the UI in a single event.
+        The last agent that sent a message is the one highlighted in the network diagram.
+        """
+        with self.emit_lock:
+            with self.lock:
+                self.flush_scheduled = False
+                logs = self.pending_logs
+                if not logs or self.closed:
+                    # The agent names interned for a message not buffered yet stay pending
+                    return
+                agent_name = self.last_agent_name
+                agent_names = self.pending_agent_names
+                self.pending_logs = []
+                self.pending_agent_names = []
+                first_batch = self.first_batch
+                self.first_batch = False
+
+            if self.wire_format.is_compact():
+                event = 'agent_logs_compact'
+                logs_dict = {
+                    # The names of the agents with the next ids
+                    "agents": agent_names,
+                    "agent": self.agent_ids[agent_name],
+                    "logs": logs
+                }
+                if first_batch:
+                    # The ids start from 0 again
+                    logs_dict["reset"] = True
+            else:
+                event = 'agent_logs'
+                logs_dict = {
+                    "agent_name": agent_name,
+                    "logs": logs
+                }
+            with EMIT_SECONDS.time(event):
+                self.socketio.emit(event, self.wire_format.encode(logs_dict), room=self.sid)
         # Allow the event loop to process and send WebSocket messages before continuing execution.
         self.socketio.sleep(0)
+
+    def close(self) -> None:
+        """
+        Stops sending messages to the UI, e.g. once the user disconnected. The buffered messages are dropped.
+        """
+        with self.lock:
+            self.closed = True
+            self.pending_logs = []
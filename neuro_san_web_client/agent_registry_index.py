@@ -0,0 +1,258 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import os
+import threading
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from neuro_san_web_client.agents_diagram_builder import REGISTRY_MANIFEST_FILE_NAME
+from neuro_san_web_client.original_modules import LAZY_IMPORT_LOCK
+
+# Descriptions longer than that are shortened in the index
+MAX_DESCRIPTION_LENGTH = 200
+# Below that number of files to parse, parsing them in the current process is faster than starting a pool
+MIN_FILES_PER_POOL = 8
+
+
+class AgentRegistryIndex:
+    """
+    Lists the agent networks of a registry directory with the metadata the UI needs:
+    their number of tools, front man and description.
+    The index is built once, parsing the .hocon files in a pool of processes,
+    then kept up to date by polling the modification times and sizes of the files,
+    re-parsing only the files that changed.
+    Looking an agent network up, or searching for one, never touches the disk.
+    """
+
+    def __init__(self, registry_dir: str, max_workers: Optional[int] = None,
+                 on_change: Callable[[str], None] = None):
+        """
+        Constructor
+        :param registry_dir: The directory containing the agent network .hocon files, in sub-directories or not
+        :param max_workers: The maximum number of processes parsing the .hocon files. The number of CPUs if None.
+        :param on_change: Called with the path of each .hocon file that changed or was removed
+        """
+        self.registry_dir: str = os.path.abspath(registry_dir)
+        self.max_workers: Optional[int] = max_workers
+        self.on_change: Callable[[str], None] = on_change
+        # Agent network name, e.g. industry/telco_network_support -> metadata
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # (lowercase name, name), sorted, for the prefix searches
+        self.sorted_names: List[Tuple[str, str]] = []
+        # The names of the agent networks the registry's manifest activates, or None if there is no manifest
+        self.served_names: Optional[Set[str]] = None
+        self.manifest_version: Optional[Tuple[int, int]] = None
+        self.lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """
+        :return: True if the registry directory exists. Otherwise, the index is empty.
+        """
+        return os.path.isdir(self.registry_dir)
+
+    def scan_files(self) -> Dict[str, Tuple[str, int, int]]:
+        """
+        Lists the .hocon files of the registry, reading their metadata only
+        :return: A dictionary of agent network name -> (path, modification time in ns, size)
+        """
+        files = {}
+        for dir_path, _, file_names in os.walk(self.registry_dir):
+            for file_name in file_names:
+                if not file_name.endswith(".hocon") or file_name == REGISTRY_MANIFEST_FILE_NAME:
+                    continue
+                hocon_file = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(hocon_file)
+                except OSError:
+                    # Removed in the meantime
+                    continue
+                agent_name = Path(os.path.relpath(hocon_file, self.registry_dir)).with_suffix("").as_posix()
+                files[agent_name] = (hocon_file, stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def refresh(self) -> List[str]:
+        """
+        Updates the index with the .hocon files that were added, changed or removed since the last refresh
+        :return: The names of the agent networks that were added, changed or removed
+        """
+        files = self.scan_files()
+        entries = self.entries
+        to_parse = [name for name, (_, mtime_ns, size) in files.items()
+                    if name not in entries or
+                    (entries[name]["mtime_ns"], entries[name]["size"]) != (mtime_ns, size)]
+        removed = [name for name in entries if name not in files]
+        served_names_changed = self.refresh_served_names()
+        if not to_parse and not removed and not served_names_changed:
+            return []
+
+        metadata = self.read_all_metadata([files[name][0] for name in to_parse])
+        new_entries = dict(entries)
+        for name in removed:
+            del new_entries[name]
+        for name, name_metadata in zip(to_parse, metadata):
+            hocon_file, mtime_ns, size = files[name]
+            new_entries[name] = dict(name_metadata, name=name, path=hocon_file, mtime_ns=mtime_ns, size=size)
+        for name, entry in new_entries.items():
+            entry["served"] = self.served_names is None or name in self.served_names
+        sorted_names = sorted((name.lower(), name) for name in new_entries)
+        with self.lock:
+            self.entries = new_entries
+            self.sorted_names = sorted_names
+
+        if self.on_change is not None:
+            for name in removed:
+                self.on_change(entries[name]["path"])
+            for name in to_parse:
+                if name in entries:
+                    self.on_change(files[name][0])
+        return to_parse + removed
+
+    def refresh_served_names(self) -> bool:
+        """
+        Reads the registry's manifest again if it changed
+        :return: True if it changed
+        """
+        manifest_file = os.path.join(self.registry_dir, REGISTRY_MANIFEST_FILE_NAME)
+        try:
+            stat = os.stat(manifest_file)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+        if version == self.manifest_version:
+            return False
+        self.manifest_version = version
+        self.served_names = None if version is None else self.read_served_names(manifest_file)
+        return True
+
+    @staticmethod
+    def read_served_names(manifest_file: str) -> Optional[Set[str]]:
+        """
+        :param manifest_file: The path to the registry's manifest, e.g. {"hello_world.hocon": true}
+        :return: The names of the agent networks the manifest activates, or None if it can't be read
+        """
+        with LAZY_IMPORT_LOCK:
+            # pylint: disable=import-outside-toplevel
+            from pyhocon import ConfigFactory
+            from pyhocon import ConfigTree
+
+        try:
+            manifest = ConfigFactory.parse_file(manifest_file, resolve=False)
+        # pylint: disable=broad-exception-caught
+        except Exception as exception:
+            print(f"Error reading {manifest_file}: {exception}")
+            return None
+        served_names = set()
+        for key, value in manifest.items():
+            # pyhocon keeps the quotes of the quoted keys, and splits the unquoted ones on dots
+            name = key.strip('"')
+            if isinstance(value, ConfigTree) and not name.endswith(".hocon"):
+                value = value.get('"hocon"', value.get("hocon", None))
+                name = f"{name}.hocon"
+            if name.endswith(".hocon") and value is True:
+                served_names.add(name[:-len(".hocon")])
+        return served_names
+
+    def read_all_metadata(self, hocon_files: List[str]) -> List[Dict[str, Any]]:
+        """
+        :param hocon_files: The paths to the .hocon files
+        :return: The metadata of each file, in a pool of processes when there are enough of them
+        """
+        if len(hocon_files) < MIN_FILES_PER_POOL or self.max_workers == 1:
+            return [read_agent_metadata(hocon_file) for hocon_file in hocon_files]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(read_agent_metadata, hocon_files, chunksize=4))
+
+    def run_watcher(self, sleep: Callable[[float], Any], interval_in_seconds: float):
+        """
+        Refreshes the index forever
+        :param sleep: The sleep function to wait with, e.g. socketio.sleep
+        :param interval_in_seconds: The time between two refreshes
+        """
+        while True:
+            sleep(interval_in_seconds)
+            try:
+                changed = self.refresh()
+                if changed:
+                    print(f"Agent registry changed: {', '.join(changed)}")
+            # pylint: disable=broad-exception-caught
+            except Exception as exception:
+                # Keep watching
+                print(f"Error refreshing the agent registry index: {exception}")
+
+    def get(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """
+        :param agent_name: The name of an agent network, e.g. industry/telco_network_support
+        :return: Its metadata, or None if there is no such agent network in the registry
+        """
+        return self.entries.get(agent_name)
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        :param query: The text to look for in the agent network names, case-insensitively
+        :param limit: The maximum number of agent networks to return
+        :return: The metadata of the matching agent networks, those whose name starts with the query first
+        """
+        with self.lock:
+            entries = self.entries
+            sorted_names = self.sorted_names
+        query = query.strip().lower()
+        names = []
+        # Prefix matches, straight from the sorted names
+        index = bisect_left(sorted_names, (query, ""))
+        while index < len(sorted_names) and len(names) < limit and sorted_names[index][0].startswith(query):
+            names.append(sorted_names[index][1])
+            index += 1
+        # Then the names containing the query elsewhere, e.g. after their directory
+        if len(names) < limit:
+            for lower_name, name in sorted_names:
+                if query in lower_name and not lower_name.startswith(query):
+                    names.append(name)
+                    if len(names) >= limit:
+                        break
+        return [entries[name] for name in names]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def read_agent_metadata(hocon_file: str) -> Dict[str, Any]:
+    """
+    Reads the metadata of an agent network. A module-level function, to run in a pool of processes.
+    :param hocon_file: The path to the .hocon file of the agent network
+    :return: Its number of tools, front man and description, or the error that prevented reading them
+    """
+    # pylint: disable=import-outside-toplevel
+    from pyhocon import ConfigFactory
+    from pyhocon import ConfigTree
+
+    try:
+        agent_data = ConfigFactory.parse_file(hocon_file, resolve=False)
+    # pylint: disable=broad-exception-caught
+    except Exception as exception:
+        return {"tools": 0, "front_man": None, "description": "", "error": str(exception)}
+    tools = agent_data.get("tools", [])
+    front_man = tools[0] if tools else ConfigTree()
+    # The network's own description if any, otherwise the front man's
+    description = agent_data.get("metadata.description", None) or \
+        front_man.get("function", ConfigTree()).get("description", "")
+    description = " ".join(str(description).split())
+    if len(description) > MAX_DESCRIPTION_LENGTH:
+        description = description[:MAX_DESCRIPTION_LENGTH - 1] + "…"
+    return {"tools": len(tools), "front_man": front_man.get("name", None), "description": description}
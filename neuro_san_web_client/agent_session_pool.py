@@ -0,0 +1,186 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Tuple
+
+from neuro_san.interfaces.agent_session import AgentSession
+
+from neuro_san_web_client.original_modules import LAZY_IMPORT_LOCK
+
+# (host, port, agent_name)
+PoolKey = Tuple[str, int, str]
+
+
+class AgentSessionPool:
+    """
+    Shares the neuro-san agent sessions between the users talking to the same agent network
+    on the same server, instead of creating a new session for every Socket.IO connection.
+    Agent sessions don't hold any conversation state: each user keeps its own state.
+
+    Sessions are keyed by (host, port, agent_name). The pool keeps at most max_size sessions,
+    evicting the least recently used idle ones first. Sessions nobody used for idle_timeout_in_seconds
+    are evicted, and sessions idle for more than health_check_interval_in_seconds are checked
+    against the server before being handed out again.
+
+    acquire() hands out the pool entry of the session, which the user gives back to release():
+    a session evicted while in use may be replaced by a new one under the same key,
+    and its users must not release the new one.
+    Reusing a session saves creating it, not connections: neuro-san's HTTP sessions
+    open a new connection for each request, see benchmarks/agent_session_pool_benchmark.py.
+    """
+
+    def __init__(self, max_size: int = 64, idle_timeout_in_seconds: float = 300.0,
+                 health_check_interval_in_seconds: float = 60.0, connect_timeout_in_seconds: float = 10.0):
+        """
+        Constructor
+        :param max_size: The maximum number of agent sessions in the pool
+        :param idle_timeout_in_seconds: The time after which a session nobody uses is evicted
+        :param health_check_interval_in_seconds: The idle time after which a session is checked before reuse
+        :param connect_timeout_in_seconds: The connection timeout of the agent sessions
+        """
+        self.max_size: int = max_size
+        self.idle_timeout_in_seconds: float = idle_timeout_in_seconds
+        self.health_check_interval_in_seconds: float = health_check_interval_in_seconds
+        self.connect_timeout_in_seconds: float = connect_timeout_in_seconds
+        # Key -> {"session": AgentSession, "users": number of users, "last_used": monotonic time}
+        # Ordered from least to most recently used.
+        self.entries: OrderedDict[PoolKey, Dict[str, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+        # Created on first use, as it pulls in the whole neuro-san client stack
+        self.session_factory = None
+
+    def acquire(self, host: str, port: int, agent_name: str) -> Dict[str, Any]:
+        """
+        Gets an agent session for an agent network, reusing a pooled one if possible.
+        Each call must be matched by a call to release() when the user no longer needs the session.
+        :param host: The host of the neuro-san server
+        :param port: The port of the neuro-san server
+        :param agent_name: The name of the agent network
+        :return: The pool entry of the agent session, to give back to release(). Its "session" is the agent session.
+        """
+        key: PoolKey = (host, port, agent_name)
+        self.evict_idle()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            needs_health_check = entry is not None and entry["users"] == 0 and \
+                time.monotonic() - entry["last_used"] > self.health_check_interval_in_seconds
+            if entry is not None and not needs_health_check:
+                return self.check_out(key, entry)
+
+        if needs_health_check and self.is_healthy(entry["session"]):
+            with self.lock:
+                if self.entries.get(key) is entry:
+                    return self.check_out(key, entry)
+
+        # No usable session in the pool: create a new one outside the lock, as it may connect to the server
+        agent_session = self.get_session_factory().create_session(
+            session_type="http",
+            agent_name=agent_name,
+            hostname=host,
+            port=port,
+            connect_timeout_in_seconds=self.connect_timeout_in_seconds)
+        with self.lock:
+            previous = self.entries.get(key)
+            if previous is not None and previous is not entry:
+                # Another user created a session for this key in the meantime: use that one
+                return self.check_out(key, previous)
+            self.entries.pop(key, None)
+            entry = {"session": agent_session, "users": 0, "last_used": time.monotonic()}
+            self.entries[key] = entry
+            entry = self.check_out(key, entry)
+            self.evict()
+        return entry
+
+    def get_session_factory(self):
+        """
+        :return: The factory of the agent sessions, created on first use
+        """
+        if self.session_factory is None:
+            with LAZY_IMPORT_LOCK:
+                # pylint: disable=import-outside-toplevel
+                from neuro_san.client.agent_session_factory import AgentSessionFactory
+            self.session_factory = AgentSessionFactory()
+        return self.session_factory
+
+    def release(self, entry: Dict[str, Any]):
+        """
+        Tells the pool a user no longer needs its agent session
+        :param entry: The pool entry returned by acquire(), whether the session is still pooled or was evicted
+        """
+        with self.lock:
+            if entry["users"] > 0:
+                entry["users"] -= 1
+                entry["last_used"] = time.monotonic()
+
+    def check_out(self, key: PoolKey, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Marks a pooled session as used by one more user. Must be called with the lock held.
+        :return: The pool entry
+        """
+        self.entries.move_to_end(key)
+        entry["users"] += 1
+        entry["last_used"] = time.monotonic()
+        return entry
+
+    def evict(self):
+        """
+        Evicts sessions until the pool is within its maximum size: the least recently used idle sessions first,
+        then the least recently used ones. Users of an evicted session keep using it, it's simply not shared anymore.
+        Must be called with the lock held.
+        """
+        while len(self.entries) > self.max_size:
+            idle_key = next((key for key, entry in self.entries.items() if entry["users"] == 0), None)
+            if idle_key is not None:
+                self.entries.pop(idle_key)
+            else:
+                self.entries.popitem(last=False)
+
+    def evict_idle(self):
+        """
+        Evicts the sessions nobody has used for idle_timeout_in_seconds
+        """
+        now = time.monotonic()
+        with self.lock:
+            idle_keys = [key for key, entry in self.entries.items()
+                         if entry["users"] == 0 and now - entry["last_used"] > self.idle_timeout_in_seconds]
+            for key in idle_keys:
+                del self.entries[key]
+
+    @staticmethod
+    def is_healthy(agent_session: AgentSession) -> bool:
+        """
+        Checks that the server still answers on an agent session
+        :param agent_session: The agent session to check
+        :return: True if the server answered, False otherwise
+        """
+        try:
+            agent_session.function({})
+            return True
+        # pylint: disable=broad-exception-caught
+        except Exception as exception:
+            print(f"Agent session failed its health check: {exception}")
+            return False
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        :return: The number of sessions in the pool, and how many are currently used
+        """
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "in_use": sum(1 for entry in self.entries.values() if entry["users"] > 0)
+            }
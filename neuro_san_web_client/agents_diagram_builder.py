@@ -10,14 +10,111 @@
 from pathlib import Path
 
 import argparse
+import hashlib
+import json
 import os
-
-from pyhocon import ConfigFactory
-from pyvis.network import Network
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from neuro_san_web_client.layered_layout import LayeredLayout
+from neuro_san_web_client.metrics import DIAGRAM_BUILD_SECONDS
+from neuro_san_web_client.original_modules import LAZY_IMPORT_LOCK
+
+# pyvis, jinja and pyhocon are imported on first use: the web client only needs pyhocon, once a graph is requested,
+# and only the standalone html diagrams need pyvis and jinja
+if TYPE_CHECKING:
+    from jinja2 import Environment
+    from pyvis.network import Network
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 PATH_TO_STATIC = os.path.join(ROOT_DIR, 'static')
 
+PYVIS_TEMPLATE_NAME = "template.html"
+# The javascript libraries the pyvis page refers to with relative paths
+PYVIS_LIBRARIES = ["bindings", "tom-select", "vis-9.1.2"]
+LIBRARIES_LOCK = threading.Lock()
+TEMPLATE_ENVIRONMENT = None
+TEMPLATE_ENVIRONMENT_LOCK = threading.Lock()
+# Name of the file listing the diagrams built from a registry, in the output directory
+MANIFEST_FILE_NAME = "diagram_manifest.json"
+# The manifest of a neuro-san registry lists the served agent networks, it is not an agent network itself
+REGISTRY_MANIFEST_FILE_NAME = "manifest.hocon"
+# Node labels longer than that are shortened in the JSON graph
+MAX_LABEL_LENGTH = 32
+
+# Center the graph by adding custom styles
+CENTERED_STYLE = """
+    <style>
+      #mynetwork {
+          width: 100%;
+          background-color: #222222;
+          border: 1px solid lightgray;
+          position: relative;
+      }
+
+      body, html {
+          margin: 0;
+          padding: 0;
+          overflow: hidden;  /* Prevent scrollbars in the iframe */
+          width: 100%;
+          height: 100%;
+      }
+
+      .vis-network {
+          display: flex;
+          justify-content: center;  /* Center horizontally */
+          align-items: center;      /* Center vertically */
+      }
+    </style>
+"""
+
+# Highlight the agent whose name is posted by the main page
+HIGHLIGHT_SCRIPT = """
+    <script type="text/javascript">
+        // Colors of the most recently highlighted agents, the current one first. The older ones fade out.
+        const highlightColors = ['#ff6347', '#f2876f', '#d9a9a7'];
+        // The ids of the highlighted nodes, the most recent first, and their colors before being highlighted
+        let highlightedAgents = [];
+        const defaultColors = {};
+
+        window.addEventListener('message', function(event) {
+            if (event.data && event.data.agentName) {
+                const agentName = event.data.agentName;
+
+                // Directly compare agent name with the node ID
+                const matchingNode = nodes.get(agentName);
+                if (!matchingNode || highlightedAgents[0] === agentName) {
+                    return;
+                }
+
+                // Only update the previously highlighted nodes and the new one
+                if (!(agentName in defaultColors)) {
+                    defaultColors[agentName] = matchingNode.color || '#97c2fc';
+                }
+                const updates = [];
+                highlightedAgents = highlightedAgents.filter(id => id !== agentName);
+                highlightedAgents.unshift(agentName);
+                if (highlightedAgents.length > highlightColors.length) {
+                    const oldestAgent = highlightedAgents.pop();
+                    updates.push({ id: oldestAgent, color: defaultColors[oldestAgent] });
+                }
+                highlightedAgents.forEach((id, index) => updates.push({ id: id, color: highlightColors[index] }));
+                nodes.update(updates);
+            }
+        });
+    </script>
+"""
+
 
 class DiagramBuilder:
     """
@@ -47,13 +144,96 @@ class DiagramBuilder:
 
         return agent_graph
 
+    @staticmethod
+    def create_graph_data(agent_graph) -> Dict[str, Any]:
+        """
+        Creates a compact version of the agent graph, for the browser to draw:
+        the nodes with their id, a short label and their precomputed x/y position,
+        flagging the agents that are referenced but not defined, and the edges as [from, to] pairs.
+        :param agent_graph: The agent graph, as returned by parse_agent_definitions
+        :return: A dictionary with "nodes" and "edges" lists
+        """
+        node_names, missing_nodes, edges = DiagramBuilder.get_nodes_and_edges(agent_graph)
+        positions = DiagramBuilder.compute_layout(node_names, edges)
+        nodes = []
+        for node_name in node_names:
+            x, y = positions[node_name]
+            node = {"id": node_name, "label": DiagramBuilder.shorten_label(node_name), "x": x, "y": y}
+            if node_name in missing_nodes:
+                node["missing"] = True
+            nodes.append(node)
+        return {"nodes": nodes, "edges": [[from_node, to_node] for from_node, to_node in edges]}
+
+    @staticmethod
+    def get_nodes_and_edges(agent_graph) -> Tuple[List[str], Set[str], List[Tuple[str, str]]]:
+        """
+        :param agent_graph: The agent graph, as returned by parse_agent_definitions
+        :return: A tuple containing the names of all the nodes, the agents first,
+                 the names of the agents that are referenced but not defined,
+                 and the (from, to) edges
+        """
+        node_names = list(agent_graph)
+        missing_nodes = set()
+        edges = []
+        for agent_name, agent_data in agent_graph.items():
+            for connection in agent_data["connections"]:
+                if connection not in agent_graph and connection not in missing_nodes:
+                    # This tool/agent does not exist in agent_graph
+                    missing_nodes.add(connection)
+                    node_names.append(connection)
+                edges.append((agent_name, connection))
+        return node_names, missing_nodes, edges
+
+    @staticmethod
+    def compute_layout(node_names: List[str], edges: List[Tuple[str, str]]) -> Dict[str, Tuple[float, float]]:
+        """
+        Computes a layered layout of the agent network, the front man at the top,
+        so that the browser does not have to place thousands of nodes itself.
+        :param node_names: The names of the nodes, the front man first
+        :param edges: The (from, to) edges
+        :return: A dictionary of node name -> (x, y) position
+        """
+        with DIAGRAM_BUILD_SECONDS.time("layout"):
+            return LayeredLayout().compute(node_names, edges)
+
+    @staticmethod
+    def shorten_label(agent_name) -> str:
+        """
+        :return: The agent name, shortened to MAX_LABEL_LENGTH characters
+        """
+        agent_name = str(agent_name)
+        if len(agent_name) <= MAX_LABEL_LENGTH:
+            return agent_name
+        return agent_name[:MAX_LABEL_LENGTH - 1] + "\u2026"
+
     @staticmethod
     def create_interactive_agent_graph(agent_graph, output_html):
+        with DIAGRAM_BUILD_SECONDS.time("pyvis_build"):
+            net = DiagramBuilder.build_network(agent_graph)
+            # Render the page in memory, with the centering style and the highlight script already included
+            html_content = DiagramBuilder.render_html(net)
+
+        # Write it once
+        with DIAGRAM_BUILD_SECONDS.time("file_write"):
+            output_dir = os.path.dirname(os.path.abspath(output_html))
+            DiagramBuilder.copy_pyvis_libraries(output_dir)
+            DiagramBuilder.write_atomically(output_html, html_content)
+
+    @staticmethod
+    def build_network(agent_graph) -> "Network":
+        with LAZY_IMPORT_LOCK:
+            # pylint: disable=import-outside-toplevel
+            from pyvis.network import Network
+
         # Initialize a pyvis network graph
         net = Network(height="750px", width="100%", bgcolor="#222222",
                       font_color="white", directed=True)
 
-        # Step 2: Keep track of which nodes have already been added
+        # Step 2: Place the nodes, so that the browser only has to draw them
+        node_names, _, edges = DiagramBuilder.get_nodes_and_edges(agent_graph)
+        positions = DiagramBuilder.compute_layout(node_names, edges)
+
+        # Keep track of which nodes have already been added
         existing_nodes = set()
 
         # Add all known agent nodes to the pyvis network
@@ -64,7 +244,8 @@ class DiagramBuilder:
                 f"Class: {agent_data['info']['class']}<br>"
                 f"Command: {agent_data['info']['command']}<br>"
             )
-            net.add_node(agent_name, title=hover_text, label=agent_name)
+            x, y = positions[agent_name]
+            net.add_node(agent_name, title=hover_text, label=agent_name, x=x, y=y)
             existing_nodes.add(agent_name)
 
         # Step 3: Add all edges (and create missing nodes in a different color)
@@ -80,13 +261,14 @@ class DiagramBuilder:
 
                     # Create a missing node if it hasn't been added yet
                     if connection not in existing_nodes:
-                        net.add_node(connection, label=connection, color="green")
+                        x, y = positions[connection]
+                        net.add_node(connection, label=connection, color="green", x=x, y=y)
                         existing_nodes.add(connection)
 
                     # Add edge from agent_name to the newly created/missing node
                     net.add_edge(agent_name, connection)
 
-        # Disable hierarchical layout and physics for free node movement
+        # The nodes are already placed: disable physics, and let the user move them freely
         net.set_options("""
          {
            "physics": {
@@ -102,77 +284,113 @@ class DiagramBuilder:
            "autoResize": true
          }
          """)
+        return net
 
-        # Save the interactive network to an HTML file
-        net.save_graph(output_html)
-
-        # Inject CSS to center the graph when used in an iframe
-        with open(output_html, 'r') as file:
-            html_content = file.read()
-
-        # Center the graph by adding custom styles
-        centered_style = """
-            <style>
-              #mynetwork {
-                  width: 100%;
-                  background-color: #222222;
-                  border: 1px solid lightgray;
-                  position: relative;
-              }
-
-              body, html {
-                  margin: 0;
-                  padding: 0;
-                  overflow: hidden;  /* Prevent scrollbars in the iframe */
-                  width: 100%;
-                  height: 100%;
-              }
-
-              .vis-network {
-                  display: flex;
-                  justify-content: center;  /* Center horizontally */
-                  align-items: center;      /* Center vertically */
-              }
-            </style>
-        """
-        custom_script = """
-    <script type="text/javascript">
-        window.addEventListener('message', function(event) {
-            if (event.data && event.data.agentName) {
-                const agentName = event.data.agentName;
+    @staticmethod
+    def get_pyvis_templates_dir() -> str:
+        """
+        :return: The directory of the templates and javascript libraries installed with pyvis
+        """
+        with LAZY_IMPORT_LOCK:
+            # pylint: disable=import-outside-toplevel
+            import pyvis
+        return os.path.join(os.path.dirname(os.path.abspath(pyvis.__file__)), 'templates')
 
-                // Directly compare agent name with the node ID
-                const matchingNode = nodes.get().find(node => node.id === agentName);
+    @staticmethod
+    def get_template_environment() -> "Environment":
+        """
+        :return: A jinja environment serving the pyvis page template, with the centering style
+                 and the highlight script injected once, when the template is first loaded.
+        """
+        with LAZY_IMPORT_LOCK:
+            # pylint: disable=import-outside-toplevel
+            from jinja2 import Environment
+            from jinja2 import FunctionLoader
 
-                if (matchingNode) {
-                    // Reset the color of all nodes to default
-                    nodes.forEach(function(node) {
-                        nodes.update({ id: node.id, color: '#97c2fc' });
-                    });
+        global TEMPLATE_ENVIRONMENT
+        with TEMPLATE_ENVIRONMENT_LOCK:
+            if TEMPLATE_ENVIRONMENT is None:
+                TEMPLATE_ENVIRONMENT = Environment(loader=FunctionLoader(DiagramBuilder.load_template))
+        return TEMPLATE_ENVIRONMENT
 
-                    // Highlight the matched node
-                    nodes.update({ id: matchingNode.id, color: '#ff6347' });
-                }
-            }
-        });
-    </script>
+    @staticmethod
+    def load_template(template_name: str) -> str:
         """
+        Loads a pyvis page template and injects the custom style and script into it.
+        :param template_name: The name of the pyvis template file
+        :return: The template source
+        """
+        with open(os.path.join(DiagramBuilder.get_pyvis_templates_dir(), template_name), 'r',
+                  encoding='utf-8') as file:
+            template_source = file.read()
+        # Center the graph when used in an iframe, and highlight the agents that send messages
+        template_source = template_source.replace("</head>", f"{CENTERED_STYLE}</head>")
+        template_source = template_source.replace("</body>", f"{HIGHLIGHT_SCRIPT}</body>")
+        return template_source
 
-        # Inject the custom style to center the graph in the iframe
-        html_content = html_content.replace("</head>", f"{centered_style}</head>")
-        html_content = html_content.replace("</body>", f"{custom_script}</body>")
+    @staticmethod
+    def render_html(net: "Network") -> str:
+        """
+        Renders the html page of a pyvis network in memory.
+        :param net: The pyvis network
+        :return: The html page, as a string
+        """
+        # Use the pre-parsed template that already contains the custom style and script
+        net.templateEnv = DiagramBuilder.get_template_environment()
+        net.path = PYVIS_TEMPLATE_NAME
+        return net.generate_html()
 
-        # Write the modified content back to the HTML file
-        with open(output_html, 'w') as file:
-            file.write(html_content)
+    @staticmethod
+    def copy_pyvis_libraries(output_dir: str):
+        """
+        Copies the javascript libraries the pyvis page refers to with relative paths next to the page,
+        if they are not there yet. This is what pyvis does in the current directory when saving a graph,
+        without changing the current directory of the whole process.
+        :param output_dir: The directory the html page is written to
+        """
+        with LIBRARIES_LOCK:
+            for library in PYVIS_LIBRARIES:
+                library_dir = os.path.join(output_dir, "lib", library)
+                if not os.path.exists(library_dir):
+                    shutil.copytree(os.path.join(DiagramBuilder.get_pyvis_templates_dir(), "lib", library),
+                                    library_dir, dirs_exist_ok=True)
+
+    @staticmethod
+    def write_atomically(output_file: str, content: str):
+        """
+        Writes a file in one go: readers either see the previous version of the file or the new one,
+        never a partially written one, even when several builds of the same file run at the same time.
+        :param output_file: The path to the file to write
+        :param content: The content of the file
+        """
+        output_dir = os.path.dirname(os.path.abspath(output_file))
+        file_descriptor, temp_file = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+                file.write(content)
+            # mkstemp creates owner-only files: use the usual permissions of a static file
+            os.chmod(temp_file, 0o644)
+            os.replace(temp_file, output_file)
+        except BaseException:
+            os.remove(temp_file)
+            raise
+
+    @staticmethod
+    def load_agent_graph(hocon_file):
+        with LAZY_IMPORT_LOCK:
+            # pylint: disable=import-outside-toplevel
+            from pyhocon import ConfigFactory
 
-    def create_agent_diagram_from_hocon(self, hocon_file, output_html=None):
         # Load the HOCON configuration
         # Do not resolve substitutions like aaosa_instructions as the includes are relative to the hocon directory.
-        agent_data = ConfigFactory.parse_file(hocon_file, resolve=False)
+        with DIAGRAM_BUILD_SECONDS.time("hocon_parse"):
+            agent_data = ConfigFactory.parse_file(hocon_file, resolve=False)
 
         # Parse the agents and tools from the HOCON data
-        agent_graph = self.parse_agent_definitions(agent_data)
+        return DiagramBuilder.parse_agent_definitions(agent_data)
+
+    def create_agent_diagram_from_hocon(self, hocon_file, output_html=None):
+        agent_graph = self.load_agent_graph(hocon_file)
 
         # Create an interactive agent graph and save it as a web page
         if output_html is None:
@@ -188,16 +406,101 @@ class DiagramBuilder:
         if not abs_output_html.startswith(abs_static_dir + os.sep):
             raise Exception(f"Invalid output path: {abs_output_html} is outside the static directory.")
 
-        cwd = os.getcwd()
+        # Create the sub-directories if they do not exist
+        os.makedirs(os.path.dirname(abs_output_html), exist_ok=True)
+        self.create_interactive_agent_graph(agent_graph, abs_output_html)
+
+    @staticmethod
+    def find_registry_diagrams(registry_dir: str, output_dir: str) -> List[Tuple[str, str, str]]:
+        """
+        Lists the agent networks of a registry and the diagrams to build for them
+        :param registry_dir: The directory containing the agent network .hocon files, in sub-directories or not
+        :param output_dir: The directory to build the diagrams in, with the same sub-directories
+        :return: A list of (agent network name, .hocon file, .html file) tuples
+        """
+        diagrams = []
+        for dir_path, _, file_names in os.walk(registry_dir):
+            for file_name in sorted(file_names):
+                if not file_name.endswith(".hocon") or file_name == REGISTRY_MANIFEST_FILE_NAME:
+                    continue
+                hocon_file = os.path.join(dir_path, file_name)
+                # e.g. industry/telco_network_support
+                agent_name = Path(os.path.relpath(hocon_file, registry_dir)).with_suffix("").as_posix()
+                diagrams.append((agent_name, hocon_file, os.path.join(output_dir, f"{agent_name}.html")))
+        return diagrams
+
+    @staticmethod
+    def is_up_to_date(hocon_file: str, output_html: str) -> bool:
+        """
+        :return: True if the diagram exists and is newer than its .hocon file
+        """
         try:
-            static_dir = os.path.dirname(abs_output_html)
-            # Create the sub-directories if they do not exist
-            os.makedirs(static_dir, exist_ok=True)
-            # Go to the static directory to create the graph there
-            os.chdir(static_dir)
-            self.create_interactive_agent_graph(agent_graph, str(abs_output_html))
-        finally:
-            os.chdir(cwd)
+            return os.path.getmtime(output_html) >= os.path.getmtime(hocon_file)
+        except OSError:
+            return False
+
+    @staticmethod
+    def get_file_hash(file_path: str) -> str:
+        """
+        :return: The SHA-256 of a file's content, as a hex string
+        """
+        with open(file_path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def create_agent_diagrams_from_registry(self, registry_dir: str, output_dir: str = PATH_TO_STATIC,
+                                            max_workers: Optional[int] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Builds the diagrams of all the agent networks of a registry in parallel, skipping the diagrams
+        that are newer than their .hocon file, and writes a manifest of the diagrams in the output directory.
+        :param registry_dir: The directory containing the agent network .hocon files
+        :param output_dir: The directory to build the diagrams in
+        :param max_workers: The number of processes building diagrams. Defaults to the number of CPUs.
+        :param force: Rebuild all the diagrams, even the up-to-date ones
+        :return: The manifest
+        """
+        start = time.perf_counter()
+        output_dir = os.path.abspath(output_dir)
+        diagrams = self.find_registry_diagrams(registry_dir, output_dir)
+        to_build = [(hocon_file, output_html) for _, hocon_file, output_html in diagrams
+                    if force or not self.is_up_to_date(hocon_file, output_html)]
+
+        # Prepare the output directories once, so that the workers don't race to create them
+        for output_html_dir in sorted({os.path.dirname(output_html) for _, output_html in to_build}):
+            os.makedirs(output_html_dir, exist_ok=True)
+            self.copy_pyvis_libraries(output_html_dir)
+
+        errors: Dict[str, Optional[str]] = {}
+        if to_build:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(build_registry_diagram, *zip(*to_build))
+                for (hocon_file, _), error in zip(to_build, results):
+                    errors[hocon_file] = error
+
+        manifest_diagrams = {}
+        for agent_name, hocon_file, output_html in diagrams:
+            entry = {
+                "source": os.path.abspath(hocon_file),
+                "source_sha256": self.get_file_hash(hocon_file),
+                "output": os.path.relpath(output_html, output_dir),
+                "status": "up_to_date" if hocon_file not in errors else "built",
+            }
+            if errors.get(hocon_file) is not None:
+                entry["status"] = "failed"
+                entry["error"] = errors[hocon_file]
+            else:
+                entry["output_sha256"] = self.get_file_hash(output_html)
+            manifest_diagrams[agent_name] = entry
+
+        manifest = {
+            "registry_dir": os.path.abspath(registry_dir),
+            "diagrams": manifest_diagrams
+        }
+        self.write_atomically(os.path.join(output_dir, MANIFEST_FILE_NAME), json.dumps(manifest, indent=2))
+
+        statuses = [entry["status"] for entry in manifest_diagrams.values()]
+        print(f"{statuses.count('built')} diagrams built, {statuses.count('up_to_date')} up to date, "
+              f"{statuses.count('failed')} failed in {time.perf_counter() - start:.2f}s")
+        return manifest
 
     def parse_args(self):
         """
@@ -207,18 +510,52 @@ class DiagramBuilder:
             description="Builds a .html file containing an interactive agent network diagram "
                         "from a .hocon file containing agent definitions and connections."
         )
-        arg_parser.add_argument("-i", "--input_file", type=str, default=None, required=True,
-                                help="Path to the input .hocon file containing the agent network definition")
+        input_group = arg_parser.add_mutually_exclusive_group(required=True)
+        input_group.add_argument("-i", "--input_file", type=str, default=None,
+                                 help="Path to the input .hocon file containing the agent network definition")
+        input_group.add_argument("-r", "--registry_dir", type=str, default=None,
+                                 help="Path to a registry directory: builds the diagrams of all the .hocon files "
+                                      "it contains, in parallel")
         arg_parser.add_argument("-o", "--output_file", type=str, default=None, required=False,
                                 help="Path to the file to generate: an .html file that will contain the interactive"
                                      " agent network diagram. If not specified, the output file will be saved"
                                      "in the 'static' folder with the same name as the input file and .html extension.")
+        arg_parser.add_argument("--output_dir", type=str, default=PATH_TO_STATIC, required=False,
+                                help="With --registry_dir, the directory to build the diagrams in. "
+                                     "Defaults to the 'static' folder.")
+        arg_parser.add_argument("--workers", type=int, default=None, required=False,
+                                help="With --registry_dir, the number of processes building diagrams. "
+                                     "Defaults to the number of CPUs.")
+        arg_parser.add_argument("--force", action="store_true",
+                                help="With --registry_dir, rebuild all the diagrams, even the up-to-date ones")
         self.args = arg_parser.parse_args()
 
     def main(self):
         self.parse_args()
-        self.create_agent_diagram_from_hocon(hocon_file=self.args.input_file,
-                                             output_html=self.args.output_file)
+        if self.args.registry_dir is not None:
+            self.create_agent_diagrams_from_registry(registry_dir=self.args.registry_dir,
+                                                     output_dir=self.args.output_dir,
+                                                     max_workers=self.args.workers,
+                                                     force=self.args.force)
+        else:
+            self.create_agent_diagram_from_hocon(hocon_file=self.args.input_file,
+                                                 output_html=self.args.output_file)
+
+
+def build_registry_diagram(hocon_file: str, output_html: str) -> Optional[str]:
+    """
+    Builds one diagram in a worker process of a registry build
+    :param hocon_file: The path to the .hocon file
+    :param output_html: The path to the .html file to build
+    :return: None if the diagram was built, the error message otherwise
+    """
+    try:
+        agent_graph = DiagramBuilder.load_agent_graph(hocon_file)
+        DiagramBuilder.create_interactive_agent_graph(agent_graph, output_html)
+        return None
+    # pylint: disable=broad-exception-caught
+    except Exception as exception:
+        return f"{type(exception).__name__}: {exception}"
 
 
 if __name__ == '__main__':
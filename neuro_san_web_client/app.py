@@ -7,33 +7,80 @@
 # Purchase of a commercial license is mandatory for any use of the
 # neuro-san-web-client SDK Software in commercial settings.
 #
-import argparse
 import os
+
+# 'eventlet': Flask-SocketIO on eventlet's green threads, the default.
+# 'asgi': python-socketio's AsyncServer under uvicorn, with the agent calls in a bounded pool of threads.
+SERVER_MODE = os.getenv("NEURO_SAN_WEB_CLIENT_SERVER_MODE", "eventlet")
+SERVER_MODES = ['eventlet', 'asgi']
+if SERVER_MODE not in SERVER_MODES:
+    raise ValueError(f"NEURO_SAN_WEB_CLIENT_SERVER_MODE must be one of {SERVER_MODES}, not {SERVER_MODE!r}")
+if __name__ == '__main__' and SERVER_MODE == 'eventlet':
+    # Only when running the server in that mode: importing this module, e.g. from the tests or the tools,
+    # leaves the interpreter as it is. This is the eventlet branch of __main__, but it must come before
+    # any other import: eventlet can't patch the locks and sockets the imported modules already created.
+    import eventlet
+    # Patch the standard library so that blocking calls to the neuro-san server
+    # (sockets, locks, sleeps) yield to other green threads instead of stalling the hub.
+    eventlet.monkey_patch()
+
+import argparse
+import atexit
+import importlib
+import logging
+import logging.handlers
+import queue
+import sys
 import threading
-from pathlib import Path
+import time
+import uuid
 from typing import Any
 from typing import Dict
 
 from flask import Flask
+from flask import abort
+from flask import jsonify
 from flask import redirect
 from flask import render_template
 from flask import request
 from flask import session
 from flask import url_for
 from flask_socketio import SocketIO
-from neuro_san.client.agent_session_factory import AgentSessionFactory
-from neuro_san.client.streaming_input_processor import StreamingInputProcessor
 
 from neuro_san_web_client.agent_log_processor import AgentLogProcessor
-from neuro_san_web_client.agents_diagram_builder import DiagramBuilder
-
-# Initialize a lock
-user_sessions_lock = threading.Lock()
-user_sessions = {}
+from neuro_san_web_client.agent_registry_index import AgentRegistryIndex
+from neuro_san_web_client.agent_session_pool import AgentSessionPool
+from neuro_san_web_client.conversation_state_store_factory import ConversationStateStoreFactory
+from neuro_san_web_client.diagram_cache import DiagramCache
+from neuro_san_web_client.metrics import ABANDONED_TURNS
+from neuro_san_web_client.metrics import ACTIVE_USER_SESSIONS
+from neuro_san_web_client.metrics import IN_FLIGHT_TURNS
+from neuro_san_web_client.metrics import METRICS_REGISTRY
+from neuro_san_web_client.metrics import PROCESS_ONCE_SECONDS
+from neuro_san_web_client.original_modules import LAZY_IMPORT_LOCK
+from neuro_san_web_client.response_stream_processor import ResponseStreamProcessor
+from neuro_san_web_client.thinking_buffer_processor import ThinkingBufferProcessor
+from neuro_san_web_client.thinking_file_processor import ThinkingFileProcessor
+from neuro_san_web_client.turn_cancellation_processor import TurnCancellationProcessor
+from neuro_san_web_client.turn_cancelled_error import TurnCancelledError
+from neuro_san_web_client.turn_queue import TURN_POLICIES
+from neuro_san_web_client.turn_queue import TurnQueue
+from neuro_san_web_client.turn_trace_recorder import TurnTraceRecorder
+from neuro_san_web_client.turn_trace_store import TurnTraceStore
+from neuro_san_web_client.user_session_store import UserSessionStore
+from neuro_san_web_client.wire_format import WIRE_FORMATS
+from neuro_san_web_client.wire_format import WireFormat
+from neuro_san_web_client.worker_launcher import WorkerLauncher
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'  # Replace with a secure key
-socketio = SocketIO(app, async_mode='eventlet')
+if SERVER_MODE == 'asgi':
+    # Only needed, and only imported, in that mode
+    from neuro_san_web_client.async_socketio_bridge import AsyncSocketIOBridge
+    socketio = AsyncSocketIOBridge(app)
+else:
+    # Attached to the app once the configuration is known, e.g. its message queue
+    socketio = SocketIO(async_mode='eventlet')
 
 # Default configuration
 DEFAULT_CONFIG = {
@@ -43,14 +90,135 @@ DEFAULT_CONFIG = {
     'web_client_port': 5001,
     'connect_timeout_in_seconds': 10,
     'default_agent_name': 'industry/telco_network_support',
-    'thinking_file': '/tmp/agent_thinking.txt',
-    'thinking_dir': '/tmp'
+    'max_concurrent_turns': 32,
+    'diagram_cache_max_entries': 128,
+    'diagram_cache_max_bytes': 64 * 1024 * 1024,
+    'stream_responses': True,
+    'metrics': True,
+    'agent_log_batch_size': 32,
+    'agent_log_flush_interval_in_seconds': 0.05,
+    # How the agent logs and responses are sent to the browser: 'text', 'compact' (agent names sent once
+    # and referred to by ids, logs formatted by the browser) or 'msgpack' (compact, in binary frames)
+    'wire_format': 'text',
+    'agent_session_pool_max_size': 64,
+    'agent_session_idle_timeout_in_seconds': 300,
+    'agent_session_health_check_interval_in_seconds': 60,
+    'max_user_sessions': 1000,
+    # What to do with a message arriving while a turn of the same user is running: 'queue' it,
+    # up to turn_queue_max_depth waiting messages, 'reject' it, or 'coalesce': cancel the running turn
+    'turn_queue_policy': 'queue',
+    'turn_queue_max_depth': 4,
+    'user_session_idle_timeout_in_seconds': 3600,
+    'user_sessions_max_bytes': 512 * 1024 * 1024,
+    'user_session_sweep_interval_in_seconds': 30,
+    # Where the agent network's "thinking" goes: 'none', 'memory' (a bounded buffer per session,
+    # readable at /thinking/<sid>) or 'file' (a file per session in thinking_dir, written asynchronously)
+    'thinking_sink': 'memory',
+    'thinking_buffer_max_entries': 1000,
+    'thinking_buffer_max_bytes': 256 * 1024,
+    'thinking_dir': '/tmp',
+    # The browser keeps that many agent log lines on display, older ones stay downloadable
+    'agent_log_max_lines': 5000,
+    # Number of turn traces kept, of all the users, for the waterfall and the exports. 0 disables tracing.
+    'trace_max_turns': 200,
+    'trace_max_messages': 10000,
+    # Maximum estimated memory of the turn traces kept, in bytes: the oldest traces are dropped beyond that
+    'trace_max_bytes': 64 * 1024 * 1024,
+    'max_chat_messages': 500,
+    # Number of worker processes, on consecutive ports. More than one requires a message queue.
+    'workers': 1,
+    # URL of the message queue the workers share to emit to each other's clients, e.g. redis://localhost:6379/0
+    'message_queue': None,
+    # Where the conversation states are kept: 'none', 'memory', 'sqlite:///<path>' or 'redis://...'.
+    # Each page load starts a new conversation: a store only lets a user resume it on another connection.
+    'session_store': 'none',
+    'session_store_ttl_in_seconds': 86400,
+    # Maximum total size of the conversation states kept by the 'memory' store, in bytes
+    'session_store_max_bytes': 64 * 1024 * 1024,
+    # Time between two checks of the agent registry for added, changed or removed agent networks
+    'registry_poll_interval_in_seconds': 5,
+    # Number of processes parsing the agent networks when building the registry index. The number of CPUs if None.
+    'registry_index_workers': None,
+    # Load the neuro-san client, pre-build the default agent network's diagram and check the default server answers
+    # before /ready reports ready
+    'warm_up': False,
+    # Flask's debug mode: the reloader and the interactive debugger, which runs any code the browser sends.
+    # Only for development, on a machine nobody else can reach.
+    'debug': False
 }
+THINKING_SINKS = ['none', 'memory', 'file']
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 PATH_TO_STATIC = os.path.join(ROOT_DIR, 'static')
 # Path to where the agent network hocon files live, e.g. the neuro-san-studio registries
 # Adjust to your local setup as needed
-PATH_TO_NEURO_SAN_REGISTRIES = os.path.join(ROOT_DIR, '../../neuro-san-studio/registries')
+PATH_TO_NEURO_SAN_REGISTRIES = os.getenv("NEURO_SAN_WEB_CLIENT_REGISTRY_DIR",
+                                         os.path.join(ROOT_DIR, '../../neuro-san-studio/registries'))
+
+# Set once the web client is ready to serve its first turn without delay, see /ready
+ready = threading.Event()
+
+# The objects shared by the users, built from the configuration by configure() before the server starts
+# Bounds the number of agent turns processed at the same time across all users
+turn_slots = None
+# Only re-parses the agent networks whose .hocon file changed
+diagram_cache = None
+# How the agent logs and responses are sent to the browser
+wire_format = None
+# Lists the agent networks of the registry, built at startup and kept up to date by a watcher
+agent_registry_index = None
+# Shares the agent sessions between the users talking to the same agent network
+agent_session_pool = None
+# The user sessions, keyed by Socket.IO session ID
+user_session_store = None
+# The timing of the agents' messages in the most recent turns
+turn_trace_store = None
+# Keeps the conversation states, possibly shared with the other workers
+conversation_state_store = None
+
+
+def configure(config: Dict[str, Any]):
+    """
+    Builds the objects shared by the users from the configuration. Called once, before the server starts.
+    :param config: The configuration of the web client, as returned by parse_args()
+    """
+    # pylint: disable=global-statement
+    global turn_slots, diagram_cache, wire_format, agent_registry_index, agent_session_pool, \
+        user_session_store, turn_trace_store, conversation_state_store
+
+    # Store config in Flask app for later use
+    # Items can be accessed anywhere in Flask routes e.g. using app.config['server_host']
+    app.config.update(config)
+    METRICS_REGISTRY.enabled = config["metrics"]
+    turn_slots = threading.BoundedSemaphore(config["max_concurrent_turns"])
+    diagram_cache = DiagramCache(max_entries=config["diagram_cache_max_entries"],
+                                 max_total_bytes=config["diagram_cache_max_bytes"])
+    wire_format = WireFormat(config["wire_format"])
+    # The diagrams of the agent networks that change are dropped from the cache
+    agent_registry_index = AgentRegistryIndex(config["registry_dir"],
+                                              max_workers=config["registry_index_workers"],
+                                              on_change=lambda hocon_file: diagram_cache.invalidate(hocon_file))
+    agent_session_pool = AgentSessionPool(
+        max_size=config["agent_session_pool_max_size"],
+        idle_timeout_in_seconds=config["agent_session_idle_timeout_in_seconds"],
+        health_check_interval_in_seconds=config["agent_session_health_check_interval_in_seconds"],
+        connect_timeout_in_seconds=DEFAULT_CONFIG["connect_timeout_in_seconds"])
+    # Its lock only guards the sessions map, it is never held during an agent call
+    user_session_store = UserSessionStore(
+        max_sessions=config["max_user_sessions"],
+        idle_timeout_in_seconds=config["user_session_idle_timeout_in_seconds"],
+        max_total_bytes=config["user_sessions_max_bytes"],
+        on_evict=lambda sid, user_session: release_user_session(user_session, reason="evicted"),
+        is_busy=lambda user_session: user_session["turn_queue"].is_busy())
+    ACTIVE_USER_SESSIONS.set_function(lambda: len(user_session_store))
+    ABANDONED_TURNS.set_function(lambda: TurnQueue.get_stats()["abandoned_turns_running"])
+    turn_trace_store = TurnTraceStore(max_traces=config["trace_max_turns"],
+                                      max_total_bytes=config["trace_max_bytes"])
+    conversation_state_store = ConversationStateStoreFactory.create_store(
+        config["session_store"],
+        ttl_in_seconds=config["session_store_ttl_in_seconds"],
+        max_entries=config["max_user_sessions"],
+        max_total_bytes=config["session_store_max_bytes"])
+
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -58,24 +226,73 @@ def index():
         # Update configuration based on user input
         session['server_host'] = request.form.get('host', app.config.get('server_host'))
         session['server_port'] = int(request.form.get('port', app.config.get('server_port')))
-        session['agent_name'] = request.form.get('agent_name', app.config.get('default_agent_name'))
+        agent_name = request.form.get('agent_name', app.config.get('default_agent_name')).strip()
+        # Without a local registry, the agent networks of the server can't be checked: accept any name
+        if agent_registry_index.is_available() and agent_registry_index.get(agent_name) is None:
+            session['config_error'] = f"Unknown agent network: {agent_name}"
+            return redirect(url_for('index'))
+        session['agent_name'] = agent_name
         # Initialize agent session with new config
         session['agent_session'] = None
-        # Generate the HTML diagram for that agent
-        diagram_builder = DiagramBuilder()
-        agent_hocon = f"{session['agent_name']}.hocon"
-        hocon_input_path = PATH_TO_NEURO_SAN_REGISTRIES / Path(agent_hocon)
-        agent_html = f"{session['agent_name']}.html"
-        html_output_path = PATH_TO_STATIC / Path(agent_html)
-        diagram_builder.create_agent_diagram_from_hocon(hocon_file=hocon_input_path,
-                                                        output_html=html_output_path)
+        # The page fetches the agent network diagram from /api/graph/<agent_name>
         # Redirect to the index page to avoid form resubmission messages on refresh
         return redirect(url_for('index'))
 
+    # Identifies the browser across page loads: only it can read the traces and the thinking of its turns
+    session.setdefault('client_id', uuid.uuid4().hex)
+    # Each page load starts a new conversation. A connection moving to another worker resumes it.
+    session['conversation_id'] = uuid.uuid4().hex
     return render_template('index.html',
                            agent_name=session.get('agent_name', app.config.get('default_agent_name')),
                            host=session.get('server_host', app.config['server_host']),
-                           port=session.get('server_port', app.config['server_port']))
+                           port=session.get('server_port', app.config['server_port']),
+                           config_error=session.pop('config_error', None),
+                           wire_format=wire_format.name,
+                           agent_log_max_lines=app.config.get('agent_log_max_lines',
+                                                              DEFAULT_CONFIG['agent_log_max_lines']),
+                           max_chat_messages=app.config.get('max_chat_messages', DEFAULT_CONFIG['max_chat_messages']))
+
+
+@app.route('/api/graph/<path:agent_name>')
+def agent_graph(agent_name):
+    """
+    :param agent_name: The name of the agent network, e.g. industry/telco_network_support
+    :return: The graph of the agent network as compact JSON, for the page to draw.
+             Answers 304 Not Modified when the browser already has the current version.
+    """
+    # Only the agent networks of the index, which were found in the registry, are read from the disk
+    entry = agent_registry_index.get(agent_name)
+    if entry is None:
+        abort(404)
+    key = DiagramCache.make_cache_key(entry["path"], entry["mtime_ns"], entry["size"])
+    payload, etag = diagram_cache.get_graph(entry["path"], key=key)
+    response = app.response_class(payload, mimetype='application/json')
+    response.set_etag(etag)
+    # Let the browser keep the graph, but revalidate it each time with its ETag
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@app.route('/agents')
+def agents():
+    """
+    Looks agent networks up by name, for the typeahead of the agent name field, without touching the disk
+    Query parameters:
+    - q: the text to look for in the names, case-insensitively. All the agent networks if empty.
+    - limit: the maximum number of agent networks to return, 20 by default
+    :return: The matching agent networks as JSON, those whose name starts with q first
+    """
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    matches = agent_registry_index.search(query, limit=limit)
+    return jsonify({
+        "available": agent_registry_index.is_available(),
+        "agents": [{"name": entry["name"],
+                    "tools": entry["tools"],
+                    "description": entry["description"],
+                    "served": entry["served"],
+                    "error": entry.get("error")} for entry in matches]
+    })
 
 
 # noinspection PyUnresolvedReferences
@@ -87,27 +304,107 @@ def handle_user_input(data):
     sid = request.sid
 
     # Retrieve or initialize user-specific data
-    with user_sessions_lock:
-        user_session = user_sessions.get(sid)
-        if not user_session:
-            # No session found: create a new one
-            user_session = create_user_session(sid)
-            user_sessions[sid] = user_session
-
-        input_processor = user_session["input_processor"]
-        state = user_session["state"]
-        # Update user input in state
-        state["user_input"] = user_input
-
-        print("========== Processing user message ==========")
-        # Calling the processor updates the state
-        state = input_processor.process_once(state)
-
-        # This is now the users' new state
-        user_session['state'] = state
-
-        # Start a background task to display the agent's response
-        last_chat_response = state.get("last_chat_response")
+    user_session = user_session_store.get(sid)
+    if not user_session:
+        # No session found: create a new one outside the store's lock, as it may connect to the server
+        new_user_session = create_user_session(sid)
+        # Another message from the same user may have created the session in the meantime
+        user_session = user_session_store.set_default(sid, new_user_session)
+        if user_session is not new_user_session:
+            release_user_session(new_user_session)
+
+    # Turns from the same user are processed one at a time, in order, as decided by the turn queue's policy.
+    # Turns from different users run in parallel, up to max_concurrent_turns at once.
+    turn_queue = user_session["turn_queue"]
+    turn = turn_queue.admit()
+    if SERVER_MODE == 'asgi':
+        # Wait for the previous turns of the user on the event loop, without holding a thread of the pool
+        return socketio.continue_after(turn_queue.wait_async(turn), process_user_input,
+                                       user_session, turn, user_input)
+    turn_queue.wait(turn)
+    return process_user_input(user_session, turn, user_input)
+
+
+def process_user_input(user_session: Dict[str, Any], turn: Dict[str, Any], user_input: str):
+    """
+    Processes a message of the user, once its turn is ready
+    :param user_session: The user session
+    :param turn: The turn of the message, admitted by the turn queue of the user session
+    :param user_input: The message
+    """
+    sid = request.sid
+    turn_queue = user_session["turn_queue"]
+    trace_recorder = user_session["trace_recorder"]
+    # The trace of this turn, once started: the running turn of the user has its own
+    trace_id = None
+    turn_queue.start(turn)
+    try:
+        if turn["cancelled"] is not None:
+            # Rejected, superseded while waiting, or the user disconnected: don't wait for a turn slot
+            raise TurnCancelledError(turn["cancelled"])
+        with turn_slots:
+            if turn["cancelled"] is not None:
+                # Cancelled while waiting for a turn slot
+                raise TurnCancelledError(turn["cancelled"])
+            input_processor = user_session["input_processor"]
+            state = user_session["state"]
+            response_stream_processor = user_session["response_stream_processor"]
+            # Update user input in state
+            state["user_input"] = user_input
+
+            print("========== Processing user message ==========")
+            if response_stream_processor is not None:
+                response_stream_processor.reset()
+            if trace_recorder is not None:
+                trace_id = trace_recorder.start_turn()
+            # Calling the processor updates the state.
+            # It raises TurnCancelledError at the next message once the turn is cancelled.
+            with IN_FLIGHT_TURNS.track_in_progress(), PROCESS_ONCE_SECONDS.time():
+                state = input_processor.process_once(state)
+            # Send the agent logs still buffered before the response
+            user_session["agent_log_processor"].flush()
+            if trace_recorder is not None:
+                # Let the page fetch the waterfall of the turn
+                trace_recorder.end_turn(trace_id, "completed")
+                socketio.emit('turn_trace', {'id': trace_id}, room=sid)
+
+            # This is now the users' new state
+            user_session['state'] = state
+            # Measured here, while no turn of this user modifies it, for the memory bound of the sessions
+            user_session_store.record_size(sid, estimate_user_session_size(user_session))
+            if conversation_state_store is not None:
+                # Share it with the other workers, in case the user's next connection lands on one of them
+                conversation_state_store.set(user_session['conversation_id'], state)
+            if response_stream_processor is not None:
+                time_to_first_chunk = response_stream_processor.get_time_to_first_chunk()
+                if time_to_first_chunk is not None:
+                    print(f"Time to first response chunk: {time_to_first_chunk:.3f}s")
+    except TurnCancelledError as error:
+        reason = str(error)
+        print(f"Turn not processed: {reason}")
+        if trace_id is not None:
+            trace_recorder.end_turn(trace_id, reason)
+        if reason != "disconnected":
+            # Let the user know this message won't be answered
+            socketio.emit('turn_status', {'status': reason, 'message': user_input}, room=sid)
+        return
+    # pylint: disable=broad-exception-caught
+    except Exception:
+        if trace_id is not None:
+            # Unless it already ended
+            trace_recorder.end_turn(trace_id, "failed")
+        # Let the user know this message won't be answered, then let the server log the error
+        socketio.emit('turn_status', {'status': 'failed', 'message': user_input}, room=sid)
+        raise
+    finally:
+        turn_queue.leave(turn)
+
+    # Start a background task to display the agent's response
+    last_chat_response = state.get("last_chat_response")
+    if SERVER_MODE == 'asgi':
+        # In the bridge's timer pool, instead of a new thread per turn
+        socketio.call_later(0, background_response_handler, last_chat_response, sid)
+    else:
         socketio.start_background_task(target=background_response_handler, chat_response=last_chat_response, sid=sid)
 
 
@@ -115,21 +412,47 @@ def create_user_session(sid):
     host = session.get('server_host', app.config['server_host'])
     port = session.get('server_port', app.config['server_port'])
     agent_name = session.get('agent_name', app.config.get('default_agent_name'))
-    timeout = DEFAULT_CONFIG["connect_timeout_in_seconds"]
-    session_factory = AgentSessionFactory()
-    agent_session = session_factory.create_session(session_type="http",
-                                                   agent_name=agent_name,
-                                                   hostname=host,
-                                                   port=port,
-                                                   connect_timeout_in_seconds=timeout)
+    # The agent session is shared with the other users of this agent network. The conversation state is not.
+    agent_session_entry = agent_session_pool.acquire(host, port, agent_name)
+    # Imported on first use, or by the warm-up, as it pulls in the neuro-san client stack
+    with LAZY_IMPORT_LOCK:
+        # pylint: disable=import-outside-toplevel
+        from neuro_san.client.streaming_input_processor import StreamingInputProcessor
+    # The thinking of each session is handled by the thinking processor below, not by a shared file on disk
     input_processor = StreamingInputProcessor(default_input="",
-                                              thinking_file=DEFAULT_CONFIG["thinking_file"],
-                                              session=agent_session,
-                                              thinking_dir=DEFAULT_CONFIG["thinking_dir"])
+                                              thinking_file=None,
+                                              session=agent_session_entry["session"],
+                                              thinking_dir=None)
+    # First, stop the turn if it was cancelled, before the other processors handle the message
+    turn_queue = TurnQueue(
+        max_depth=app.config.get('turn_queue_max_depth', DEFAULT_CONFIG['turn_queue_max_depth']),
+        policy=app.config.get('turn_queue_policy', DEFAULT_CONFIG['turn_queue_policy']))
+    input_processor.processor.add_processor(TurnCancellationProcessor(turn_queue))
+    # Then timestamp it, before the other processors spend time on it
+    trace_recorder = None
+    if app.config.get('trace_max_turns', DEFAULT_CONFIG['trace_max_turns']) > 0:
+        # Clients that never loaded the page have no client ID: nobody can read their traces
+        trace_recorder = TurnTraceRecorder(
+            turn_trace_store, session.get('client_id'), agent_name,
+            max_messages=app.config.get('trace_max_messages', DEFAULT_CONFIG['trace_max_messages']))
+        input_processor.processor.add_processor(trace_recorder)
+    thinking_processor = create_thinking_processor(sid)
+    if thinking_processor is not None:
+        input_processor.processor.add_processor(thinking_processor)
     # Add a processor to handle agent logs
     # and to highlight the agents that respond in the agent network diagram
-    agent_log_processor = AgentLogProcessor(socketio, sid)
+    agent_log_processor = AgentLogProcessor(
+        socketio, sid,
+        max_batch_size=app.config.get('agent_log_batch_size', DEFAULT_CONFIG['agent_log_batch_size']),
+        flush_interval_in_seconds=app.config.get('agent_log_flush_interval_in_seconds',
+                                                 DEFAULT_CONFIG['agent_log_flush_interval_in_seconds']),
+        wire_format=wire_format)
     input_processor.processor.add_processor(agent_log_processor)
+    # Add a processor to send the response to the UI as it arrives, before the end of the turn
+    response_stream_processor = None
+    if app.config.get('stream_responses', DEFAULT_CONFIG['stream_responses']):
+        response_stream_processor = ResponseStreamProcessor(socketio, sid, wire_format=wire_format)
+        input_processor.processor.add_processor(response_stream_processor)
 
     # Note: If nothing is specified the server assumes the chat_filter_type
     #       should be "MINIMAL", however for this client which is aimed at
@@ -141,46 +464,251 @@ def create_user_session(sid):
         "chat_filter_type": "MAXIMAL"
     }
 
-    # Initialize the state for the user session
-    state: Dict[str, Any] = {
-        "last_chat_response": None,
-        "num_input": 0,
-        "chat_filter": chat_filter,
-        "sly_data": {},
-    }
+    # Resume the conversation if it started on another connection, possibly to another worker.
+    # Clients that never loaded the page have no conversation ID: their conversation is their connection.
+    conversation_id = session.get('conversation_id', sid)
+    state: Dict[str, Any] = None
+    if conversation_state_store is not None:
+        state = conversation_state_store.get(conversation_id)
+    if state is None:
+        # Initialize the state for the user session
+        state = {
+            "last_chat_response": None,
+            "num_input": 0,
+            "chat_filter": chat_filter,
+            "sly_data": {},
+        }
 
     # Create the user session
     user_session = {
         'input_processor': input_processor,
-        'state': state
+        # Given back to the pool as is: the pool may hold another session for the same agent network by then
+        'agent_session_entry': agent_session_entry,
+        'state': state,
+        'conversation_id': conversation_id,
+        'client_id': session.get('client_id'),
+        'agent_log_processor': agent_log_processor,
+        'response_stream_processor': response_stream_processor,
+        'thinking_processor': thinking_processor,
+        # Serializes the turns of this user only
+        'turn_queue': turn_queue,
+        'trace_recorder': trace_recorder
     }
     return user_session
 
 
+def estimate_user_session_size(user_session: Dict[str, Any]) -> int:
+    """
+    Estimates the memory of a user session, for the memory bound of the sessions.
+    Must be called while no turn of the user modifies its state, e.g. at the end of a turn.
+    :param user_session: The user session
+    :return: The estimated memory of its state and of its thinking kept in memory, if any, in bytes
+    """
+    size = UserSessionStore.estimate_size(user_session['state'])
+    if isinstance(user_session['thinking_processor'], ThinkingBufferProcessor):
+        size += user_session['thinking_processor'].get_size()
+    return size
+
+
+def create_thinking_processor(sid):
+    """
+    Creates the processor that keeps the agent network's "thinking" for a user session,
+    depending on the thinking_sink configuration
+    :param sid: The Socket.IO session ID
+    :return: The thinking processor, or None if thinking is disabled
+    """
+    thinking_sink = app.config.get('thinking_sink', DEFAULT_CONFIG['thinking_sink'])
+    if thinking_sink == 'memory':
+        return ThinkingBufferProcessor(
+            max_entries=app.config.get('thinking_buffer_max_entries', DEFAULT_CONFIG['thinking_buffer_max_entries']),
+            max_bytes=app.config.get('thinking_buffer_max_bytes', DEFAULT_CONFIG['thinking_buffer_max_bytes']))
+    if thinking_sink == 'file':
+        thinking_dir = app.config.get('thinking_dir', DEFAULT_CONFIG['thinking_dir'])
+        # Socket.IO session IDs are URL-safe, so they can't escape the thinking directory
+        return ThinkingFileProcessor(os.path.join(thinking_dir, f"agent_thinking_{sid}.txt"))
+    return None
+
+
 # noinspection PyUnresolvedReferences
 @socketio.on('disconnect')
 def handle_disconnect():
     sid = request.sid
-    with user_sessions_lock:
-        if sid in user_sessions:
-            del user_sessions[sid]
+    user_session = user_session_store.pop(sid)
+    if user_session is not None:
+        release_user_session(user_session)
     print(f"Client disconnected: {sid}")
 
 
+def release_user_session(user_session: Dict[str, Any], reason: str = "disconnected"):
+    """
+    Releases the resources of a user session that was removed from the store.
+    Its turns are cancelled, and nothing but their turn_status is sent to the user anymore.
+    Its input processor is garbage collected once a turn still in flight, if any, stops.
+    :param user_session: The user session
+    :param reason: Why it was removed: "disconnected", or "evicted" from the store while the user is still connected
+    """
+    user_session['turn_queue'].close(reason)
+    user_session['agent_log_processor'].close()
+    if user_session['response_stream_processor'] is not None:
+        user_session['response_stream_processor'].close()
+    if user_session['thinking_processor'] is not None:
+        # Frees the thinking kept in memory, or deletes the thinking file
+        user_session['thinking_processor'].close()
+    # Give the agent session back to the pool
+    agent_session_pool.release(user_session['agent_session_entry'])
+
+
+@app.route('/thinking/<sid>')
+def thinking(sid):
+    """
+    :param sid: The Socket.IO session ID of the user, who must have loaded the page in the same browser
+    :return: The agent network's thinking for that user, as plain text, when kept in memory
+    """
+    user_session = user_session_store.get(sid)
+    if user_session is None or not isinstance(user_session['thinking_processor'], ThinkingBufferProcessor):
+        abort(404)
+    if user_session['client_id'] is None or user_session['client_id'] != session.get('client_id'):
+        # Someone else's thinking
+        abort(404)
+    return user_session['thinking_processor'].get_thinking(), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+@app.route('/ready')
+def readiness():
+    """
+    :return: 200 once the web client is ready to serve turns, after the warm-up if enabled, 503 before
+    """
+    if not ready.is_set():
+        return jsonify({"ready": False}), 503
+    return jsonify({"ready": True})
+
+
+def warm_up(config: Dict[str, Any]):
+    """
+    Prepares the first turn of the default agent network, then reports the web client ready:
+    loads the neuro-san client, builds the graph of the default agent network and checks the default server answers.
+    The web client is reported ready even if a step fails, e.g. when the neuro-san server is not up yet.
+    :param config: The configuration of the web client
+    """
+    start = time.perf_counter()
+    agent_name = config["default_agent_name"]
+    try:
+        with LAZY_IMPORT_LOCK:
+            importlib.import_module("neuro_san.client.streaming_input_processor")
+        entry = agent_registry_index.get(agent_name)
+        if entry is not None:
+            diagram_cache.get_graph(entry["path"],
+                                    key=DiagramCache.make_cache_key(entry["path"], entry["mtime_ns"], entry["size"]))
+        # Checks that the server answers. The pooled session is then handed to the first user.
+        agent_session_entry = agent_session_pool.acquire(config["server_host"], config["server_port"], agent_name)
+        try:
+            if not AgentSessionPool.is_healthy(agent_session_entry["session"]):
+                print(f"Warm-up could not reach the neuro-san server at "
+                      f"{config['server_host']}:{config['server_port']}")
+        finally:
+            agent_session_pool.release(agent_session_entry)
+    # pylint: disable=broad-exception-caught
+    except Exception as exception:
+        print(f"Warm-up failed: {exception}")
+    print(f"Warm-up took {time.perf_counter() - start:.3f}s")
+    ready.set()
+
+
+@app.route('/stats')
+def stats():
+    """
+    :return: The memory and resource usage of the web client, as JSON
+    """
+    return jsonify({
+        "user_sessions": user_session_store.get_stats(),
+        "agent_session_pool": agent_session_pool.get_stats(),
+        "turns": TurnQueue.get_stats(),
+        "turn_traces": turn_trace_store.get_stats()
+    })
+
+
+@app.route('/traces')
+def traces():
+    """
+    Query parameters:
+    - limit: the maximum number of traces to list, 50 by default
+    :return: The summaries of the most recent turn traces of the caller's browser, as JSON, the most recent first
+    """
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+    return jsonify({"traces": turn_trace_store.get_summaries(session.get('client_id'), limit=limit)})
+
+
+@app.route('/traces/<trace_id>')
+def turn_trace(trace_id):
+    """
+    :param trace_id: The ID of a turn trace of the caller's browser
+    :return: The trace as JSON: the times of the messages, the spans of the agents and their stats
+    """
+    trace = turn_trace_store.get(trace_id, session.get('client_id'))
+    if trace is None:
+        abort(404)
+    return jsonify(trace)
+
+
+@app.route('/traces/<trace_id>/chrome')
+def turn_trace_chrome(trace_id):
+    """
+    :param trace_id: The ID of a turn trace of the caller's browser
+    :return: The trace in the Chrome trace event format, to open in chrome://tracing or Perfetto
+    """
+    trace = turn_trace_store.get(trace_id, session.get('client_id'))
+    if trace is None:
+        abort(404)
+    response = jsonify(TurnTraceStore.to_chrome_trace(trace))
+    response.headers['Content-Disposition'] = f'attachment; filename="turn_trace_{trace_id}.json"'
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    """
+    :return: The metrics of the web client, in the Prometheus text format
+    """
+    if not METRICS_REGISTRY.enabled:
+        abort(404)
+    return METRICS_REGISTRY.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
 def background_response_handler(chat_response: str, sid):
-        socketio.emit('agent_response', {'message': chat_response}, room=sid)
+        socketio.emit('agent_response', wire_format.encode({'message': chat_response}), room=sid)
 
 
-def clear_thinking_file():
-    # Clear out the previous thinking file
-    #
-    # Incorrectly flagged as destination of Path Traversal 5
-    # Reason: thinking_file was previously checked with FileOfClass.check_file()
-    #         which actually does the path traversal check. CheckMarx does not
-    #         recognize pathlib as a valid library with which to resolve these kinds
-    #         of issues.
-    with open(DEFAULT_CONFIG['thinking_file'], "w", encoding="utf-8") as thinking:
-        thinking.write("\n")
+def setup_queued_logging() -> logging.handlers.QueueListener:
+    """
+    Sends the log records of the web client to stdout from a listener thread,
+    so that logging an agent message never blocks the thread processing the turn.
+    :return: The started queue listener
+    """
+    log_queue = queue.SimpleQueue()
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stdout_handler)
+    web_client_logger = logging.getLogger("neuro_san_web_client")
+    web_client_logger.setLevel(logging.INFO)
+    web_client_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    # The records are already written by the listener
+    web_client_logger.propagate = False
+    listener.start()
+    # Write the remaining records on exit
+    atexit.register(listener.stop)
+    return listener
+
+
+def get_bool_env(name: str, default: bool) -> bool:
+    """
+    :param name: The name of an environment variable
+    :param default: The value to use if the environment variable is not set
+    :return: True if the environment variable is set to "true", "1" or "yes", False otherwise
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("true", "1", "yes")
 
 
 def parse_args():
@@ -208,6 +736,152 @@ def parse_args():
     parser.add_argument('--default-agent-name', type=str,
                         default=os.getenv("NEURO_SAN_DEFAULT_AGENT_NAME", DEFAULT_CONFIG['default_agent_name']),
                         help="Agent name for the session")
+    parser.add_argument('--max-concurrent-turns', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_MAX_CONCURRENT_TURNS",
+                                              DEFAULT_CONFIG['max_concurrent_turns'])),
+                        help="Maximum number of agent turns processed in parallel across all users")
+    parser.add_argument('--diagram-cache-max-entries', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_DIAGRAM_CACHE_MAX_ENTRIES",
+                                              DEFAULT_CONFIG['diagram_cache_max_entries'])),
+                        help="Maximum number of agent network graphs kept in memory")
+    parser.add_argument('--diagram-cache-max-bytes', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_DIAGRAM_CACHE_MAX_BYTES",
+                                              DEFAULT_CONFIG['diagram_cache_max_bytes'])),
+                        help="Maximum total size in bytes of the agent network graphs kept in memory")
+    parser.add_argument('--stream-responses', action=argparse.BooleanOptionalAction,
+                        default=get_bool_env("NEURO_SAN_WEB_CLIENT_STREAM_RESPONSES",
+                                             DEFAULT_CONFIG['stream_responses']),
+                        help="Send the agent's response to the browser as it arrives, before the end of the turn")
+    parser.add_argument('--metrics', action=argparse.BooleanOptionalAction,
+                        default=get_bool_env("NEURO_SAN_WEB_CLIENT_METRICS", DEFAULT_CONFIG['metrics']),
+                        help="Record metrics and serve them at /metrics, in the Prometheus text format")
+    parser.add_argument('--agent-log-batch-size', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_AGENT_LOG_BATCH_SIZE",
+                                              DEFAULT_CONFIG['agent_log_batch_size'])),
+                        help="Number of buffered agent messages that triggers sending them to the browser")
+    parser.add_argument('--agent-log-flush-interval-in-seconds', type=float,
+                        default=float(os.getenv("NEURO_SAN_WEB_CLIENT_AGENT_LOG_FLUSH_INTERVAL_IN_SECONDS",
+                                                DEFAULT_CONFIG['agent_log_flush_interval_in_seconds'])),
+                        help="Maximum time an agent message is buffered before being sent to the browser")
+    parser.add_argument('--wire-format', type=str, choices=WIRE_FORMATS,
+                        default=os.getenv("NEURO_SAN_WEB_CLIENT_WIRE_FORMAT", DEFAULT_CONFIG['wire_format']),
+                        help="How the agent logs and responses are sent to the browser: text, compact, "
+                             "with the agent names sent once and referred to by ids, or msgpack: compact and binary")
+    parser.add_argument('--agent-session-pool-max-size', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_AGENT_SESSION_POOL_MAX_SIZE",
+                                              DEFAULT_CONFIG['agent_session_pool_max_size'])),
+                        help="Maximum number of agent sessions shared between the users")
+    parser.add_argument('--agent-session-idle-timeout-in-seconds', type=float,
+                        default=float(os.getenv("NEURO_SAN_WEB_CLIENT_AGENT_SESSION_IDLE_TIMEOUT_IN_SECONDS",
+                                                DEFAULT_CONFIG['agent_session_idle_timeout_in_seconds'])),
+                        help="Time after which an agent session nobody uses is evicted from the pool")
+    parser.add_argument('--agent-session-health-check-interval-in-seconds', type=float,
+                        default=float(os.getenv("NEURO_SAN_WEB_CLIENT_AGENT_SESSION_HEALTH_CHECK_INTERVAL_IN_SECONDS",
+                                                DEFAULT_CONFIG['agent_session_health_check_interval_in_seconds'])),
+                        help="Idle time after which a pooled agent session is checked against the server before reuse")
+    parser.add_argument('--max-user-sessions', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_MAX_USER_SESSIONS",
+                                              DEFAULT_CONFIG['max_user_sessions'])),
+                        help="Maximum number of user sessions. The least recently used one is evicted beyond that")
+    parser.add_argument('--user-session-idle-timeout-in-seconds', type=float,
+                        default=float(os.getenv("NEURO_SAN_WEB_CLIENT_USER_SESSION_IDLE_TIMEOUT_IN_SECONDS",
+                                                DEFAULT_CONFIG['user_session_idle_timeout_in_seconds'])),
+                        help="Time without any message after which a user session is evicted")
+    parser.add_argument('--user-sessions-max-bytes', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_USER_SESSIONS_MAX_BYTES",
+                                              DEFAULT_CONFIG['user_sessions_max_bytes'])),
+                        help="Maximum estimated memory of all the user sessions' states, in bytes")
+    parser.add_argument('--user-session-sweep-interval-in-seconds', type=float,
+                        default=float(os.getenv("NEURO_SAN_WEB_CLIENT_USER_SESSION_SWEEP_INTERVAL_IN_SECONDS",
+                                                DEFAULT_CONFIG['user_session_sweep_interval_in_seconds'])),
+                        help="Time between two sweeps of the idle and over the memory bound user sessions")
+    parser.add_argument('--thinking-sink', type=str, choices=THINKING_SINKS,
+                        default=os.getenv("NEURO_SAN_WEB_CLIENT_THINKING_SINK", DEFAULT_CONFIG['thinking_sink']),
+                        help="Where the agent network's thinking goes: nowhere, a bounded in-memory buffer "
+                             "per session, or a file per session written asynchronously")
+    parser.add_argument('--thinking-buffer-max-entries', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_THINKING_BUFFER_MAX_ENTRIES",
+                                              DEFAULT_CONFIG['thinking_buffer_max_entries'])),
+                        help="Maximum number of messages kept per session by the in-memory thinking sink")
+    parser.add_argument('--thinking-buffer-max-bytes', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_THINKING_BUFFER_MAX_BYTES",
+                                              DEFAULT_CONFIG['thinking_buffer_max_bytes'])),
+                        help="Maximum size of the messages kept per session by the in-memory thinking sink, "
+                             "counted in the memory bound of the user sessions")
+    parser.add_argument('--thinking-dir', type=str,
+                        default=os.getenv("NEURO_SAN_WEB_CLIENT_THINKING_DIR", DEFAULT_CONFIG['thinking_dir']),
+                        help="Directory of the per-session thinking files of the file thinking sink")
+    parser.add_argument('--agent-log-max-lines', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_AGENT_LOG_MAX_LINES",
+                                              DEFAULT_CONFIG['agent_log_max_lines'])),
+                        help="Maximum number of agent log lines the browser keeps on display, "
+                             "the older ones stay downloadable")
+    parser.add_argument('--max-chat-messages', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_MAX_CHAT_MESSAGES",
+                                              DEFAULT_CONFIG['max_chat_messages'])),
+                        help="Maximum number of chat messages the browser keeps on display")
+    parser.add_argument('--trace-max-turns', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_TRACE_MAX_TURNS",
+                                              DEFAULT_CONFIG['trace_max_turns'])),
+                        help="Number of turn traces kept, of all the users, for the waterfall and the exports. "
+                             "0 disables tracing.")
+    parser.add_argument('--trace-max-messages', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_TRACE_MAX_MESSAGES",
+                                              DEFAULT_CONFIG['trace_max_messages'])),
+                        help="Maximum number of messages listed in a turn trace. The spans count all of them.")
+    parser.add_argument('--trace-max-bytes', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_TRACE_MAX_BYTES",
+                                              DEFAULT_CONFIG['trace_max_bytes'])),
+                        help="Maximum estimated memory of the turn traces kept, in bytes. "
+                             "The oldest traces are dropped beyond that.")
+    parser.add_argument('--turn-queue-policy', type=str, choices=TURN_POLICIES,
+                        default=os.getenv("NEURO_SAN_WEB_CLIENT_TURN_QUEUE_POLICY",
+                                          DEFAULT_CONFIG['turn_queue_policy']),
+                        help="What to do with a message arriving while a turn of the same user is running: "
+                             "queue it, reject it, or coalesce: cancel the running turn and answer the latest message")
+    parser.add_argument('--turn-queue-max-depth', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_TURN_QUEUE_MAX_DEPTH",
+                                              DEFAULT_CONFIG['turn_queue_max_depth'])),
+                        help="Maximum number of messages of a user waiting for the running turn, with the queue policy")
+    parser.add_argument('--workers', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_WORKERS", DEFAULT_CONFIG['workers'])),
+                        help="Number of worker processes, listening on consecutive ports from --web-client-port. "
+                             "Put a reverse proxy with sticky routing in front of them.")
+    parser.add_argument('--message-queue', type=str,
+                        default=os.getenv("NEURO_SAN_WEB_CLIENT_MESSAGE_QUEUE", DEFAULT_CONFIG['message_queue']),
+                        help="URL of the message queue the workers share, e.g. redis://localhost:6379/0")
+    parser.add_argument('--session-store', type=str,
+                        default=os.getenv("NEURO_SAN_WEB_CLIENT_SESSION_STORE", DEFAULT_CONFIG['session_store']),
+                        help="Where the conversation states are kept, to resume a conversation on another connection: "
+                             "none, memory, sqlite:///<path> or redis://...")
+    parser.add_argument('--session-store-ttl-in-seconds', type=float,
+                        default=float(os.getenv("NEURO_SAN_WEB_CLIENT_SESSION_STORE_TTL_IN_SECONDS",
+                                                DEFAULT_CONFIG['session_store_ttl_in_seconds'])),
+                        help="Time after its last turn after which a conversation state is dropped from the store")
+    parser.add_argument('--session-store-max-bytes', type=int,
+                        default=int(os.getenv("NEURO_SAN_WEB_CLIENT_SESSION_STORE_MAX_BYTES",
+                                              DEFAULT_CONFIG['session_store_max_bytes'])),
+                        help="Maximum total size of the conversation states kept by the memory session store, "
+                             "in bytes")
+    parser.add_argument('--registry-dir', type=str, default=PATH_TO_NEURO_SAN_REGISTRIES,
+                        help="Directory of the agent network .hocon files, e.g. the neuro-san-studio registries")
+    parser.add_argument('--registry-poll-interval-in-seconds', type=float,
+                        default=float(os.getenv("NEURO_SAN_WEB_CLIENT_REGISTRY_POLL_INTERVAL_IN_SECONDS",
+                                                DEFAULT_CONFIG['registry_poll_interval_in_seconds'])),
+                        help="Time between two checks of the agent registry for changed agent networks")
+    parser.add_argument('--registry-index-workers', type=int,
+                        default=os.getenv("NEURO_SAN_WEB_CLIENT_REGISTRY_INDEX_WORKERS",
+                                          DEFAULT_CONFIG['registry_index_workers']),
+                        help="Number of processes parsing the agent networks when building the registry index. "
+                             "The number of CPUs by default.")
+    parser.add_argument('--warm-up', action=argparse.BooleanOptionalAction,
+                        default=get_bool_env("NEURO_SAN_WEB_CLIENT_WARM_UP", DEFAULT_CONFIG['warm_up']),
+                        help="Load the neuro-san client, build the default agent network's graph and connect "
+                             "to the default server before /ready reports ready")
+    parser.add_argument('--debug', action=argparse.BooleanOptionalAction,
+                        default=get_bool_env("NEURO_SAN_WEB_CLIENT_DEBUG", DEFAULT_CONFIG['debug']),
+                        help="Run the eventlet server in Flask's debug mode, with the reloader and the interactive "
+                             "debugger. Never on a reachable machine: the debugger runs any code it is sent.")
 
     args, _ = parser.parse_known_args()
 
@@ -218,13 +892,43 @@ def parse_args():
 
 if __name__ == '__main__':
     a_config = parse_args()
-    # Store config in Flask app for later use
-    # Items can be accessed anywhere in Flask routes e.g. using app.config['server_host']
-    app.config.update(a_config)
-    clear_thinking_file()
+    if a_config["workers"] > 1:
+        if not a_config["message_queue"]:
+            sys.exit("--message-queue is required with more than one worker")
+        if a_config["session_store"] in ('none', 'memory'):
+            print(f"Warning: with the {a_config['session_store']} session store, "
+                  "conversations are lost when users move to another worker")
+        WorkerLauncher(a_config["workers"], a_config["web_client_port"], sys.argv[1:]).run()
+        sys.exit(0)
+    configure(a_config)
+    if agent_registry_index.is_available():
+        agent_registry_index.refresh()
+        print(f"Agent registry {agent_registry_index.registry_dir}: {len(agent_registry_index)} agent networks")
+    else:
+        print(f"No agent registry at {agent_registry_index.registry_dir}: agent names are not checked")
+    if SERVER_MODE == 'asgi':
+        if a_config["message_queue"]:
+            socketio.set_message_queue(a_config["message_queue"])
+    else:
+        socketio.init_app(app, message_queue=a_config["message_queue"])
+    socketio.start_background_task(user_session_store.run_sweeper, socketio.sleep,
+                                   a_config["user_session_sweep_interval_in_seconds"])
+    socketio.start_background_task(agent_registry_index.run_watcher, socketio.sleep,
+                                   a_config["registry_poll_interval_in_seconds"])
+    if a_config["warm_up"]:
+        # Runs once the server is up: /ready reports ready when it is done
+        socketio.start_background_task(warm_up, a_config)
+    else:
+        ready.set()
+    setup_queued_logging()
     # Start the app with the parsed configuration
-    socketio.run(app,
-                 debug=True,
-                 allow_unsafe_werkzeug=True,
-                 host=a_config["web_client_host"],
-                 port=a_config["web_client_port"])
+    print(f"Server mode: {SERVER_MODE}")
+    if SERVER_MODE == 'asgi':
+        # One thread per turn in flight: the turns beyond max_concurrent_turns wait for a thread
+        socketio.max_workers = a_config["max_concurrent_turns"]
+        socketio.run(host=a_config["web_client_host"], port=a_config["web_client_port"])
+    else:
+        socketio.run(app,
+                     debug=a_config["debug"],
+                     host=a_config["web_client_host"],
+                     port=a_config["web_client_port"])
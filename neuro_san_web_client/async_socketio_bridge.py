@@ -0,0 +1,320 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import NamedTuple
+from typing import Set
+from typing import Tuple
+
+import socketio
+import uvicorn
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+# The events handled in their own pool of threads, so that they never wait behind the other events
+CONNECTION_EVENTS = ('connect', 'disconnect')
+# Number of threads running the functions scheduled with call_later()
+TIMER_WORKERS = 4
+
+
+class HandlerContinuation(NamedTuple):
+    """
+    Returned by an event handler to wait on the event loop, without holding a thread,
+    then run the rest of its work in a thread again. See AsyncSocketIOBridge.continue_after().
+    """
+    awaitable: Awaitable
+    function: Callable
+    args: Tuple
+
+
+class AsyncSocketIOBridge:
+    """
+    Serves the Flask app and its Socket.IO events with python-socketio's AsyncServer under an ASGI server,
+    without monkey patching the standard library.
+
+    It offers the part of the Flask-SocketIO interface the web client uses: on(), emit(), sleep(),
+    start_background_task() and run(), so that the event handlers and the message processors work unchanged,
+    and call_later() for the short delayed tasks, e.g. flushing the agent logs:
+    - The event handlers, which call the neuro-san server and block, run in a bounded pool of threads,
+      within a Flask request context built from the Socket.IO connection, with request.sid set.
+      A handler that must wait, e.g. for the previous turn of its user, returns continue_after()
+      to wait on the event loop instead of in a thread of the pool.
+    - Connections and disconnections are handled in a pool of their own: a disconnection cancels the turns
+      of its user, so it must never wait for a thread behind them.
+    - emit() can be called from any thread. It hands the message over to the event loop
+      and waits until it is queued, which slows down a turn producing messages faster than they are sent.
+    - The delayed tasks are timed by the event loop, then run in a small pool of threads of their own:
+      they neither start a thread each nor wait behind the turns.
+    - The Flask routes run in the threads of asgiref's WSGI adapter.
+    """
+
+    def __init__(self, app: Flask, max_workers: int = 32):
+        """
+        Constructor
+        :param app: The Flask app
+        :param max_workers: The maximum number of Socket.IO event handlers running at the same time.
+                            The events beyond that wait for a thread, without blocking the event loop.
+        """
+        self.app: Flask = app
+        self.max_workers: int = max_workers
+        # Event name -> handler registered by the app
+        self.handlers: Dict[str, Callable] = {}
+        self.server: socketio.AsyncServer = None
+        self.create_server()
+        # Socket.IO session ID -> WSGI environ of its connection, to rebuild the Flask request context
+        self.environs: Dict[str, Dict[str, Any]] = {}
+        self.loop: asyncio.AbstractEventLoop = None
+        self.executor: ThreadPoolExecutor = None
+        self.connection_executor: ThreadPoolExecutor = None
+        self.timer_executor: ThreadPoolExecutor = None
+        self.executor_lock = threading.Lock()
+        # The tasks created by emit() on the event loop, kept until they are done so they are not garbage collected
+        self.emit_tasks: Set[asyncio.Task] = set()
+
+    def create_server(self, client_manager: socketio.AsyncManager = None):
+        """
+        Creates the Socket.IO server and registers the event handlers on it
+        :param client_manager: The manager of the clients, e.g. to go through a message queue.
+                               The clients of this process only if None.
+        """
+        self.server = socketio.AsyncServer(async_mode='asgi', client_manager=client_manager)
+        self.server.on('connect', self.on_connect)
+        self.server.on('disconnect', self.on_disconnect)
+        for event in self.handlers:
+            self.register_handler(event)
+
+    def set_message_queue(self, url: str):
+        """
+        Sends the events through a message queue shared with the other workers,
+        so that any worker can emit to a client connected to another one.
+        Must be called before serving.
+        :param url: The URL of the message queue: redis://..., rediss://... or amqp://...
+        """
+        if url.startswith(("redis://", "rediss://")):
+            client_manager = socketio.AsyncRedisManager(url)
+        elif url.startswith("amqp://"):
+            client_manager = socketio.AsyncAioPikaManager(url)
+        else:
+            raise ValueError(f"Unsupported message queue {url!r} in asgi mode: expected redis:// or amqp://")
+        self.create_server(client_manager)
+
+    def on(self, event: str):
+        """
+        :param event: The name of the Socket.IO event
+        :return: A decorator registering a Flask-SocketIO style handler for the event
+        """
+        def decorator(handler: Callable) -> Callable:
+            self.handlers[event] = handler
+            self.register_handler(event)
+            return handler
+        return decorator
+
+    def register_handler(self, event: str):
+        """
+        Registers the handler of an event on the Socket.IO server.
+        Connections and disconnections go through on_connect() and on_disconnect() first.
+        """
+        if event in CONNECTION_EVENTS:
+            return
+
+        async def async_handler(sid, *args):
+            await self.call_handler(event, sid, *args)
+        self.server.on(event, async_handler)
+
+    def get_executor(self, event: str) -> ThreadPoolExecutor:
+        """
+        :param event: The name of the Socket.IO event to handle, or None for the functions scheduled by call_later()
+        :return: The pool of threads running the handlers of that event, created on first use
+        """
+        with self.executor_lock:
+            if event is None:
+                if self.timer_executor is None:
+                    self.timer_executor = ThreadPoolExecutor(max_workers=TIMER_WORKERS,
+                                                             thread_name_prefix="socketio-timer")
+                return self.timer_executor
+            if event in CONNECTION_EVENTS:
+                if self.connection_executor is None:
+                    self.connection_executor = ThreadPoolExecutor(max_workers=4,
+                                                                  thread_name_prefix="socketio-connection")
+                return self.connection_executor
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="socketio-handler")
+            return self.executor
+
+    async def on_connect(self, sid: str, environ: Dict[str, Any], *_args):
+        self.loop = asyncio.get_running_loop()
+        self.environs[sid] = environ
+        if 'connect' in self.handlers:
+            await self.call_handler('connect', sid)
+
+    async def on_disconnect(self, sid: str, *_args):
+        try:
+            if 'disconnect' in self.handlers:
+                await self.call_handler('disconnect', sid)
+        finally:
+            self.environs.pop(sid, None)
+
+    async def call_handler(self, event: str, sid: str, *args):
+        """
+        Runs the handler of an event in the thread pool, without blocking the event loop,
+        and its continuations, if any, once what they wait for is done
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor(event)
+        result = await loop.run_in_executor(executor, self.run_handler, self.handlers[event], event, sid, args)
+        while isinstance(result, HandlerContinuation):
+            await result.awaitable
+            result = await loop.run_in_executor(executor, self.run_handler, result.function, event, sid, result.args)
+
+    def run_handler(self, handler: Callable, event: str, sid: str, args) -> Any:
+        """
+        Runs the handler of an event, or a continuation, in a Flask request context, like Flask-SocketIO does.
+        Called in a thread of the pool.
+        :return: What the handler returned, e.g. a HandlerContinuation, or None if it failed
+        """
+        environ = self.environs.get(sid, {})
+        try:
+            with self.app.request_context(environ):
+                request.sid = sid
+                request.event = event
+                return handler(*args)
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            # Keep serving the other events
+            logger.exception("Error handling Socket.IO event %s", event)
+            return None
+
+    @staticmethod
+    def continue_after(awaitable: Awaitable, function: Callable, *args) -> HandlerContinuation:
+        """
+        Called by an event handler, which returns the result, to wait without holding a thread of the pool
+        :param awaitable: What to wait for, on the event loop, e.g. a coroutine
+        :param function: Then called in a thread of the pool, in the request context of the event
+        :param args: The arguments of the function
+        :return: The continuation for the handler to return
+        """
+        return HandlerContinuation(awaitable, function, args)
+
+    def emit(self, event: str, data: Any = None, room: str = None, **kwargs):
+        """
+        Sends an event to the browsers, from any thread
+        :param event: The name of the event
+        :param data: The data of the event
+        :param room: The Socket.IO session ID, or room, to send the event to. All the clients if None.
+        """
+        coroutine = self.server.emit(event, data, to=room, **kwargs)
+        if self.is_event_loop_thread():
+            task = self.loop.create_task(coroutine)
+            self.emit_tasks.add(task)
+            task.add_done_callback(self.emit_tasks.discard)
+            return
+        if self.loop is None:
+            # No client ever connected: there is nobody to send the event to
+            coroutine.close()
+            return
+        asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def is_event_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    @staticmethod
+    def sleep(seconds: float = 0):
+        """
+        Sleeps in the calling thread, which is never the event loop's
+        :param seconds: The number of seconds to sleep
+        """
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def call_later(self, delay: float, function: Callable, *args):
+        """
+        Calls a function in a thread of the timer pool once a delay has elapsed. Can be called from any thread.
+        :param delay: The delay in seconds, timed by the event loop, which holds no thread while waiting
+        :param function: The function to call, which may block, e.g. on emit()
+        :param args: The arguments of the function
+        """
+        if self.loop is None:
+            # No client ever connected, so there is no event loop to time the delay yet
+            self.start_background_task(self.run_later, delay, function, *args)
+            return
+        executor = self.get_executor(None)
+
+        def submit():
+            executor.submit(self.run_timer, function, args)
+        self.loop.call_soon_threadsafe(self.loop.call_later, delay, submit)
+
+    def run_later(self, delay: float, function: Callable, *args):
+        """
+        Sleeps, then calls a function, in a background thread
+        """
+        self.sleep(delay)
+        self.run_timer(function, args)
+
+    @staticmethod
+    def run_timer(function: Callable, args):
+        """
+        Calls a function scheduled by call_later(), in a thread of the timer pool
+        """
+        try:
+            function(*args)
+        # pylint: disable=broad-exception-caught
+        except Exception:
+            # Keep running the other timers
+            logger.exception("Error running %s", function)
+
+    @staticmethod
+    def start_background_task(target: Callable, *args, **kwargs) -> threading.Thread:
+        """
+        Runs a long-lived function, e.g. a periodic sweep, in a background thread of its own.
+        See call_later() for the short delayed tasks.
+        :param target: The function to run
+        :return: The started thread
+        """
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def create_asgi_app(self):
+        """
+        :return: The ASGI app serving the Socket.IO events and, for all the other paths, the Flask app
+        """
+        wsgi_app = WsgiToAsgi(self.app)
+
+        async def flask_app(scope, receive, send):
+            # asgiref keeps the thread running a request in a context variable, which leaks into the context
+            # of the next request on the same keep-alive connection and fails it: run each one in a fresh context
+            await contextvars.Context().run(asyncio.get_running_loop().create_task, wsgi_app(scope, receive, send))
+        return socketio.ASGIApp(self.server, other_asgi_app=flask_app)
+
+    def run(self, host: str, port: int):
+        """
+        Serves the app with uvicorn until interrupted
+        :param host: The host to listen on
+        :param port: The port to listen on
+        """
+        # Compress the WebSocket frames when the browser offers it, as browsers do
+        uvicorn.run(self.create_asgi_app(), host=host, port=port, log_level="warning", ws_per_message_deflate=True)
@@ -0,0 +1,49 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+
+class ConversationStateStore:
+    """
+    Interface of the stores keeping the state of the conversations with the agent networks:
+    the chat context, sly data and last response returned by the neuro-san server after each turn.
+    The states are keyed by a conversation ID kept in the Flask session, so that a user whose connection
+    moves to another worker resumes the same conversation there.
+    The states must be JSON-serializable.
+    """
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        :param conversation_id: The ID of the conversation
+        :return: The state of the conversation, or None if it is unknown or expired
+        """
+        raise NotImplementedError
+
+    def set(self, conversation_id: str, state: Dict[str, Any]):
+        """
+        :param conversation_id: The ID of the conversation
+        :param state: The new state of the conversation
+        """
+        raise NotImplementedError
+
+    def delete(self, conversation_id: str):
+        """
+        :param conversation_id: The ID of the conversation to forget
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases the resources of the store, if any
+        """
@@ -0,0 +1,53 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Optional
+
+from neuro_san_web_client.conversation_state_store import ConversationStateStore
+from neuro_san_web_client.in_memory_conversation_state_store import InMemoryConversationStateStore
+
+
+class ConversationStateStoreFactory:
+    """
+    Creates the conversation state store described by a URL:
+    - "none": no store, each connection starts a new conversation
+    - "memory": in the memory of the process, for a single worker
+    - "sqlite:///<path>": in a SQLite database file, for the workers of one machine
+    - "redis://..." or "rediss://...": in Redis, for the workers of any machine
+    """
+
+    @staticmethod
+    def create_store(url: str, ttl_in_seconds: float = 86400, max_entries: int = 1000,
+                     max_total_bytes: int = 64 * 2**20) -> Optional[ConversationStateStore]:
+        """
+        :param url: The URL of the store
+        :param ttl_in_seconds: The time after its last update after which a conversation state is dropped
+        :param max_entries: The maximum number of conversation states kept in memory, for the "memory" store
+        :param max_total_bytes: The maximum total size of the conversation states kept in memory,
+            for the "memory" store
+        :return: The conversation state store, or None for "none"
+        """
+        if url == "none":
+            return None
+        if url == "memory":
+            return InMemoryConversationStateStore(max_entries=max_entries, ttl_in_seconds=ttl_in_seconds,
+                                                  max_total_bytes=max_total_bytes)
+        if url.startswith("sqlite:///"):
+            # Only imported when used
+            # pylint: disable=import-outside-toplevel
+            from neuro_san_web_client.sqlite_conversation_state_store import SqliteConversationStateStore
+            return SqliteConversationStateStore(url[len("sqlite:///"):], ttl_in_seconds=ttl_in_seconds)
+        if url.startswith(("redis://", "rediss://")):
+            # The redis package is only needed for that store
+            # pylint: disable=import-outside-toplevel
+            from neuro_san_web_client.redis_conversation_state_store import RedisConversationStateStore
+            return RedisConversationStateStore(url, ttl_in_seconds=ttl_in_seconds)
+        raise ValueError(f"Unknown session store {url!r}: expected none, memory, sqlite:///<path> or redis://...")
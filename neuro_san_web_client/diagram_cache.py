@@ -0,0 +1,155 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from neuro_san_web_client.agents_diagram_builder import DiagramBuilder
+
+
+class DiagramCache:
+    """
+    Keeps the JSON graphs of the agent networks the browser draws in memory, keyed by .hocon file,
+    so that a graph is only rebuilt when the .hocon file it comes from changes.
+    The graphs are bounded by a maximum number of entries and a maximum total size:
+    the least recently used graphs are dropped first, and rebuilt on their next request.
+    Concurrent requests for a graph that is not cached wait for the first one to build it, instead of each building it.
+    """
+
+    def __init__(self, max_entries: int = 128, max_total_bytes: int = 64 * 1024 * 1024):
+        """
+        Constructor
+        :param max_entries: The maximum number of graphs to keep
+        :param max_total_bytes: The maximum total size of the graphs to keep, in bytes
+        """
+        self.max_entries: int = max_entries
+        self.max_total_bytes: int = max_total_bytes
+        # Hocon path -> {"key": cache key of the hocon, "payload": JSON graph, "etag": hash of the payload}
+        # Ordered from least to most recently used.
+        self.graphs: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.graph_bytes: int = 0
+        # Hocon path -> {"lock": held while building its graph, "users": number of requests building or waiting},
+        # removed once nobody uses it
+        self.builds: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.diagram_builder = DiagramBuilder()
+
+    @staticmethod
+    def get_cache_key(hocon_file) -> str:
+        """
+        Computes the cache key of a .hocon file from its path, modification time and size.
+        Only the file's metadata is read, which is much cheaper than parsing it.
+        :param hocon_file: The path to the .hocon file
+        :return: The cache key, as a hex string
+        """
+        stat = os.stat(hocon_file)
+        return DiagramCache.make_cache_key(hocon_file, stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def make_cache_key(hocon_file, mtime_ns: int, size: int) -> str:
+        """
+        Computes the cache key of a .hocon file from metadata already read, e.g. by the agent registry index
+        :param hocon_file: The path to the .hocon file
+        :param mtime_ns: Its modification time, in nanoseconds
+        :param size: Its size, in bytes
+        :return: The cache key, as a hex string
+        """
+        key_source = f"{os.path.abspath(hocon_file)}:{mtime_ns}:{size}"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def get_graph(self, hocon_file, key: str = None) -> Tuple[bytes, str]:
+        """
+        Gets the JSON graph of an agent network, parsing its .hocon file only if it changed.
+        :param hocon_file: The path to the .hocon file containing the agent network definition
+        :param key: The cache key of the .hocon file, if already known. Read from the file's metadata if None.
+        :return: A tuple containing the JSON graph, as bytes, and its ETag
+        """
+        hocon_file = os.path.abspath(str(hocon_file))
+        if key is None:
+            key = self.get_cache_key(hocon_file)
+        with self.lock:
+            cached = self.get_cached(hocon_file, key)
+            if cached is not None:
+                return cached
+            build = self.builds.get(hocon_file)
+            if build is None:
+                build = {"lock": threading.Lock(), "users": 0}
+                self.builds[hocon_file] = build
+            build["users"] += 1
+
+        try:
+            # Parse the hocon file outside the cache lock, as it can take a while
+            with build["lock"]:
+                with self.lock:
+                    # Built by the request this one waited for
+                    cached = self.get_cached(hocon_file, key)
+                if cached is not None:
+                    return cached
+                return self.build_graph(hocon_file, key)
+        finally:
+            with self.lock:
+                build["users"] -= 1
+                if build["users"] == 0:
+                    del self.builds[hocon_file]
+
+    def get_cached(self, hocon_file: str, key: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Must be called with the lock held.
+        :return: The cached JSON graph of a .hocon file and its ETag, or None if the file changed or is not cached
+        """
+        entry = self.graphs.get(hocon_file)
+        if entry is None or entry["key"] != key:
+            return None
+        self.graphs.move_to_end(hocon_file)
+        return entry["payload"], entry["etag"]
+
+    def build_graph(self, hocon_file: str, key: str) -> Tuple[bytes, str]:
+        """
+        Builds the JSON graph of a .hocon file and caches it
+        :param hocon_file: The absolute path to the .hocon file
+        :param key: The cache key of the .hocon file
+        :return: A tuple containing the JSON graph, as bytes, and its ETag
+        """
+        agent_graph = self.diagram_builder.load_agent_graph(hocon_file)
+        graph_data = self.diagram_builder.create_graph_data(agent_graph)
+        payload = json.dumps(graph_data, separators=(",", ":"), default=str).encode("utf-8")
+        etag = hashlib.sha256(payload).hexdigest()[:32]
+        with self.lock:
+            previous = self.graphs.pop(hocon_file, None)
+            if previous is not None:
+                self.graph_bytes -= len(previous["payload"])
+            self.graphs[hocon_file] = {"key": key, "payload": payload, "etag": etag}
+            self.graph_bytes += len(payload)
+            # Always keep the most recently used graph
+            while len(self.graphs) > 1 and \
+                    (len(self.graphs) > self.max_entries or self.graph_bytes > self.max_total_bytes):
+                _, evicted = self.graphs.popitem(last=False)
+                self.graph_bytes -= len(evicted["payload"])
+        return payload, etag
+
+    def invalidate(self, hocon_file):
+        """
+        Forgets the graph built from a .hocon file that changed or was removed,
+        e.g. when the agent registry index notices it
+        :param hocon_file: The path to the .hocon file
+        """
+        hocon_file = os.path.abspath(str(hocon_file))
+        with self.lock:
+            graph = self.graphs.pop(hocon_file, None)
+            if graph is not None:
+                self.graph_bytes -= len(graph["payload"])
@@ -0,0 +1,90 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from neuro_san_web_client.conversation_state_store import ConversationStateStore
+
+
+class InMemoryConversationStateStore(ConversationStateStore):
+    """
+    Keeps the conversation states in the memory of the process, which is enough for a single worker:
+    a user whose connection drops resumes the conversation on the next one, as long as the page is not reloaded.
+    Each state is kept as a JSON snapshot, so that the store never holds on to the live state of a user session,
+    and its size is counted: the least recently used states are dropped beyond max_entries or max_total_bytes,
+    and states expire after ttl_in_seconds.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_in_seconds: float = 86400, max_total_bytes: int = 64 * 2**20):
+        """
+        Constructor
+        :param max_entries: The maximum number of conversation states to keep
+        :param ttl_in_seconds: The time after its last update after which a conversation state is dropped
+        :param max_total_bytes: The maximum total size of the JSON snapshots of the states to keep
+        """
+        self.max_entries: int = max_entries
+        self.ttl_in_seconds: float = ttl_in_seconds
+        self.max_total_bytes: int = max_total_bytes
+        self.total_bytes: int = 0
+        # Conversation ID -> (expiration time, JSON snapshot of the state), ordered from least to most recently used
+        self.states: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.states.get(conversation_id)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                self.remove(conversation_id)
+                return None
+            self.states.move_to_end(conversation_id)
+        return json.loads(snapshot)
+
+    def set(self, conversation_id: str, state: Dict[str, Any]):
+        snapshot = json.dumps(state, default=str)
+        with self.lock:
+            self.remove(conversation_id)
+            if len(snapshot) > self.max_total_bytes:
+                # Would evict all the others
+                return
+            self.states[conversation_id] = (time.monotonic() + self.ttl_in_seconds, snapshot)
+            self.total_bytes += len(snapshot)
+            while len(self.states) > self.max_entries or self.total_bytes > self.max_total_bytes:
+                self.remove(next(iter(self.states)))
+
+    def delete(self, conversation_id: str):
+        with self.lock:
+            self.remove(conversation_id)
+
+    def get_total_bytes(self) -> int:
+        """
+        :return: The total size of the JSON snapshots of the states kept, in bytes
+        """
+        with self.lock:
+            return self.total_bytes
+
+    def remove(self, conversation_id: str):
+        """
+        Removes the state of a conversation, if any. Must be called with the lock held.
+        :param conversation_id: The ID of the conversation
+        """
+        entry = self.states.pop(conversation_id, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[1])
@@ -0,0 +1,206 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+
+class LayeredLayout:
+    """
+    Computes a layered layout of a directed graph, e.g. an agent network, so that the browser only has to draw it:
+    1. Cycles are broken by reversing the back edges found by a depth-first search.
+    2. Each node is put on the layer after its deepest predecessor (longest path layering),
+       so that calls go downwards, from the front man at the top.
+    3. The nodes of each layer are ordered by the barycenter of their neighbors in the layers above,
+       then below, a few times, to reduce the edge crossings.
+    4. Each layer is centered horizontally.
+    All the steps are linear in the number of nodes and edges, except for sorting the layers,
+    which keeps networks of thousands of agents well under a second.
+    """
+
+    def __init__(self, layer_spacing: float = 150, node_spacing: float = 180, sweeps: int = 4):
+        """
+        Constructor
+        :param layer_spacing: The vertical distance between two layers
+        :param node_spacing: The horizontal distance between two nodes of the same layer
+        :param sweeps: The number of down and up passes of the crossing reduction
+        """
+        self.layer_spacing: float = layer_spacing
+        self.node_spacing: float = node_spacing
+        self.sweeps: int = sweeps
+
+    def compute(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]]) -> Dict[str, Tuple[float, float]]:
+        """
+        :param nodes: The ids of the nodes. The depth-first search starts from the first ones,
+                      so the front man should come first.
+        :param edges: The (from, to) pairs of node ids
+        :return: A dictionary of node id -> (x, y) position
+        """
+        node_ids: List[str] = list(dict.fromkeys(nodes))
+        index: Dict[str, int] = {node_id: position for position, node_id in enumerate(node_ids)}
+        successors: List[List[int]] = [[] for _ in node_ids]
+        for from_node, to_node in edges:
+            for node_id in (from_node, to_node):
+                if node_id not in index:
+                    index[node_id] = len(node_ids)
+                    node_ids.append(node_id)
+                    successors.append([])
+            # Self calls do not change the layout
+            if from_node != to_node:
+                successors[index[from_node]].append(index[to_node])
+
+        successors = self.remove_cycles(successors)
+        layer_of = self.assign_layers(successors)
+        layers = self.reduce_crossings(successors, layer_of)
+
+        positions: Dict[str, Tuple[float, float]] = {}
+        for layer_index, layer in enumerate(layers):
+            offset = (len(layer) - 1) / 2.0
+            for position, node in enumerate(layer):
+                positions[node_ids[node]] = ((position - offset) * self.node_spacing, layer_index * self.layer_spacing)
+        return positions
+
+    @staticmethod
+    def remove_cycles(successors: List[List[int]]) -> List[List[int]]:
+        """
+        Reverses the edges that close a cycle, found by an iterative depth-first search.
+        :param successors: The successors of each node
+        :return: The successors of each node in the resulting acyclic graph
+        """
+        not_visited, on_stack, done = 0, 1, 2
+        state = [not_visited] * len(successors)
+        acyclic: List[List[int]] = [[] for _ in successors]
+        for root in range(len(successors)):
+            if state[root] != not_visited:
+                continue
+            state[root] = on_stack
+            # (node, index of the next successor to visit)
+            stack = [(root, 0)]
+            while stack:
+                node, next_index = stack[-1]
+                if next_index == len(successors[node]):
+                    state[node] = done
+                    stack.pop()
+                    continue
+                stack[-1] = (node, next_index + 1)
+                successor = successors[node][next_index]
+                if state[successor] == on_stack:
+                    # Back edge: reverse it
+                    acyclic[successor].append(node)
+                    continue
+                acyclic[node].append(successor)
+                if state[successor] == not_visited:
+                    state[successor] = on_stack
+                    stack.append((successor, 0))
+        return acyclic
+
+    @staticmethod
+    def assign_layers(successors: List[List[int]]) -> List[int]:
+        """
+        Puts each node on the layer after its deepest predecessor, visiting the nodes in topological order.
+        :param successors: The successors of each node, without cycles
+        :return: The layer of each node, starting from 0
+        """
+        in_degrees = [0] * len(successors)
+        for node_successors in successors:
+            for successor in node_successors:
+                in_degrees[successor] += 1
+        layer_of = [0] * len(successors)
+        ready = [node for node, in_degree in enumerate(in_degrees) if in_degree == 0]
+        # Reversed, so that the nodes are popped in their original order
+        ready.reverse()
+        while ready:
+            node = ready.pop()
+            for successor in successors[node]:
+                layer_of[successor] = max(layer_of[successor], layer_of[node] + 1)
+                in_degrees[successor] -= 1
+                if in_degrees[successor] == 0:
+                    ready.append(successor)
+        return layer_of
+
+    def reduce_crossings(self, successors: List[List[int]], layer_of: List[int]) -> List[List[int]]:
+        """
+        Orders the nodes of each layer with the barycenter heuristic, alternating down and up sweeps.
+        An edge spanning several layers pulls its ends towards each other as if it was a short one.
+        :param successors: The successors of each node, without cycles
+        :param layer_of: The layer of each node
+        :return: The nodes of each layer, in order
+        """
+        num_layers = max(layer_of, default=-1) + 1
+        layers: List[List[int]] = [[] for _ in range(num_layers)]
+        # Initial order: the depth-first order of the nodes, which keeps the callees of an agent together
+        for node in self.get_depth_first_order(successors):
+            layers[layer_of[node]].append(node)
+
+        predecessors: List[List[int]] = [[] for _ in successors]
+        for node, node_successors in enumerate(successors):
+            for successor in node_successors:
+                predecessors[successor].append(node)
+
+        # Centered position of each node in its layer, comparable between layers of different sizes
+        x_of = [0.0] * len(successors)
+        for layer in layers:
+            self.update_positions(layer, x_of)
+
+        for _ in range(self.sweeps):
+            for layer in layers[1:]:
+                self.sort_layer(layer, predecessors, x_of)
+            for layer in reversed(layers[:-1]):
+                self.sort_layer(layer, successors, x_of)
+        return layers
+
+    @staticmethod
+    def get_depth_first_order(successors: List[List[int]]) -> List[int]:
+        """
+        :return: The nodes in depth-first pre-order, starting from the nodes in their original order
+        """
+        visited = [False] * len(successors)
+        order = []
+        for root in range(len(successors)):
+            if visited[root]:
+                continue
+            visited[root] = True
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                order.append(node)
+                for successor in reversed(successors[node]):
+                    if not visited[successor]:
+                        visited[successor] = True
+                        stack.append(successor)
+        return order
+
+    @staticmethod
+    def sort_layer(layer: List[int], neighbors: List[List[int]], x_of: List[float]):
+        """
+        Sorts a layer in place by the barycenter of the neighbors of its nodes.
+        Nodes without neighbors keep their position.
+        """
+        barycenters = {}
+        for node in layer:
+            node_neighbors = neighbors[node]
+            if node_neighbors:
+                barycenters[node] = sum(x_of[neighbor] for neighbor in node_neighbors) / len(node_neighbors)
+            else:
+                barycenters[node] = x_of[node]
+        layer.sort(key=lambda node: (barycenters[node], x_of[node]))
+        LayeredLayout.update_positions(layer, x_of)
+
+    @staticmethod
+    def update_positions(layer: List[int], x_of: List[float]):
+        """
+        Records the centered position of the nodes of a layer
+        """
+        offset = (len(layer) - 1) / 2.0
+        for position, node in enumerate(layer):
+            x_of[node] = position - offset
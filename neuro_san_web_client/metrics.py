@@ -0,0 +1,376 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import math
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextlib import nullcontext
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+from neuro_san_web_client.original_modules import get_original_module
+
+# Shards are per OS thread, even when the standard library is monkey patched by eventlet:
+# green threads sharing an OS thread never preempt each other in the middle of an update.
+original_threading = get_original_module("threading")
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Label values beyond that number of distinct label sets per metric, across all the threads,
+# are counted under "other"
+MAX_LABEL_SETS = 1000
+OTHER_LABEL_VALUE = "other"
+
+
+class ThreadShard:
+    """
+    Holds the shard of a thread in the thread-local storage of a metric.
+    It is collected when its thread exits, which retires the shard.
+    """
+
+    __slots__ = ("values", "__weakref__")
+
+    def __init__(self):
+        self.values: Dict[Tuple[str, ...], Any] = {}
+
+
+class Metric:
+    """
+    Base class of the metrics. Updates go to a shard owned by the updating thread, without any lock.
+    The shards are only summed up when the metrics are rendered.
+    When a thread exits, its shard is folded into the retired shard, so that short-lived threads don't add up.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, metric_type: str,
+                 label_names: Sequence[str] = ()):
+        """
+        Constructor
+        :param registry: The registry the metric belongs to
+        :param name: The name of the metric
+        :param help_text: The description of the metric
+        :param metric_type: The Prometheus type of the metric
+        :param label_names: The names of the labels of the metric, if any
+        """
+        self.registry: MetricsRegistry = registry
+        self.name: str = name
+        self.help_text: str = help_text
+        self.metric_type: str = metric_type
+        self.label_names: Tuple[str, ...] = tuple(label_names)
+        # The values of the threads that exited: label values -> value
+        self.retired: Dict[Tuple[str, ...], Any] = {}
+        # One dict of label values -> value per live thread, by id, and the retired one
+        self.shards: Dict[int, Dict[Tuple[str, ...], Any]] = {id(self.retired): self.retired}
+        # Taken to add, retire or sum up the shards, never to update one
+        self.shards_lock = original_threading.Lock()
+        self.local = original_threading.local()
+        # The label sets recorded by any thread, for MAX_LABEL_SETS
+        self.label_sets: Set[Tuple[str, ...]] = set()
+        # Only taken the first time a label set is recorded
+        self.label_sets_lock = threading.Lock()
+
+    def get_shard(self) -> Dict[Tuple[str, ...], Any]:
+        """
+        :return: The shard of the current thread, created on first use
+        """
+        thread_shard = getattr(self.local, "thread_shard", None)
+        if thread_shard is None:
+            thread_shard = ThreadShard()
+            self.local.thread_shard = thread_shard
+            with self.shards_lock:
+                self.shards[id(thread_shard.values)] = thread_shard.values
+            # Called when the thread exits, and its thread-local storage is cleared
+            weakref.finalize(thread_shard, self.retire, thread_shard.values)
+        return thread_shard.values
+
+    def retire(self, shard: Dict[Tuple[str, ...], Any]):
+        """
+        Folds the shard of a thread that exited into the retired shard
+        :param shard: The shard of the thread
+        """
+        with self.shards_lock:
+            for label_values, value in shard.items():
+                self.retired[label_values] = self.add_values(self.retired.get(label_values), value)
+            del self.shards[id(shard)]
+
+    def add_values(self, total: Any, value: Any) -> Any:
+        """
+        :param total: The value of a label set in a shard, or None if it has none
+        :param value: The value of the same label set in another shard
+        :return: The sum of the values
+        """
+        return value if total is None else total + value
+
+    def sum_shards(self) -> Dict[Tuple[str, ...], Any]:
+        """
+        :return: Label values -> value, summed over all the shards
+        """
+        totals: Dict[Tuple[str, ...], Any] = {}
+        with self.shards_lock:
+            for shard in self.shards.values():
+                for label_values, value in list(shard.items()):
+                    totals[label_values] = self.add_values(totals.get(label_values), value)
+        return totals
+
+    def get_label_values(self, shard: Dict[Tuple[str, ...], Any], label_values: Tuple[str, ...]) -> Tuple[str, ...]:
+        """
+        :return: The label values to record under, folded into "other" beyond MAX_LABEL_SETS label sets,
+                 counted across all the shards
+        """
+        if label_values in shard or label_values in self.label_sets:
+            return label_values
+        with self.label_sets_lock:
+            if len(self.label_sets) < MAX_LABEL_SETS:
+                self.label_sets.add(label_values)
+                return label_values
+        return tuple(OTHER_LABEL_VALUE for _ in label_values)
+
+    def format_labels(self, label_values: Tuple[str, ...], extra: str = "") -> str:
+        """
+        :return: The labels of a sample in the Prometheus text format
+        """
+        labels = [f'{name}="{escape_label_value(value)}"' for name, value in zip(self.label_names, label_values)]
+        if extra:
+            labels.append(extra)
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+    def render(self) -> List[str]:
+        """
+        :return: The lines of this metric in the Prometheus text format
+        """
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"] + \
+            self.render_samples()
+
+    def render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """
+    A value that only goes up
+    """
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(registry, name, help_text, "counter", label_names)
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        """
+        :param label_values: The values of the labels, in the order of the label names
+        :param amount: The amount to add
+        """
+        if not self.registry.enabled:
+            return
+        shard = self.get_shard()
+        label_values = self.get_label_values(shard, label_values)
+        shard[label_values] = shard.get(label_values, 0.0) + amount
+
+    def render_samples(self) -> List[str]:
+        return [f"{self.name}{self.format_labels(label_values)} {format_value(value)}"
+                for label_values, value in sorted(self.sum_shards().items())]
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down, either tracked with inc() and dec()
+    or read from a function when the metrics are rendered.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str):
+        super().__init__(registry, name, help_text, "gauge")
+        self.function: Callable[[], float] = None
+
+    def inc(self, amount: float = 1.0):
+        if not self.registry.enabled:
+            return
+        shard = self.get_shard()
+        shard[()] = shard.get((), 0.0) + amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """
+        :param function: Returns the value of the gauge, called when the metrics are rendered
+        """
+        self.function = function
+
+    @contextmanager
+    def track_in_progress(self):
+        """
+        Counts a block of code as in progress while it runs
+        """
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def render_samples(self) -> List[str]:
+        if self.function is not None:
+            value = self.function()
+        else:
+            value = self.sum_shards().get((), 0.0)
+        return [f"{self.name} {format_value(value)}"]
+
+
+class Histogram(Metric):
+    """
+    Counts observations, typically durations in seconds, in cumulative buckets
+    """
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, "histogram", label_names)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str):
+        """
+        :param value: The observed value
+        :param label_values: The values of the labels, in the order of the label names
+        """
+        if not self.registry.enabled:
+            return
+        shard = self.get_shard()
+        label_values = self.get_label_values(shard, label_values)
+        # [count per bucket..., count above the last bucket, sum]
+        counts = shard.get(label_values)
+        if counts is None:
+            counts = [0.0] * (len(self.buckets) + 2)
+            shard[label_values] = counts
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def time(self, *label_values: str):
+        """
+        :param label_values: The values of the labels, in the order of the label names
+        :return: A context manager observing the duration of its block, in seconds
+        """
+        if not self.registry.enabled:
+            return nullcontext()
+        return self.timer(label_values)
+
+    @contextmanager
+    def timer(self, label_values: Tuple[str, ...]):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def add_values(self, total: Any, value: Any) -> Any:
+        # Count per bucket, then the sum
+        return list(value) if total is None else [count + other for count, other in zip(total, value)]
+
+    def render_samples(self) -> List[str]:
+        lines = []
+        for label_values, total in sorted(self.sum_shards().items()):
+            cumulative = 0.0
+            for bucket, count in zip(self.buckets, total):
+                cumulative += count
+                labels = self.format_labels(label_values, f'le="{format_value(bucket)}"')
+                lines.append(f"{self.name}_bucket{labels} {format_value(cumulative)}")
+            cumulative += total[len(self.buckets)]
+            labels = self.format_labels(label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{self.format_labels(label_values)} {format_value(total[-1])}")
+            lines.append(f"{self.name}_count{self.format_labels(label_values)} {format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the web client and renders them in the Prometheus text format.
+    When disabled, updating a metric returns right away.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Constructor
+        :param enabled: Whether the metrics are recorded
+        """
+        self.enabled: bool = enabled
+        self.metrics: List[Metric] = []
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(self, name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self.register(Gauge(self, name, help_text))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(self, name, help_text, label_names, buckets))
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        :return: All the metrics in the Prometheus text format
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+METRICS_REGISTRY = MetricsRegistry()
+
+PROCESS_ONCE_SECONDS = METRICS_REGISTRY.histogram(
+    "neuro_san_web_client_process_once_seconds",
+    "Duration of the agent turns, i.e. of the calls to StreamingInputProcessor.process_once")
+DIAGRAM_BUILD_SECONDS = METRICS_REGISTRY.histogram(
+    "neuro_san_web_client_diagram_build_seconds",
+    "Duration of the agent network diagram building steps: hocon_parse, layout, pyvis_build and file_write",
+    label_names=("step",))
+EMIT_SECONDS = METRICS_REGISTRY.histogram(
+    "neuro_san_web_client_emit_seconds",
+    "Duration of the Socket.IO emit calls sending agent messages to the browser",
+    label_names=("event",))
+ACTIVE_USER_SESSIONS = METRICS_REGISTRY.gauge(
+    "neuro_san_web_client_active_user_sessions",
+    "Number of user sessions in memory")
+IN_FLIGHT_TURNS = METRICS_REGISTRY.gauge(
+    "neuro_san_web_client_in_flight_turns",
+    "Number of agent turns being processed")
+AGENT_MESSAGES = METRICS_REGISTRY.counter(
+    "neuro_san_web_client_agent_messages_total",
+    "Number of agent messages received, per agent",
+    label_names=("agent",))
+CANCELLED_TURNS = METRICS_REGISTRY.counter(
+    "neuro_san_web_client_cancelled_turns_total",
+    "Number of turns cancelled, per reason: disconnected or superseded",
+    label_names=("reason",))
+REJECTED_TURNS = METRICS_REGISTRY.counter(
+    "neuro_san_web_client_rejected_turns_total",
+    "Number of messages rejected because their session's turn queue was full")
+ABANDONED_TURNS = METRICS_REGISTRY.gauge(
+    "neuro_san_web_client_abandoned_turns",
+    "Number of cancelled turns still running")
@@ -0,0 +1,53 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import importlib
+import sys
+import threading
+from types import ModuleType
+from typing import Any
+from typing import Callable
+
+# Held around the imports deferred to first use. Python's import locks go by OS thread, which all the green threads
+# of eventlet share: without this lock, a green thread importing a module while another one is still running it
+# gets the module partially initialized. Created after eventlet monkey patched threading, so it's a green lock then.
+LAZY_IMPORT_LOCK = threading.RLock()
+
+
+def get_original_module(name: str) -> ModuleType:
+    """
+    Gets a standard library module as it was before eventlet monkey patched it, e.g. to run real OS threads.
+    eventlet is only used if it was already imported, by the eventlet server mode: the asgi server mode
+    and the command line tools never import it.
+    :param name: The name of a module eventlet may patch, e.g. "threading" or "queue"
+    :return: The original module
+    """
+    patcher = sys.modules.get("eventlet.patcher")
+    if patcher is None:
+        return importlib.import_module(name)
+    return patcher.original(name)
+
+
+def call_in_os_thread(function: Callable, *args) -> Any:
+    """
+    Calls a blocking function, e.g. file or database I/O, without blocking the other green threads of eventlet:
+    with eventlet, the function runs in one of its pool of real OS threads while the caller waits.
+    Without eventlet, the function is called directly, in the caller's thread.
+    :param function: The function to call
+    :param args: The arguments of the function
+    :return: What the function returns
+    """
+    if sys.modules.get("eventlet.patcher") is None:
+        return function(*args)
+    # Only imported in the eventlet server mode, which already imported eventlet
+    # pylint: disable=import-outside-toplevel
+    from eventlet import tpool
+    return tpool.execute(function, *args)
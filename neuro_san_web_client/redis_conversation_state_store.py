@@ -0,0 +1,52 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import json
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+import redis
+
+from neuro_san_web_client.conversation_state_store import ConversationStateStore
+
+KEY_PREFIX = "neuro_san_web_client:conversation_state:"
+
+
+class RedisConversationStateStore(ConversationStateStore):
+    """
+    Keeps the conversation states in Redis, or any server speaking its protocol,
+    which the workers running on any machine share. Redis expires the states itself.
+    """
+
+    def __init__(self, url: str, ttl_in_seconds: float = 86400):
+        """
+        Constructor
+        :param url: The URL of the Redis server, e.g. redis://localhost:6379/0
+        :param ttl_in_seconds: The time after its last update after which a conversation state is dropped
+        """
+        self.ttl_in_seconds: int = max(1, int(ttl_in_seconds))
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        state_json = self.client.get(KEY_PREFIX + conversation_id)
+        if state_json is None:
+            return None
+        return json.loads(state_json)
+
+    def set(self, conversation_id: str, state: Dict[str, Any]):
+        self.client.set(KEY_PREFIX + conversation_id, json.dumps(state, default=str), ex=self.ttl_in_seconds)
+
+    def delete(self, conversation_id: str):
+        self.client.delete(KEY_PREFIX + conversation_id)
+
+    def close(self):
+        self.client.close()
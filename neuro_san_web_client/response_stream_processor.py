@@ -0,0 +1,97 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from flask_socketio import SocketIO
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+from neuro_san.message_processing.message_processor import MessageProcessor
+
+from neuro_san_web_client.metrics import EMIT_SECONDS
+from neuro_san_web_client.wire_format import WireFormat
+
+
+class ResponseStreamProcessor(MessageProcessor):
+    """
+    Sends the agent network's response to the UI chunk by chunk, as the messages arrive,
+    instead of waiting for the end of the turn.
+    """
+
+    def __init__(self, socketio: SocketIO, sid: str, wire_format: WireFormat = None):
+        """
+        Constructor
+        :param socketio: The SocketIO server to send the chunks with
+        :param sid: The Socket.IO session ID of the user to send the chunks to
+        :param wire_format: How the chunks are sent to the browser. The 'text' wire format if None.
+        """
+        self.socketio: SocketIO = socketio
+        self.sid: str = sid
+        self.wire_format: WireFormat = wire_format or WireFormat()
+        self.turn_start_time: float = time.monotonic()
+        self.first_chunk_time: Optional[float] = None
+        # Set once the user disconnected: nothing is sent anymore
+        self.closed: bool = False
+
+    def reset(self):
+        """
+        Starts timing a new turn
+        """
+        self.turn_start_time = time.monotonic()
+        self.first_chunk_time = None
+
+    def get_time_to_first_chunk(self) -> Optional[float]:
+        """
+        :return: The number of seconds between the start of the turn and the first response chunk,
+                 or None if no chunk was sent during this turn
+        """
+        if self.first_chunk_time is None:
+            return None
+        return self.first_chunk_time - self.turn_start_time
+
+    def process_message(self, chat_message_dict: Dict[str, Any], message_type: ChatMessageType):
+        """
+        Process the message: if it's a response from the front man of the agent network,
+        send it to the UI right away.
+        :param chat_message_dict: The chat message
+        :param message_type: The type of message
+        """
+        if message_type != ChatMessageType.AI or self.closed:
+            # Not a response, or nobody to send it to
+            return
+
+        # Only the front man answers the user. The other agents answer their calling agent.
+        origin: List = chat_message_dict.get("origin") or []
+        if len(origin) > 1:
+            return
+
+        # Discard empty messages
+        response_text = chat_message_dict.get("text", "").strip()
+        if response_text == "":
+            return
+
+        if self.first_chunk_time is None:
+            self.first_chunk_time = time.monotonic()
+        with EMIT_SECONDS.time("agent_response_chunk"):
+            self.socketio.emit('agent_response_chunk', self.wire_format.encode({'message': response_text}),
+                               room=self.sid)
+        # Allow the event loop to process and send WebSocket messages before continuing execution.
+        self.socketio.sleep(0)
+
+    def close(self):
+        """
+        Stops sending the response to the UI, e.g. once the user disconnected
+        """
+        self.closed = True
@@ -0,0 +1,98 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import json
+import sqlite3
+import time
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from neuro_san_web_client.conversation_state_store import ConversationStateStore
+from neuro_san_web_client.original_modules import call_in_os_thread
+from neuro_san_web_client.original_modules import get_original_module
+
+original_threading = get_original_module("threading")
+
+# Expired states are deleted every that many updates
+CLEANUP_INTERVAL = 100
+
+
+class SqliteConversationStateStore(ConversationStateStore):
+    """
+    Keeps the conversation states in a SQLite database file,
+    which the workers running on the same machine share.
+    The serialization and the queries run in a real OS thread with eventlet, so that a slow disk,
+    or a writer of another worker holding the database, never blocks the other users of this worker.
+    """
+
+    def __init__(self, database_path: str, ttl_in_seconds: float = 86400):
+        """
+        Constructor
+        :param database_path: The path to the SQLite database file, created if needed
+        :param ttl_in_seconds: The time after its last update after which a conversation state is dropped
+        """
+        self.ttl_in_seconds: float = ttl_in_seconds
+        self.updates: int = 0
+        # A lock of the OS threads: it is taken in the OS threads of eventlet, not in green threads
+        self.lock = original_threading.Lock()
+        self.connection = sqlite3.connect(database_path, timeout=30, check_same_thread=False)
+        with self.lock, self.connection:
+            # Readers don't block the writer, and the other way around, across processes
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS conversation_states ("
+                "conversation_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)")
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        return call_in_os_thread(self.read_state, conversation_id)
+
+    def set(self, conversation_id: str, state: Dict[str, Any]):
+        call_in_os_thread(self.write_state, conversation_id, state)
+
+    def delete(self, conversation_id: str):
+        call_in_os_thread(self.delete_state, conversation_id)
+
+    def read_state(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads the state of a conversation, in an OS thread
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT state FROM conversation_states WHERE conversation_id = ? AND expires_at > ?",
+                (conversation_id, time.time())).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def write_state(self, conversation_id: str, state: Dict[str, Any]):
+        """
+        Writes the state of a conversation, in an OS thread
+        """
+        state_json = json.dumps(state, default=str)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO conversation_states (conversation_id, state, expires_at) VALUES (?, ?, ?)",
+                (conversation_id, state_json, time.time() + self.ttl_in_seconds))
+            self.updates += 1
+            if self.updates % CLEANUP_INTERVAL == 0:
+                self.connection.execute("DELETE FROM conversation_states WHERE expires_at <= ?", (time.time(),))
+
+    def delete_state(self, conversation_id: str):
+        """
+        Deletes the state of a conversation, in an OS thread
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM conversation_states WHERE conversation_id = ?", (conversation_id,))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -13,7 +13,11 @@ document.addEventListener('DOMContentLoaded', () => {
     const sendButton = document.getElementById('send-button');
     const userInput = document.getElementById('user-input');
     const messages = document.getElementById('messages');
+    const MAX_CHAT_MESSAGES = parseInt(messages.dataset.maxMessages, 10) || 500;
     const agentLogs = document.getElementById('agent-logs');
+    const agentLogsSpacer = document.getElementById('agent-logs-spacer');
+    const agentLogsWindow = document.getElementById('agent-logs-window');
+    const downloadLogsButton = document.getElementById('download-logs-button');
     const loadingIndicator = document.getElementById('loading-indicator');
     const configForm = document.querySelector('#configForm form');
     const agentNameInput = configForm.querySelector('input[name="agent_name"]');
@@ -29,30 +33,198 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    const DEFAULT_NODE_COLOR = '#97c2fc';
+    const MISSING_NODE_COLOR = 'green';
+    // Colors of the most recently highlighted agents, the current one first.
+    // The older ones fade out. Keep a single color to disable fading.
+    const HIGHLIGHT_NODE_COLORS = ['#ff6347', '#f2876f', '#d9a9a7'];
+    // The vis-network drawing of the current agent network, and its nodes
+    let network = null;
+    let networkNodes = null;
+    // The ids of the highlighted nodes, the most recent first
+    let highlightedAgents = [];
+
     function highlightAgentInGraph(agentName) {
-        const iframe = document.getElementById('diagram-frame');
-        if (iframe) {
-//            console.log(`Sending message to iframe: ${agentName}`);  // Log the agent name before sending
-            iframe.contentWindow.postMessage({ agentName: agentName }, '*');  // Do NOT modify the agentName here
-        }
-    }
-
-    socket.on('agent_log', function(data) {
-        // Get the agent name and log from the data
-        const agent_name = data.agent_name;
-        const agent_log = data.log;
-        // Add the log to the agent communications frame
-        agentLogs.textContent += agent_log + '\n';
-        agentLogs.scrollTop = agentLogs.scrollHeight;
-        // Highlight the agent node in the diagram
-        highlightAgentInGraph(agent_name);
+        // Directly compare agent name with the node ID
+        if (!networkNodes || highlightedAgents[0] === agentName || !networkNodes.get(agentName)) {
+            return;
+        }
+        // Only the previously highlighted nodes and the new one change color, whatever the size of the network
+        const updates = [];
+        highlightedAgents = highlightedAgents.filter(id => id !== agentName);
+        highlightedAgents.unshift(agentName);
+        if (highlightedAgents.length > HIGHLIGHT_NODE_COLORS.length) {
+            // Restore the default color of the oldest one
+            const oldestAgent = highlightedAgents.pop();
+            updates.push({ id: oldestAgent, color: networkNodes.get(oldestAgent).defaultColor });
+        }
+        highlightedAgents.forEach((id, index) => updates.push({ id: id, color: HIGHLIGHT_NODE_COLORS[index] }));
+        networkNodes.update(updates);
+    }
+
+    // The agent logs: the most recent lines are kept in a ring buffer, and only the visible ones are in the DOM.
+    // The older lines are archived as blobs, for the download button.
+    const AGENT_LOG_LINE_HEIGHT = 20;  // Must match the line-height of #agent-logs-window
+    const AGENT_LOG_MAX_LINES = parseInt(agentLogs.dataset.maxLines, 10) || 5000;
+    const agentLogLines = new LineRingBuffer(AGENT_LOG_MAX_LINES);
+    const archivedAgentLogs = [];
+    // The lines received since the last animation frame, and the last agent they come from
+    let pendingAgentLogLines = [];
+    let pendingAgentName = null;
+    let agentLogFrameRequested = false;
+
+    socket.on('agent_logs', function(data) {
+        // Get the last agent name and the batch of logs from the data
+        for (const agentLog of data.logs) {
+            // One entry per line, for all the lines to have the same height
+            pendingAgentLogLines.push(...String(agentLog).split('\n'));
+        }
+        pendingAgentName = data.agent_name;
+        requestAgentLogFrame();
     });
 
-    socket.on('agent_response', function(data) {
+    // With a compact wire format, each agent name is sent once, and the logs refer to the agents by id
+    const AGENT_LOG_HEADER = '---------- ChatMessage ----------';
+    const agentNames = [];
+
+    socket.on('agent_logs_compact', function(payload) {
+        const data = decodeEvent(payload);
+        if (data.reset) {
+            // A new session on the server, e.g. after a reconnection or an eviction, numbers the agents from 0 again
+            agentNames.length = 0;
+        }
+        // The names of the agents with the next ids
+        agentNames.push(...data.agents);
+        for (const [originIds, text] of data.logs) {
+            const originChain = originIds.map(id => agentNames[id]).join(' -> ');
+            pendingAgentLogLines.push(AGENT_LOG_HEADER, ...`${originChain}: ${text}`.split('\n'));
+        }
+        pendingAgentName = agentNames[data.agent];
+        requestAgentLogFrame();
+    });
+
+    function decodeEvent(payload) {
+        // The msgpack wire format sends the events as binary frames
+        if (payload instanceof ArrayBuffer) {
+            return MessagePack.decode(new Uint8Array(payload));
+        }
+        return payload;
+    }
+
+    function requestAgentLogFrame() {
+        // Whatever the number of messages received in between, the panel is updated once per frame
+        if (!agentLogFrameRequested) {
+            agentLogFrameRequested = true;
+            requestAnimationFrame(renderAgentLogs);
+        }
+    }
+
+    function renderAgentLogs() {
+        agentLogFrameRequested = false;
+        const atBottom = agentLogs.scrollTop + agentLogs.clientHeight >= agentLogs.scrollHeight - AGENT_LOG_LINE_HEIGHT;
+
+        if (pendingAgentLogLines.length > 0) {
+            const evictedLines = agentLogLines.push(pendingAgentLogLines);
+            pendingAgentLogLines = [];
+            if (evictedLines.length > 0) {
+                archivedAgentLogs.push(new Blob([evictedLines.join('\n') + '\n'], { type: 'text/plain' }));
+                if (!atBottom) {
+                    // Keep the lines being read in place
+                    agentLogs.scrollTop -= evictedLines.length * AGENT_LOG_LINE_HEIGHT;
+                }
+            }
+            agentLogsSpacer.style.height = `${agentLogLines.length * AGENT_LOG_LINE_HEIGHT}px`;
+            if (atBottom) {
+                agentLogs.scrollTop = agentLogs.scrollHeight;
+            }
+        }
+        if (pendingAgentName !== null) {
+            // Highlight the last agent node of the frame in the diagram
+            highlightAgentInGraph(pendingAgentName);
+            pendingAgentName = null;
+        }
+
+        // Only the visible lines, plus a few above and below, are rendered
+        const overscan = 10;
+        const firstLine = Math.max(0, Math.floor(agentLogs.scrollTop / AGENT_LOG_LINE_HEIGHT) - overscan);
+        const lastLine = Math.min(agentLogLines.length,
+            firstLine + Math.ceil(agentLogs.clientHeight / AGENT_LOG_LINE_HEIGHT) + 2 * overscan);
+        agentLogsWindow.style.top = `${firstLine * AGENT_LOG_LINE_HEIGHT}px`;
+        agentLogsWindow.textContent = agentLogLines.slice(firstLine, lastLine).join('\n');
+    }
+
+    agentLogs.addEventListener('scroll', requestAgentLogFrame);
+    // The panel has no height while closed: render the visible lines when it opens
+    document.getElementById('communications-details').addEventListener('toggle', requestAgentLogFrame);
+
+    downloadLogsButton.addEventListener('click', function() {
+        const currentLines = agentLogLines.slice(0, agentLogLines.length).join('\n') + '\n';
+        const blob = new Blob([...archivedAgentLogs, currentLines], { type: 'text/plain' });
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(blob);
+        link.download = 'agent_communications.txt';
+        link.click();
+        URL.revokeObjectURL(link.href);
+    });
+
+    // The agent response being streamed, if any: its accumulated text and the element displaying it
+    let pendingResponse = null;
+    // The messages sent that are neither answered nor refused yet: the loading indicator shows until there is none
+    let messagesInFlight = 0;
+
+    function endMessage() {
+        messagesInFlight = Math.max(messagesInFlight - 1, 0);
+        if (messagesInFlight === 0) {
+            loadingIndicator.style.display = 'none';
+        }
+    }
+
+    socket.on('agent_response_chunk', function(payload) {
+        const data = decodeEvent(payload);
+        if (pendingResponse === null) {
+            // First chunk of this turn's response: create the message that will receive the next ones
+            pendingResponse = {
+                text: data.message,
+                content: appendMessage('agent-response', data.message)
+            };
+        } else {
+            // Append the chunk to the pending message in place
+            pendingResponse.text += '\n\n' + data.message;
+            renderAgentResponse(pendingResponse.content, pendingResponse.text);
+            messages.scrollTop = messages.scrollHeight;
+        }
+    });
+
+    socket.on('agent_response', function(payload) {
+        const data = decodeEvent(payload);
         console.log('Received agent response:', data);
-        appendMessage('agent-response', data.message);
-        // Hide loading indicator if you have one
-        loadingIndicator.style.display = 'none';
+        if (pendingResponse !== null) {
+            // The response was streamed: replace the chunks with the final response
+            renderAgentResponse(pendingResponse.content, data.message);
+            messages.scrollTop = messages.scrollHeight;
+            pendingResponse = null;
+        } else {
+            appendMessage('agent-response', data.message);
+        }
+        endMessage();
+    });
+
+    socket.on('turn_status', function(data) {
+        // The message won't be answered: the user sent too many at once, a newer one superseded it,
+        // the server dropped the session to stay within its memory bounds, or the turn failed
+        const reasons = {
+            rejected: 'Not sent to the agents, the previous messages are still being processed',
+            superseded: 'Not answered, superseded by a newer message',
+            evicted: 'Not answered, the session expired on the server: send it again',
+            failed: 'Not answered, the agents could not process it'
+        };
+        appendMessage('turn-status', `${reasons[data.status] || data.status}: "${data.message}"`);
+        if (data.status !== 'rejected') {
+            // The turn may have streamed chunks already: the next response starts a new message.
+            // A rejected message never started, while the running turn keeps streaming its response.
+            pendingResponse = null;
+        }
+        endMessage();
     });
 
     function sendMessage() {
@@ -62,6 +234,7 @@ document.addEventListener('DOMContentLoaded', () => {
             appendMessage('user-message', message);
             userInput.value = '';
             // Show loading indicator
+            messagesInFlight += 1;
             loadingIndicator.style.display = 'block';
         }
     }
@@ -80,53 +253,114 @@ document.addEventListener('DOMContentLoaded', () => {
         messageContent.classList.add('message-content');
 
         if (type === 'agent-response') {
-            // Render the message as HTML using Marked.js and sanitize it with DOMPurify
-            const rawHTML = marked.parse(renderTextWithNewlines(message));
-            const sanitizedHTML = DOMPurify.sanitize(rawHTML);
-            messageContent.innerHTML = sanitizedHTML;
+            renderAgentResponse(messageContent, message);
         } else {
             messageContent.textContent = message;
         }
 
         messageElement.appendChild(messageContent);
         messages.appendChild(messageElement);
+        // Keep the chat's DOM bounded: drop the oldest messages
+        while (messages.childElementCount > MAX_CHAT_MESSAGES) {
+            messages.removeChild(messages.firstElementChild);
+        }
         messages.scrollTop = messages.scrollHeight;
+        return messageContent;
     }
 
-    const detailsElement = document.querySelector('details');
-    const diagramFrame = document.getElementById('diagram-frame');
+    function renderAgentResponse(messageContent, message) {
+        // Render the message as HTML using Marked.js and sanitize it with DOMPurify
+        const rawHTML = marked.parse(renderTextWithNewlines(message));
+        const sanitizedHTML = DOMPurify.sanitize(rawHTML);
+        messageContent.innerHTML = sanitizedHTML;
+    }
+
+    const detailsElement = document.getElementById('diagram-details');
+    const diagramContainer = document.getElementById('diagram-network');
     let centered = false;  // Flag to track if the diagram has been centered
+    let resizeTimeout = null;
 
     // Listen for the toggle event when details is opened
     detailsElement.addEventListener('toggle', function() {
-        if (this.open && !centered) {
-            // Trigger re-centering logic after details is opened, but only if not centered already
-            triggerResizeEvent();
-            centered = true;  // Set flag to true to prevent further centering
+        if (this.open && network && !centered) {
+            // The diagram has no size while details is closed: center it once it is visible
+            centerDiagram();
         }
     });
 
-    function triggerResizeEvent() {
-        setTimeout(() => {
-            window.dispatchEvent(new Event('resize'));  // Trigger a resize event after details opens
-        }, 100);  // Delay ensures that the content is fully rendered before triggering the resize
+    // Redraw the diagram in place when the window is resized, once the resizing is over
+    window.addEventListener('resize', function() {
+        clearTimeout(resizeTimeout);
+        resizeTimeout = setTimeout(() => {
+            if (network && detailsElement.open) {
+                centerDiagram();
+            } else {
+                // Center it when it becomes visible again
+                centered = false;
+            }
+        }, 150);
+    });
+
+    function centerDiagram() {
+        network.redraw();
+        network.fit();
+        centered = true;  // Set flag to true to prevent further centering
+    }
+
+    function drawDiagram(graph) {
+        networkNodes = new vis.DataSet(graph.nodes.map(node => {
+            const color = node.missing ? MISSING_NODE_COLOR : DEFAULT_NODE_COLOR;
+            // The positions are computed by the server: the browser only draws
+            return { id: node.id, label: node.label, title: node.id, x: node.x, y: node.y,
+                     color: color, defaultColor: color };
+        }));
+        const networkEdges = new vis.DataSet(graph.edges.map(([from, to]) => ({ from: from, to: to })));
+        const options = {
+            nodes: { shape: 'dot', font: { color: 'white' } },
+            edges: { arrows: 'to' },
+            physics: { enabled: false },
+            interaction: { zoomView: false, dragView: true },
+            manipulation: { enabled: false },
+            autoResize: true
+        };
+        if (network) {
+            network.destroy();
+        }
+        highlightedAgents = [];
+        network = new vis.Network(diagramContainer, { nodes: networkNodes, edges: networkEdges }, options);
+        if (detailsElement.open) {
+            centerDiagram();
+        }
     }
 
-    // On iframe load, also trigger re-centering if details is already open
-    diagramFrame.onload = function() {
-        if (detailsElement.open && !centered) {
-            triggerResizeEvent();
-            centered = true;  // Set flag to true to prevent further centering
+    function clearDiagram() {
+        if (network) {
+            network.destroy();
         }
-    };
+        network = null;
+        networkNodes = null;
+        highlightedAgents = [];
+    }
 
     function loadDiagram(agentNetworkName) {
         centered = false;  // Reset the flag when loading a new diagram
-        if (agentNetworkName) {
-            diagramFrame.src = `/static/${agentNetworkName}.html`;
-        } else {
-            diagramFrame.src = '';  // Clear iframe
+        if (!agentNetworkName) {
+            clearDiagram();
+            return;
         }
+        // 'no-cache' revalidates with the ETag: an unchanged graph costs a 304 and no download
+        fetch(`/api/graph/${encodeURI(agentNetworkName)}`, { cache: 'no-cache' })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`No agent network diagram for ${agentNetworkName}: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(drawDiagram)
+            .catch(error => {
+                console.warn(error);
+                clearDiagram();
+            });
     }
     // On form submission, load the respective diagram
     configForm.addEventListener('submit', (event) => {
@@ -134,39 +368,166 @@ document.addEventListener('DOMContentLoaded', () => {
         loadDiagram(agentNetworkName);  // Load the corresponding diagram
     });
 
-    // Optionally, you can load the diagram when the page loads, based on the current agent_name
-    const initialAgentName = agentNameInput.value.trim();
-    loadDiagram(initialAgentName);  // Load the initial diagram if there is an agent network name
+    // The waterfall of the last turn: one row per agent span, fetched when the panel is open
+    const traceDetails = document.getElementById('trace-details');
+    const traceSummary = document.getElementById('trace-summary');
+    const traceWaterfall = document.getElementById('trace-waterfall');
+    const downloadTraceLink = document.getElementById('download-trace-link');
+    let lastTraceId = null;
+    let renderedTraceId = null;
 
-});
+    socket.on('turn_trace', function(data) {
+        lastTraceId = data.id;
+        if (traceDetails.open) {
+            loadTrace();
+        }
+    });
 
-window.addEventListener('resize', function() {
-    const diagramFrame = document.getElementById('diagram-frame');
-    // Trigger resizing or reloading the content if needed
-    diagramFrame.contentWindow.location.reload();  // Reloads the diagram when window is resized
-});
+    traceDetails.addEventListener('toggle', () => {
+        if (traceDetails.open) {
+            loadTrace();
+        }
+    });
+
+    function loadTrace() {
+        if (lastTraceId === null || lastTraceId === renderedTraceId) {
+            return;
+        }
+        const traceId = lastTraceId;
+        fetch(`/traces/${traceId}`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`No trace ${traceId}: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(trace => {
+                renderedTraceId = traceId;
+                renderWaterfall(trace);
+            })
+            .catch(error => console.warn(error));
+    }
 
-function resizeDiagramFrame() {
-    const diagramFrame = document.getElementById('diagram-frame');
-    if (diagramFrame) {
-        diagramFrame.contentWindow.location.reload();  // Trigger a reload to adjust layout
+    function formatSeconds(seconds) {
+        return seconds === null ? '-' : `${(seconds * 1000).toFixed(0)} ms`;
     }
-}
 
-document.addEventListener('DOMContentLoaded', function() {
-    const diagramDetails = document.querySelector('details[open]'); // If it's open on page load
-    if (diagramDetails) {
-        resizeDiagramFrame();  // Resize on load if the diagram is visible
+    function renderWaterfall(trace) {
+        traceSummary.textContent = `${trace.agent_network}: ${formatSeconds(trace.duration)}, `
+            + `first message after ${formatSeconds(trace.time_to_first_message)}`;
+        downloadTraceLink.href = `/traces/${trace.id}/chrome`;
+        downloadTraceLink.classList.remove('disabled');
+        const duration = Math.max(trace.duration, 1e-6);
+        const rows = [];
+        // Depth first, the callees under their caller
+        const stack = trace.spans.slice().reverse().map(span => [span, 0]);
+        while (stack.length > 0) {
+            const [span, depth] = stack.pop();
+            const row = document.createElement('div');
+            row.className = 'trace-row';
+            const label = document.createElement('div');
+            label.className = 'trace-label';
+            label.style.paddingLeft = `${depth * 12}px`;
+            label.textContent = `${span.agent} (${span.messages})`;
+            const lane = document.createElement('div');
+            lane.className = 'trace-lane';
+            const bar = document.createElement('div');
+            bar.className = 'trace-bar';
+            bar.style.left = `${span.first_seen / duration * 100}%`;
+            bar.style.width = `${(span.last_seen - span.first_seen) / duration * 100}%`;
+            bar.title = `${span.origin.join(' -> ')}: ${formatSeconds(span.first_seen)} to `
+                + `${formatSeconds(span.last_seen)}, ${span.messages} messages`;
+            lane.appendChild(bar);
+            row.append(label, lane);
+            rows.push(row);
+            for (let index = span.children.length - 1; index >= 0; index--) {
+                stack.push([span.children[index], depth + 1]);
+            }
+        }
+        traceWaterfall.replaceChildren(...rows);
     }
-});
 
-const detailsElements = document.querySelectorAll('details');
-detailsElements.forEach((details) => {
-    details.addEventListener('toggle', function() {
-        if (details.open) {
-            resizeDiagramFrame();  // Resize when the diagram becomes visible
+    // Typeahead of the agent network names, from the registry index of the server
+    const agentNamesList = document.getElementById('agent-names');
+    const AGENT_NAMES_DEBOUNCE_MS = 150;
+    let agentNamesTimer = null;
+    let agentNamesQuery = null;
+
+    function updateAgentNames() {
+        const query = agentNameInput.value.trim();
+        if (query === agentNamesQuery) {
+            return;
         }
+        agentNamesQuery = query;
+        fetch(`/agents?q=${encodeURIComponent(query)}&limit=20`)
+            .then(response => response.json())
+            .then(data => {
+                // An older answer arriving after a newer query is ignored
+                if (query !== agentNamesQuery) {
+                    return;
+                }
+                agentNamesList.replaceChildren(...data.agents.map(agent => {
+                    const option = document.createElement('option');
+                    option.value = agent.name;
+                    option.textContent = agent.description
+                        ? `${agent.tools} agents - ${agent.description}`
+                        : `${agent.tools} agents`;
+                    return option;
+                }));
+            })
+            .catch(error => console.warn(error));
+    }
+
+    agentNameInput.addEventListener('input', () => {
+        clearTimeout(agentNamesTimer);
+        agentNamesTimer = setTimeout(updateAgentNames, AGENT_NAMES_DEBOUNCE_MS);
     });
+    agentNameInput.addEventListener('focus', updateAgentNames);
+
+    // Optionally, you can load the diagram when the page loads, based on the current agent_name
+    const initialAgentName = agentNameInput.value.trim();
+    loadDiagram(initialAgentName);  // Load the initial diagram if there is an agent network name
+
 });
 
+/**
+ * Keeps the most recent lines, up to a maximum number, without moving the other lines when the oldest are dropped.
+ */
+class LineRingBuffer {
+    constructor(maxLines) {
+        this.maxLines = maxLines;
+        this.lines = new Array(maxLines);
+        this.start = 0;
+        this.length = 0;
+    }
+
+    /**
+     * Appends lines
+     * @return The lines dropped to make room for them, oldest first
+     */
+    push(newLines) {
+        const evictedLines = [];
+        for (const line of newLines) {
+            const index = (this.start + this.length) % this.maxLines;
+            if (this.length === this.maxLines) {
+                evictedLines.push(this.lines[index]);
+                this.start = (this.start + 1) % this.maxLines;
+            } else {
+                this.length++;
+            }
+            this.lines[index] = line;
+        }
+        return evictedLines;
+    }
 
+    /**
+     * @return The lines from begin, included, to end, excluded, the oldest line being at 0
+     */
+    slice(begin, end) {
+        const result = [];
+        for (let index = begin; index < end; index++) {
+            result.push(this.lines[(this.start + index) % this.maxLines]);
+        }
+        return result;
+    }
+}
@@ -0,0 +1,87 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import threading
+from collections import deque
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import List
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+from neuro_san.message_processing.message_processor import MessageProcessor
+
+
+class ThinkingBufferProcessor(MessageProcessor):
+    """
+    Keeps the agent network's "thinking" of one user session in memory:
+    the last messages of all types, up to max_entries messages and max_bytes characters, oldest ones dropped first.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 256 * 1024):
+        """
+        Constructor
+        :param max_entries: The maximum number of messages to keep
+        :param max_bytes: The maximum total length of the messages to keep, in characters.
+                          The last message is kept whole even if it is longer.
+        """
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.entries: Deque[str] = deque()
+        self.num_bytes: int = 0
+        self.lock = threading.Lock()
+
+    def process_message(self, chat_message_dict: Dict[str, Any], message_type: ChatMessageType):
+        """
+        Process the message: keep it in the buffer
+        :param chat_message_dict: The chat message
+        :param message_type: The type of message
+        """
+        entry = self.format_message(chat_message_dict, message_type)
+        with self.lock:
+            self.entries.append(entry)
+            self.num_bytes += len(entry)
+            while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.num_bytes > self.max_bytes):
+                self.num_bytes -= len(self.entries.popleft())
+
+    def get_thinking(self) -> str:
+        """
+        :return: The buffered messages, oldest first
+        """
+        with self.lock:
+            entries = list(self.entries)
+        return "\n".join(entries)
+
+    def get_size(self) -> int:
+        """
+        :return: The total length of the buffered messages, in characters, for the memory bound of the sessions
+        """
+        return self.num_bytes
+
+    def close(self):
+        """
+        Drops the buffered messages, once the user session is released
+        """
+        with self.lock:
+            self.entries.clear()
+            self.num_bytes = 0
+
+    @staticmethod
+    def format_message(chat_message_dict: Dict[str, Any], message_type: ChatMessageType) -> str:
+        """
+        :param chat_message_dict: The chat message
+        :param message_type: The type of message
+        :return: The message as a line of thinking
+        """
+        origin: List = chat_message_dict.get("origin") or []
+        origin_str = " -> ".join(tool.get("tool", "") for tool in origin)
+        text = chat_message_dict.get("text", "")
+        return f"[{message_type.name}] {origin_str}: {text}"
@@ -0,0 +1,169 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import os
+from typing import Any
+from typing import Dict
+from typing import List
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+from neuro_san.message_processing.message_processor import MessageProcessor
+
+from neuro_san_web_client.original_modules import get_original_module
+from neuro_san_web_client.thinking_buffer_processor import ThinkingBufferProcessor
+
+# The writer runs in a real OS thread, even when the standard library is monkey patched by eventlet,
+# so that disk writes never block the green threads processing the turns.
+original_queue = get_original_module("queue")
+original_threading = get_original_module("threading")
+
+
+class ThinkingFileWriter:
+    """
+    Appends lines to files, and deletes them, from a single background thread.
+    Writing a line only puts it in a queue: when max_pending_lines lines are waiting, the line is dropped
+    rather than blocking the caller. Deleting a file puts a marker in the same queue, behind the lines
+    queued for the file, and is never dropped.
+    """
+
+    def __init__(self, max_pending_lines: int = 10000):
+        """
+        Constructor
+        :param max_pending_lines: The maximum number of lines waiting to be written
+        """
+        self.max_pending_lines: int = max_pending_lines
+        # (file path, line), or (file path, None) to delete the file, in order
+        self.pending_lines = original_queue.SimpleQueue()
+        self.num_pending_lines: int = 0
+        self.num_dropped_lines: int = 0
+        self.thread = None
+        self.lock = original_threading.Lock()
+
+    def write(self, file_path: str, line: str):
+        """
+        Queues a line to append to a file
+        :param file_path: The path to the file
+        :param line: The line to append
+        """
+        self.start()
+        with self.lock:
+            if self.num_pending_lines >= self.max_pending_lines:
+                self.num_dropped_lines += 1
+                return
+            self.num_pending_lines += 1
+        self.pending_lines.put((file_path, line))
+
+    def delete(self, file_path: str):
+        """
+        Deletes a file once the writer reaches the lines already queued for it, which it then skips.
+        No line must be written to it afterwards.
+        :param file_path: The path to the file
+        """
+        self.start()
+        self.pending_lines.put((file_path, None))
+
+    def start(self):
+        """
+        Starts the writer thread, if not started yet
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = original_threading.Thread(target=self.run, name="thinking-file-writer", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        """
+        Writes the queued lines forever
+        """
+        while True:
+            batch = [self.pending_lines.get()]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.pending_lines.get_nowait())
+                except original_queue.Empty:
+                    break
+            # Open each file once per batch, writing its lines in order
+            lines_by_file: Dict[str, List[str]] = {}
+            num_lines = 0
+            for file_path, line in batch:
+                if line is None:
+                    # The lines queued before the file was deleted are not written
+                    lines_by_file.pop(file_path, None)
+                    self.delete_file(file_path)
+                else:
+                    num_lines += 1
+                    lines_by_file.setdefault(file_path, []).append(line)
+            with self.lock:
+                self.num_pending_lines -= num_lines
+            for file_path, lines in lines_by_file.items():
+                self.append_lines(file_path, lines)
+
+    @staticmethod
+    def append_lines(file_path: str, lines):
+        """
+        Appends lines to a file, in the writer thread
+        """
+        try:
+            with open(file_path, "a", encoding="utf-8") as thinking:
+                thinking.write("\n".join(lines) + "\n")
+        except OSError as exception:
+            print(f"Could not write thinking file {file_path}: {exception}")
+
+    @staticmethod
+    def delete_file(file_path: str):
+        """
+        Deletes a file, in the writer thread
+        """
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            # Nothing was ever written to it
+            pass
+        except OSError as exception:
+            print(f"Could not delete thinking file {file_path}: {exception}")
+
+
+# Shared by all the sessions
+THINKING_FILE_WRITER = ThinkingFileWriter()
+
+
+class ThinkingFileProcessor(MessageProcessor):
+    """
+    Writes the agent network's "thinking" of one user session to its own file,
+    asynchronously: processing a message never touches the disk.
+    The file is deleted when the user session is released.
+    """
+
+    def __init__(self, thinking_file: str):
+        """
+        Constructor
+        :param thinking_file: The path to the thinking file of this session
+        """
+        self.thinking_file: str = thinking_file
+        self.closed: bool = False
+
+    def process_message(self, chat_message_dict: Dict[str, Any], message_type: ChatMessageType):
+        """
+        Process the message: queue it for writing to the thinking file
+        :param chat_message_dict: The chat message
+        :param message_type: The type of message
+        """
+        if self.closed:
+            return
+        THINKING_FILE_WRITER.write(self.thinking_file,
+                                   ThinkingBufferProcessor.format_message(chat_message_dict, message_type))
+
+    def close(self):
+        """
+        Deletes the thinking file, once the user session is released
+        """
+        self.closed = True
+        THINKING_FILE_WRITER.delete(self.thinking_file)
@@ -0,0 +1,41 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+from neuro_san.message_processing.message_processor import MessageProcessor
+
+from neuro_san_web_client.turn_queue import TurnQueue
+
+
+class TurnCancellationProcessor(MessageProcessor):
+    """
+    Stops the running turn of a user session as soon as its next message arrives, once it has been cancelled.
+    Raising from the message processor unwinds process_once() and closes the stream from the neuro-san server.
+    Must be the first processor, for the others not to handle the message.
+    """
+
+    def __init__(self, turn_queue: TurnQueue):
+        """
+        Constructor
+        :param turn_queue: The turn queue of the user session
+        """
+        self.turn_queue: TurnQueue = turn_queue
+
+    def process_message(self, chat_message_dict: Dict[str, Any], message_type: ChatMessageType):
+        """
+        :param chat_message_dict: The chat message
+        :param message_type: The type of message
+        :raises TurnCancelledError: If the running turn was cancelled
+        """
+        self.turn_queue.check_cancelled()
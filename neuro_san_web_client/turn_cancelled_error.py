@@ -0,0 +1,17 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+
+class TurnCancelledError(Exception):
+    """
+    Raised from within a turn to stop it, when nobody will read its result anymore:
+    the user disconnected, or sent a message that supersedes it.
+    """
@@ -0,0 +1,233 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any
+from typing import Deque
+from typing import Dict
+
+from neuro_san_web_client.metrics import CANCELLED_TURNS
+from neuro_san_web_client.metrics import REJECTED_TURNS
+from neuro_san_web_client.turn_cancelled_error import TurnCancelledError
+
+TURN_POLICIES = ['queue', 'reject', 'coalesce']
+
+
+class TurnQueue:
+    """
+    Orders the turns of a user session: one runs at a time, and the next messages wait for it, in order.
+    The policy decides what happens to a message arriving while a turn is running:
+    - 'queue': it waits, unless max_depth messages are already waiting, in which case it is rejected
+    - 'reject': it is rejected
+    - 'coalesce': it cancels the running turn and replaces the waiting messages, so that only the latest is answered
+
+    Cancelling a turn is cooperative: a turn that is waiting leaves the queue right away,
+    and a running turn stops at the next message it receives, see TurnCancellationProcessor.
+    Closing the queue, when the user disconnects or the session is evicted, cancels all of its turns.
+
+    A turn is admit()ted, waits until it is ready, in the calling thread with wait(), or on an event loop,
+    without holding a thread, with wait_async(), then is start()ed and finally leave()s the queue.
+    """
+
+    # Shared by all the queues, for the stats
+    stats_lock = threading.Lock()
+    # Number of cancelled turns that have not stopped yet
+    abandoned_turns_running: int = 0
+    # Reason -> number of turns cancelled for that reason
+    cancelled_turns: Dict[str, int] = {}
+    rejected_turns: int = 0
+
+    def __init__(self, max_depth: int = 4, policy: str = 'queue'):
+        """
+        Constructor
+        :param max_depth: The maximum number of messages waiting for the running turn, with the 'queue' policy
+        :param policy: What to do with a message arriving while a turn is running, one of TURN_POLICIES
+        """
+        if policy not in TURN_POLICIES:
+            raise ValueError(f"Unknown turn policy {policy!r}, expected one of {TURN_POLICIES}")
+        self.max_depth: int = max_depth
+        self.policy: str = policy
+        self.condition = threading.Condition()
+        # Each turn is a dict: {"cancelled": None, or the reason it was cancelled or rejected,
+        #                       "on_ready": None, or called once the turn can start or was cancelled}
+        self.waiting: Deque[Dict[str, Any]] = deque()
+        self.running: Dict[str, Any] = None
+        # Why the queue was closed, or None while it is open
+        self.closed: str = None
+
+    def admit(self) -> Dict[str, Any]:
+        """
+        Decides what to do with a new message, according to the policy, without waiting
+        :return: The turn of the message, waiting in the queue unless it was rejected right away.
+                 If its "cancelled" entry is set, the message must not be processed:
+                 it was rejected, superseded by a newer message, or the user disconnected.
+        """
+        turn = {"cancelled": None, "on_ready": None}
+        with self.condition:
+            if self.closed is not None:
+                turn["cancelled"] = self.closed
+                return turn
+            if self.policy == 'coalesce':
+                # The new message supersedes all the previous ones
+                while self.waiting:
+                    self.cancel(self.waiting.popleft(), "superseded")
+                if self.running is not None:
+                    self.cancel(self.running, "superseded")
+            elif self.running is not None or self.waiting:
+                max_depth = self.max_depth if self.policy == 'queue' else 0
+                if len(self.waiting) >= max_depth:
+                    turn["cancelled"] = "rejected"
+                    with TurnQueue.stats_lock:
+                        TurnQueue.rejected_turns += 1
+                    REJECTED_TURNS.inc()
+                    return turn
+
+            self.waiting.append(turn)
+        return turn
+
+    def is_ready(self, turn: Dict[str, Any]) -> bool:
+        """
+        :param turn: A turn returned by admit()
+        :return: True if the turn can start, or was cancelled. Must be called with the condition held.
+        """
+        return turn["cancelled"] is not None or (self.running is None and self.waiting[0] is turn)
+
+    def wait(self, turn: Dict[str, Any]):
+        """
+        Waits in the calling thread until a turn returned by admit() is ready
+        :param turn: The turn
+        """
+        with self.condition:
+            while not self.is_ready(turn):
+                self.condition.wait()
+
+    async def wait_async(self, turn: Dict[str, Any]):
+        """
+        Waits on the running event loop, without holding a thread, until a turn returned by admit() is ready
+        :param turn: The turn
+        """
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def on_ready():
+            loop.call_soon_threadsafe(lambda: ready.done() or ready.set_result(None))
+
+        with self.condition:
+            if self.is_ready(turn):
+                return
+            turn["on_ready"] = on_ready
+        await ready
+
+    def start(self, turn: Dict[str, Any]):
+        """
+        Makes a ready turn the running one, unless it was cancelled
+        :param turn: A turn returned by admit(), once ready
+        """
+        with self.condition:
+            if turn["cancelled"] is None:
+                self.waiting.popleft()
+                self.running = turn
+
+    def leave(self, turn: Dict[str, Any]):
+        """
+        Lets the next message in, once a turn returned by admit() is over, whether it completed or not
+        :param turn: The turn
+        """
+        with self.condition:
+            if self.running is not turn:
+                if turn in self.waiting:
+                    # Never started, e.g. its handler failed before
+                    self.waiting.remove(turn)
+                    self.notify()
+                return
+            self.running = None
+            if turn["cancelled"] is not None:
+                with TurnQueue.stats_lock:
+                    TurnQueue.abandoned_turns_running -= 1
+            self.notify()
+
+    def notify(self):
+        """
+        Wakes up the turns waiting in threads, and the ones waiting on an event loop that are now ready.
+        Must be called with the condition held.
+        """
+        self.condition.notify_all()
+        if self.waiting and self.running is None:
+            self.call_on_ready(self.waiting[0])
+
+    @staticmethod
+    def call_on_ready(turn: Dict[str, Any]):
+        """
+        Calls the on_ready callback of a turn waiting on an event loop, once
+        """
+        on_ready = turn["on_ready"]
+        if on_ready is not None:
+            turn["on_ready"] = None
+            on_ready()
+
+    def check_cancelled(self):
+        """
+        Called from within the running turn
+        :raises TurnCancelledError: If the running turn was cancelled
+        """
+        running = self.running
+        if running is not None and running["cancelled"] is not None:
+            raise TurnCancelledError(running["cancelled"])
+
+    def is_busy(self) -> bool:
+        """
+        :return: True if a turn is running or waiting
+        """
+        with self.condition:
+            return self.running is not None or bool(self.waiting)
+
+    def close(self, reason: str = "disconnected"):
+        """
+        Cancels all the turns, and the ones to come, as nobody will read their results anymore
+        :param reason: Why, e.g. "disconnected", or "evicted" when the session was evicted from the store
+        """
+        with self.condition:
+            self.closed = reason
+            while self.waiting:
+                self.cancel(self.waiting.popleft(), reason)
+            if self.running is not None:
+                self.cancel(self.running, reason)
+
+    def cancel(self, turn: Dict[str, Any], reason: str):
+        """
+        Cancels a turn, whether it is running or waiting. Must be called with the condition held.
+        :param turn: The turn
+        :param reason: Why it is cancelled
+        """
+        if turn["cancelled"] is not None:
+            return
+        turn["cancelled"] = reason
+        with TurnQueue.stats_lock:
+            TurnQueue.cancelled_turns[reason] = TurnQueue.cancelled_turns.get(reason, 0) + 1
+            if turn is self.running:
+                TurnQueue.abandoned_turns_running += 1
+        CANCELLED_TURNS.inc(reason)
+        self.call_on_ready(turn)
+        self.notify()
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """
+        :return: The numbers of cancelled and rejected turns, and of cancelled turns still running
+        """
+        with TurnQueue.stats_lock:
+            return {
+                "abandoned_turns_running": TurnQueue.abandoned_turns_running,
+                "cancelled_turns": dict(TurnQueue.cancelled_turns),
+                "rejected_turns": TurnQueue.rejected_turns,
+            }
@@ -0,0 +1,149 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import time
+import uuid
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+from neuro_san.message_processing.message_processor import MessageProcessor
+
+from neuro_san_web_client.turn_trace_store import TurnTraceStore
+
+
+class TurnTraceRecorder(MessageProcessor):
+    """
+    Records the timing of the messages of a user's turns, to tell which agents the turns wait for.
+    Each message is timestamped, in seconds since the start of the turn, and attributed to the span
+    of its origin chain. The spans form a tree: the span of front_man -> agent_1 is a child of the span
+    of front_man, and covers the time between the first and the last message of agent_1 called by front_man.
+    A span's time range also covers the ones of its children.
+    The texts of the messages are not kept, only their lengths.
+
+    Once a turn ends, its trace goes to the trace store, as a dict:
+    {
+        "id", "owner", "agent_network", "start_time" (epoch), "duration", "status", "time_to_first_message",
+        "agents": {agent name: {"first_seen", "last_seen", "messages"}},
+        "spans": [{"agent", "origin", "first_seen", "last_seen", "messages", "children": [spans]}],
+        "messages": [{"time", "type", "origin", "text_length"}],
+        "dropped_messages": number of messages beyond max_messages, counted in the spans but not listed
+    }
+    """
+
+    def __init__(self, trace_store: TurnTraceStore, owner: Optional[str], agent_network: str,
+                 max_messages: int = 10000):
+        """
+        Constructor
+        :param trace_store: Where the traces of the turns go once they end
+        :param owner: Who may read the traces, e.g. the client ID kept in the user's Flask session,
+            or None for nobody
+        :param agent_network: The name of the agent network the user talks to
+        :param max_messages: The maximum number of messages listed in a trace
+        """
+        self.trace_store: TurnTraceStore = trace_store
+        self.owner: Optional[str] = owner
+        self.agent_network: str = agent_network
+        self.max_messages: int = max_messages
+        # The trace of the turn in progress, if any
+        self.trace: Optional[Dict[str, Any]] = None
+        self.turn_start: float = 0.0
+        # Origin chain -> its span, in the turn in progress
+        self.spans: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def start_turn(self) -> str:
+        """
+        Starts recording a new turn
+        :return: The ID of its trace, to end it with
+        """
+        self.turn_start = time.monotonic()
+        self.spans = {}
+        self.trace = {
+            "id": uuid.uuid4().hex,
+            "owner": self.owner,
+            "agent_network": self.agent_network,
+            "start_time": time.time(),
+            "duration": None,
+            "status": None,
+            "time_to_first_message": None,
+            "agents": {},
+            "spans": [],
+            "messages": [],
+            "dropped_messages": 0,
+        }
+        return self.trace["id"]
+
+    def end_turn(self, trace_id: str, status: str) -> Optional[str]:
+        """
+        Stops recording a turn and sends its trace to the store, if that turn is still the one in progress
+        :param trace_id: The ID of the trace of the turn, returned by start_turn()
+        :param status: How the turn ended, e.g. "completed" or the reason it was cancelled
+        :return: The ID of the trace, or None if that turn was not in progress, e.g. it already ended
+        """
+        trace = self.trace
+        if trace is None or trace["id"] != trace_id:
+            return None
+        self.trace = None
+        self.spans = {}
+        trace["duration"] = time.monotonic() - self.turn_start
+        trace["status"] = status
+        self.trace_store.add(trace)
+        return trace["id"]
+
+    def process_message(self, chat_message_dict: Dict[str, Any], message_type: ChatMessageType):
+        """
+        Records the time of the message, in the span of its origin chain and in the stats of its agent
+        :param chat_message_dict: The chat message
+        :param message_type: The type of message
+        """
+        trace = self.trace
+        if trace is None:
+            return
+        now = time.monotonic() - self.turn_start
+        if trace["time_to_first_message"] is None:
+            trace["time_to_first_message"] = now
+        origin: List[str] = [tool.get("tool") for tool in chat_message_dict.get("origin") or []]
+
+        if len(trace["messages"]) < self.max_messages:
+            trace["messages"].append({
+                "time": now,
+                "type": getattr(message_type, "name", str(message_type)),
+                "origin": origin,
+                "text_length": len(chat_message_dict.get("text") or ""),
+            })
+        else:
+            trace["dropped_messages"] += 1
+        if not origin:
+            return
+
+        agent_stats = trace["agents"].get(origin[-1])
+        if agent_stats is None:
+            trace["agents"][origin[-1]] = {"first_seen": now, "last_seen": now, "messages": 1}
+        else:
+            agent_stats["last_seen"] = now
+            agent_stats["messages"] += 1
+
+        # Extend the spans of the whole chain, creating the missing ones
+        siblings = trace["spans"]
+        for depth in range(1, len(origin) + 1):
+            key = tuple(origin[:depth])
+            span = self.spans.get(key)
+            if span is None:
+                span = {"agent": key[-1], "origin": list(key), "first_seen": now, "last_seen": now,
+                        "messages": 0, "children": []}
+                self.spans[key] = span
+                siblings.append(span)
+            span["last_seen"] = now
+            siblings = span["children"]
+        span["messages"] += 1
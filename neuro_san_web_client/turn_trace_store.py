@@ -0,0 +1,138 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import threading
+from collections import deque
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from neuro_san_web_client.user_session_store import UserSessionStore
+
+# The fields of a trace listed by get_summaries()
+SUMMARY_FIELDS = ("id", "agent_network", "start_time", "duration", "status", "time_to_first_message")
+
+
+class TurnTraceStore:
+    """
+    Keeps the traces of the most recent turns, of all the users, in a ring buffer:
+    the oldest traces are dropped beyond max_traces traces, or beyond max_total_bytes of estimated memory.
+    The most recent trace is always kept.
+    See TurnTraceRecorder for the format of the traces.
+    Each trace can only be read by its owner, the browser of the user whose turn it is.
+    """
+
+    def __init__(self, max_traces: int = 200, max_total_bytes: int = 64 * 1024 * 1024):
+        """
+        Constructor
+        :param max_traces: The maximum number of traces kept
+        :param max_total_bytes: The maximum estimated memory of the traces kept, in bytes
+        """
+        self.max_traces: int = max_traces
+        self.max_total_bytes: int = max_total_bytes
+        # From the oldest to the most recent, and their estimated memory, in bytes
+        self.traces: Deque[Dict[str, Any]] = deque()
+        self.sizes: Deque[int] = deque()
+        self.total_bytes: int = 0
+        self.lock = threading.Lock()
+
+    def add(self, trace: Dict[str, Any]):
+        """
+        :param trace: The trace of a turn that ended. It must not change afterwards.
+        """
+        # Measured once, outside the lock, as the traces never change once added
+        size = UserSessionStore.estimate_size(trace)
+        with self.lock:
+            self.traces.append(trace)
+            self.sizes.append(size)
+            self.total_bytes += size
+            while len(self.traces) > self.max_traces or \
+                    (len(self.traces) > 1 and self.total_bytes > self.max_total_bytes):
+                self.traces.popleft()
+                self.total_bytes -= self.sizes.popleft()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        :return: The number of traces kept and their estimated memory
+        """
+        with self.lock:
+            return {
+                "traces": len(self.traces),
+                "max_traces": self.max_traces,
+                "estimated_bytes": self.total_bytes,
+                "max_total_bytes": self.max_total_bytes
+            }
+
+    def get(self, trace_id: str, owner: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        :param trace_id: The ID of a trace
+        :param owner: Who asks for the trace, e.g. the client ID kept in their Flask session
+        :return: The trace, or None if it is not kept, or no longer, or if it belongs to someone else
+        """
+        if owner is None:
+            return None
+        with self.lock:
+            traces = list(self.traces)
+        for trace in reversed(traces):
+            if trace["id"] == trace_id:
+                return trace if trace["owner"] == owner else None
+        return None
+
+    def get_summaries(self, owner: Optional[str], limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        :param owner: Who asks for the traces, e.g. the client ID kept in their Flask session
+        :param limit: The maximum number of traces to list
+        :return: The summaries of the traces of that owner, the most recent first
+        """
+        if owner is None:
+            return []
+        with self.lock:
+            traces = list(self.traces)
+        summaries = []
+        for trace in reversed(traces):
+            if trace["owner"] != owner:
+                continue
+            summaries.append({field: trace[field] for field in SUMMARY_FIELDS})
+            if len(summaries) >= limit:
+                break
+        return summaries
+
+    @staticmethod
+    def to_chrome_trace(trace: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Converts a trace to the Chrome trace event format, to open it in chrome://tracing or Perfetto.
+        Each span gets a row of its own, named after its origin chain, in the order of the waterfall.
+        :param trace: The trace of a turn
+        :return: The trace events, as a JSON-serializable dict
+        """
+        start_us = trace["start_time"] * 1e6
+        events = [
+            {"name": "process_name", "ph": "M", "pid": 1, "tid": 0,
+             "args": {"name": f"{trace['agent_network']} turn {trace['id']}"}},
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "turn"}},
+            {"name": "turn", "cat": "turn", "ph": "X", "pid": 1, "tid": 0, "ts": start_us,
+             "dur": trace["duration"] * 1e6, "args": {"status": trace["status"]}},
+        ]
+        stack = list(reversed(trace["spans"]))
+        tid = 0
+        while stack:
+            span = stack.pop()
+            tid += 1
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                           "args": {"name": " -> ".join(span["origin"])}})
+            events.append({"name": span["agent"], "cat": "agent", "ph": "X", "pid": 1, "tid": tid,
+                           "ts": start_us + span["first_seen"] * 1e6,
+                           "dur": (span["last_seen"] - span["first_seen"]) * 1e6,
+                           "args": {"messages": span["messages"]}})
+            stack.extend(reversed(span["children"]))
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
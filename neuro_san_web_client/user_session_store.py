@@ -0,0 +1,242 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UserSessionStore:
+    """
+    Keeps the user sessions of the web client, keyed by Socket.IO session ID, within hard bounds:
+      - at most max_sessions sessions: the least recently used one is evicted when a new one comes in
+      - sessions idle for more than idle_timeout_in_seconds are evicted by the sweeper
+      - when the estimated memory of all the sessions exceeds max_total_bytes,
+        the sweeper evicts the least recently used sessions until it doesn't.
+    Sessions with a turn in flight are never evicted: the bounds may be exceeded until their turns end.
+    The memory of a session is estimated by the caller, with record_size(), when its turns end:
+    the store never walks the sessions' states, which the turns in flight modify.
+    Sessions removed by a disconnect are not evicted: the caller releases them itself.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_timeout_in_seconds: float = 3600.0,
+                 max_total_bytes: int = 512 * 1024 * 1024,
+                 on_evict: Callable[[str, Dict[str, Any]], None] = None,
+                 is_busy: Callable[[Dict[str, Any]], bool] = None):
+        """
+        Constructor
+        :param max_sessions: The maximum number of sessions
+        :param idle_timeout_in_seconds: The time without any message after which a session is evicted
+        :param max_total_bytes: The maximum estimated memory of all the sessions, in bytes
+        :param on_evict: Called with the sid and the session of each evicted session, to release its resources
+        :param is_busy: Tells whether a session has a turn in flight, which keeps it from being evicted
+        """
+        self.max_sessions: int = max_sessions
+        self.idle_timeout_in_seconds: float = idle_timeout_in_seconds
+        self.max_total_bytes: int = max_total_bytes
+        self.on_evict: Callable[[str, Dict[str, Any]], None] = on_evict
+        self.is_busy: Callable[[Dict[str, Any]], bool] = is_busy
+        # sid -> user session, ordered from least to most recently used
+        self.sessions: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        # sid -> monotonic time of the last access
+        self.last_access: Dict[str, float] = {}
+        # sid -> estimated memory of the session when its last turn ended, in bytes
+        self.sizes: Dict[str, int] = {}
+        self.num_evicted: int = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        """
+        :param sid: The Socket.IO session ID
+        :return: The user session, or None if there is none
+        """
+        with self.lock:
+            user_session = self.sessions.get(sid)
+            if user_session is not None:
+                self.touch(sid)
+        return user_session
+
+    def set_default(self, sid: str, user_session: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adds a user session, unless there already is one for this sid
+        :param sid: The Socket.IO session ID
+        :param user_session: The user session to add
+        :return: The user session stored for this sid
+        """
+        with self.lock:
+            existing = self.sessions.get(sid)
+            if existing is not None:
+                self.touch(sid)
+                return existing
+            self.sessions[sid] = user_session
+            self.touch(sid)
+            evicted = []
+            for oldest_sid in list(self.sessions):
+                if len(self.sessions) <= self.max_sessions:
+                    break
+                if oldest_sid != sid and not self.is_session_busy(oldest_sid):
+                    evicted.append(self.remove(oldest_sid))
+        self.release(evicted)
+        return user_session
+
+    def pop(self, sid: str) -> Optional[Dict[str, Any]]:
+        """
+        Removes a user session
+        :param sid: The Socket.IO session ID
+        :return: The removed user session, or None if there was none
+        """
+        with self.lock:
+            self.last_access.pop(sid, None)
+            self.sizes.pop(sid, None)
+            return self.sessions.pop(sid, None)
+
+    def record_size(self, sid: str, size: int):
+        """
+        Records the estimated memory of a session, e.g. when one of its turns ends
+        :param sid: The Socket.IO session ID
+        :param size: The estimated memory of the session, in bytes
+        """
+        with self.lock:
+            if sid in self.sessions:
+                self.sizes[sid] = size
+
+    def touch(self, sid: str):
+        """
+        Marks a session as just used. Must be called with the lock held.
+        """
+        self.sessions.move_to_end(sid)
+        self.last_access[sid] = time.monotonic()
+
+    def is_session_busy(self, sid: str) -> bool:
+        """
+        :return: True if the session has a turn in flight. Must be called with the lock held.
+        """
+        return self.is_busy is not None and self.is_busy(self.sessions[sid])
+
+    def remove(self, sid: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Removes a session to evict it. Must be called with the lock held.
+        :return: The sid and the removed session
+        """
+        user_session = self.sessions.pop(sid)
+        self.last_access.pop(sid, None)
+        self.sizes.pop(sid, None)
+        return sid, user_session
+
+    def release(self, evicted: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Releases the resources of evicted sessions, outside the lock
+        """
+        self.num_evicted += len(evicted)
+        for sid, user_session in evicted:
+            logger.info("Evicting user session %s", sid)
+            if self.on_evict is not None:
+                self.on_evict(sid, user_session)
+
+    def sweep(self):
+        """
+        Evicts the idle sessions, then the least recently used sessions while a bound is exceeded,
+        skipping the sessions with a turn in flight
+        """
+        now = time.monotonic()
+        evicted = []
+        with self.lock:
+            for sid in list(self.sessions):
+                if now - self.last_access[sid] <= self.idle_timeout_in_seconds:
+                    break
+                if not self.is_session_busy(sid):
+                    evicted.append(self.remove(sid))
+            total_bytes = sum(self.sizes.values())
+            for sid in list(self.sessions):
+                if len(self.sessions) <= 1 or \
+                        (total_bytes <= self.max_total_bytes and len(self.sessions) <= self.max_sessions):
+                    break
+                if not self.is_session_busy(sid):
+                    total_bytes -= self.sizes.get(sid, 0)
+                    evicted.append(self.remove(sid))
+        self.release(evicted)
+
+    def run_sweeper(self, sleep: Callable[[float], None], interval_in_seconds: float):
+        """
+        Sweeps the sessions forever. Meant to be started as a background task.
+        :param sleep: The sleep function of the async mode in use, e.g. socketio.sleep
+        :param interval_in_seconds: The time between two sweeps
+        """
+        while True:
+            sleep(interval_in_seconds)
+            try:
+                self.sweep()
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                # Keep sweeping
+                logger.exception("Error sweeping user sessions")
+
+    def get_stats(self, top: int = 20) -> Dict[str, Any]:
+        """
+        :param top: The number of largest sessions to detail
+        :return: The number of sessions, their estimated memory and the details of the largest ones.
+                 Session IDs are not included.
+        """
+        now = time.monotonic()
+        with self.lock:
+            details = [
+                {
+                    "idle_seconds": round(now - self.last_access[sid], 1),
+                    "estimated_bytes": self.sizes.get(sid, 0)
+                }
+                for sid in self.sessions
+            ]
+        details.sort(key=lambda detail: detail["estimated_bytes"], reverse=True)
+        return {
+            "sessions": len(details),
+            "max_sessions": self.max_sessions,
+            "evicted_sessions": self.num_evicted,
+            "estimated_bytes": sum(detail["estimated_bytes"] for detail in details),
+            "max_total_bytes": self.max_total_bytes,
+            "largest_sessions": details[:top]
+        }
+
+    @staticmethod
+    def estimate_size(obj: Any) -> int:
+        """
+        Estimates the memory used by a session state: the sizes of the containers, strings and numbers
+        it is made of, each counted once. The object must not change while it is measured.
+        :param obj: The object to measure
+        :return: The estimated size, in bytes
+        """
+        seen = set()
+        size = 0
+        to_visit = [obj]
+        while to_visit:
+            current = to_visit.pop()
+            if id(current) in seen:
+                continue
+            seen.add(id(current))
+            size += sys.getsizeof(current)
+            if isinstance(current, dict):
+                to_visit.extend(current.keys())
+                to_visit.extend(current.values())
+            elif isinstance(current, (list, tuple, set, frozenset)):
+                to_visit.extend(current)
+        return size
@@ -0,0 +1,55 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Any
+
+WIRE_FORMATS = ['text', 'compact', 'msgpack']
+
+
+class WireFormat:
+    """
+    How the agent logs and responses are sent to the browser:
+    - 'text': JSON events, each agent log formatted as a string with its header and origin chain
+    - 'compact': JSON events, with the agent names sent once per session and referred to by their ids,
+      and the agent logs formatted by the browser
+    - 'msgpack': like 'compact', with the events serialized with MessagePack and sent as binary frames
+    The WebSocket transport compresses the frames when the browser offers per-message deflate, as browsers do.
+    """
+
+    def __init__(self, name: str = 'text'):
+        """
+        Constructor
+        :param name: The name of the wire format, one of WIRE_FORMATS
+        """
+        if name not in WIRE_FORMATS:
+            raise ValueError(f"Unknown wire format {name!r}, expected one of {WIRE_FORMATS}")
+        self.name: str = name
+        self.packb = None
+        if name == 'msgpack':
+            # Only needed, and only imported, in that format
+            # pylint: disable=import-outside-toplevel
+            import msgpack
+            self.packb = msgpack.packb
+
+    def is_compact(self) -> bool:
+        """
+        :return: True if the agent names are interned and the agent logs formatted by the browser
+        """
+        return self.name != 'text'
+
+    def encode(self, data: Any) -> Any:
+        """
+        :param data: The data of an event
+        :return: The data to emit: bytes in the msgpack format, the data itself otherwise
+        """
+        if self.packb is not None:
+            return self.packb(data)
+        return data
@@ -0,0 +1,79 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import signal
+import subprocess
+import sys
+import time
+from typing import List
+
+
+class WorkerLauncher:
+    """
+    Starts several web client processes, one per port from base_port on, to use all the cores of a machine.
+    A reverse proxy with sticky routing, e.g. nginx with ip_hash, spreads the users over them.
+    The workers send their Socket.IO events through the shared message queue,
+    so that any of them can emit to a user connected to another one.
+    """
+
+    def __init__(self, num_workers: int, base_port: int, worker_args: List[str]):
+        """
+        Constructor
+        :param num_workers: The number of worker processes
+        :param base_port: The port of the first worker. The others listen on the next ports.
+        :param worker_args: The command line arguments of the launcher, passed on to the workers
+        """
+        self.num_workers: int = num_workers
+        self.base_port: int = base_port
+        self.worker_args: List[str] = worker_args
+        self.processes: List[subprocess.Popen] = []
+
+    def get_worker_command(self, port: int) -> List[str]:
+        """
+        :param port: The port the worker listens on
+        :return: The command line starting a worker. The last occurrence of an argument wins.
+                 The workers never run in debug mode: its reloader would start each of them twice,
+                 and its debugger runs any code it is sent.
+        """
+        return [sys.executable, "-m", "neuro_san_web_client.app"] + self.worker_args + \
+            ["--workers", "1", "--web-client-port", str(port), "--no-debug"]
+
+    def run(self):
+        """
+        Starts the workers and waits for them. Stops all of them when one exits or when interrupted.
+        """
+        # Stop the workers on SIGTERM as on Ctrl-C
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        for index in range(self.num_workers):
+            port = self.base_port + index
+            print(f"Starting worker {index} on port {port}")
+            self.processes.append(subprocess.Popen(self.get_worker_command(port)))
+        try:
+            while all(process.poll() is None for process in self.processes):
+                time.sleep(1)
+            print("A worker exited, stopping the others")
+        except KeyboardInterrupt:
+            print("Interrupted, stopping the workers")
+        finally:
+            self.stop()
+
+    def stop(self):
+        """
+        Stops the workers still running
+        """
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
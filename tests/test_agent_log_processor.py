@@ -0,0 +1,67 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import List
+from typing import Tuple
+from unittest import TestCase
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+
+from neuro_san_web_client.agent_log_processor import AgentLogProcessor
+from neuro_san_web_client.wire_format import WireFormat
+
+
+class RecordingSocketIO:
+    """
+    Records the events emitted, in place of the Socket.IO server
+    """
+
+    def __init__(self):
+        self.events: List[Tuple[str, Any]] = []
+
+    def emit(self, event: str, data: Any = None, room: str = None):
+        self.events.append((event, data))
+
+    @staticmethod
+    def sleep(seconds: float = 0):
+        pass
+
+
+def agent_message(*agent_names: str) -> dict:
+    """
+    :return: A chat message from the last agent, through the others
+    """
+    return {"origin": [{"tool": agent_name} for agent_name in agent_names], "text": "hi"}
+
+
+class TestAgentLogProcessor(TestCase):
+    """
+    Tests the compact wire format of the agent logs
+    """
+
+    def test_compact_first_batch_resets(self):
+        """
+        Each processor sends the agent names once, from id 0, and tells the browser to reset them in its first event
+        """
+        socketio = RecordingSocketIO()
+        processor = AgentLogProcessor(socketio, "sid", max_batch_size=1, wire_format=WireFormat("compact"))
+        processor.process_message(agent_message("front_man"), ChatMessageType.AGENT)
+        processor.process_message(agent_message("front_man", "tool"), ChatMessageType.AGENT)
+        # A new session on the server, e.g. once the previous one was evicted, numbers the agents from 0 again
+        evicted_processor = AgentLogProcessor(socketio, "sid", max_batch_size=1, wire_format=WireFormat("compact"))
+        evicted_processor.process_message(agent_message("tool"), ChatMessageType.AGENT)
+
+        self.assertEqual(["agent_logs_compact"] * 3, [event for event, _ in socketio.events])
+        first, second, third = [data for _, data in socketio.events]
+        self.assertEqual({"agents": ["front_man"], "agent": 0, "logs": [[[0], "hi"]], "reset": True}, first)
+        self.assertEqual({"agents": ["tool"], "agent": 1, "logs": [[[0, 1], "hi"]]}, second)
+        self.assertEqual({"agents": ["tool"], "agent": 0, "logs": [[[0], "hi"]], "reset": True}, third)
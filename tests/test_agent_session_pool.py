@@ -0,0 +1,93 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+from benchmarks.stub_neuro_san_server import StubNeuroSanServer
+from neuro_san_web_client.agent_session_pool import AgentSessionPool
+
+HOST = "127.0.0.1"
+# The stub server serves any agent network name
+STUB_AGENT_NAME = "stub_network"
+
+
+class TestAgentSessionPool(TestCase):
+    """
+    Tests the sharing of the agent sessions, against the stub neuro-san server of the benchmarks
+    """
+
+    def setUp(self):
+        self.stub_server = StubNeuroSanServer()
+        self.stub_server.start()
+        self.port = self.stub_server.port
+
+    def tearDown(self):
+        self.stub_server.stop()
+
+    def test_acquire_release(self):
+        """
+        The users of the same agent network on the same server share its session, the others get their own
+        """
+        pool = AgentSessionPool()
+        first = pool.acquire(HOST, self.port, STUB_AGENT_NAME)
+        second = pool.acquire(HOST, self.port, STUB_AGENT_NAME)
+        other = pool.acquire(HOST, self.port, "other_network")
+        self.assertIs(first, second)
+        self.assertIsNot(first["session"], other["session"])
+        self.assertEqual(2, first["users"])
+        self.assertEqual({"size": 2, "in_use": 2}, pool.get_stats())
+        self.assertTrue(AgentSessionPool.is_healthy(first["session"]))
+
+        pool.release(first)
+        pool.release(second)
+        pool.release(other)
+        self.assertEqual({"size": 2, "in_use": 0}, pool.get_stats())
+        # Releasing more than acquired is ignored
+        pool.release(first)
+        self.assertEqual(0, first["users"])
+        # An idle session is handed out again
+        self.assertIs(first["session"], pool.acquire(HOST, self.port, STUB_AGENT_NAME)["session"])
+
+    def test_release_own_entry(self):
+        """
+        Releasing a session evicted while in use leaves the session that replaced it under the same key alone
+        """
+        pool = AgentSessionPool(max_size=1)
+        evicted = pool.acquire(HOST, self.port, STUB_AGENT_NAME)
+        # Evicts the only session, although it is in use, to stay within max_size
+        pool.acquire(HOST, self.port, "other_network")
+        replacement = pool.acquire(HOST, self.port, STUB_AGENT_NAME)
+        self.assertIsNot(evicted, replacement)
+        self.assertEqual(1, replacement["users"])
+
+        pool.release(evicted)
+        self.assertEqual(0, evicted["users"])
+        self.assertEqual(1, replacement["users"])
+        self.assertEqual({"size": 1, "in_use": 1}, pool.get_stats())
+
+    def test_health_check_and_idle_timeout(self):
+        """
+        An idle session is checked against the server before it is handed out again, and replaced if it fails.
+        A session idle for longer than the idle timeout is evicted.
+        """
+        pool = AgentSessionPool(health_check_interval_in_seconds=0)
+        entry = pool.acquire(HOST, self.port, STUB_AGENT_NAME)
+        pool.release(entry)
+        self.assertIs(entry, pool.acquire(HOST, self.port, STUB_AGENT_NAME))
+        pool.release(entry)
+
+        self.stub_server.stop()
+        self.assertIsNot(entry, pool.acquire(HOST, self.port, STUB_AGENT_NAME))
+
+        pool = AgentSessionPool(idle_timeout_in_seconds=0)
+        entry = pool.acquire(HOST, self.port, STUB_AGENT_NAME)
+        pool.release(entry)
+        self.assertIsNot(entry, pool.acquire(HOST, self.port, STUB_AGENT_NAME))
@@ -0,0 +1,184 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from neuro_san_web_client.conversation_state_store import ConversationStateStore
+from neuro_san_web_client.conversation_state_store_factory import ConversationStateStoreFactory
+from neuro_san_web_client.in_memory_conversation_state_store import InMemoryConversationStateStore
+from neuro_san_web_client.sqlite_conversation_state_store import SqliteConversationStateStore
+
+STATE = {
+    "chat_context": {"chat_histories": [{"messages": [{"type": "AI", "text": "Hello"}]}]},
+    "sly_data": {"user_id": 42},
+    "last_chat_response": "Hello"
+}
+
+
+class ConversationStateStoreTests:
+    """
+    The behavior every conversation state store has, run against each of them by the test cases below
+    """
+
+    def create_store(self, ttl_in_seconds: float = 86400) -> ConversationStateStore:
+        """
+        :param ttl_in_seconds: The time after its last update after which a conversation state is dropped
+        :return: A new, empty store
+        """
+        raise NotImplementedError
+
+    def test_set_get_delete(self):
+        """
+        A state reads back as it was saved, until it is deleted
+        """
+        store = self.create_store()
+        self.assertIsNone(store.get("conversation"))
+        store.set("conversation", STATE)
+        self.assertEqual(STATE, store.get("conversation"))
+
+        updated = dict(STATE, last_chat_response="Bye")
+        store.set("conversation", updated)
+        self.assertEqual(updated, store.get("conversation"))
+
+        store.delete("conversation")
+        self.assertIsNone(store.get("conversation"))
+        # Deleting an unknown conversation is not an error
+        store.delete("conversation")
+        store.close()
+
+    def test_conversations_are_isolated(self):
+        """
+        Each conversation only reads its own state, and deleting one leaves the others alone
+        """
+        store = self.create_store()
+        store.set("first", STATE)
+        store.set("second", dict(STATE, sly_data={"user_id": 7}))
+        self.assertEqual({"user_id": 42}, store.get("first")["sly_data"])
+        self.assertEqual({"user_id": 7}, store.get("second")["sly_data"])
+
+        store.delete("first")
+        self.assertIsNone(store.get("first"))
+        self.assertEqual({"user_id": 7}, store.get("second")["sly_data"])
+        store.close()
+
+    def test_expired_states_are_dropped(self):
+        """
+        A state is no longer returned once its time to live has passed
+        """
+        store = self.create_store(ttl_in_seconds=-1)
+        store.set("conversation", STATE)
+        self.assertIsNone(store.get("conversation"))
+        store.close()
+
+
+class TestInMemoryConversationStateStore(ConversationStateStoreTests, TestCase):
+    """
+    Tests the store keeping the conversation states in the memory of the process
+    """
+
+    def create_store(self, ttl_in_seconds: float = 86400) -> ConversationStateStore:
+        return InMemoryConversationStateStore(ttl_in_seconds=ttl_in_seconds)
+
+    def test_snapshots(self):
+        """
+        The store keeps a snapshot of the state: changing the state saved, or the one read, doesn't change the store
+        """
+        store = self.create_store()
+        state = json.loads(json.dumps(STATE))
+        store.set("conversation", state)
+        state["sly_data"]["user_id"] = 0
+        state["chat_context"]["chat_histories"].clear()
+        self.assertEqual(STATE, store.get("conversation"))
+
+        read = store.get("conversation")
+        read["sly_data"]["user_id"] = 0
+        self.assertEqual(STATE, store.get("conversation"))
+
+    def test_bounds(self):
+        """
+        The least recently used states are dropped beyond max_entries or max_total_bytes,
+        and the total size counts the snapshots kept
+        """
+        snapshot_size = len(json.dumps(STATE))
+        store = InMemoryConversationStateStore(max_entries=2)
+        store.set("first", STATE)
+        store.set("second", STATE)
+        store.get("first")
+        store.set("third", STATE)
+        self.assertIsNone(store.get("second"))
+        self.assertIsNotNone(store.get("first"))
+        self.assertEqual(2 * snapshot_size, store.get_total_bytes())
+
+        store = InMemoryConversationStateStore(max_total_bytes=2 * snapshot_size)
+        for conversation_id in ("first", "second", "third"):
+            store.set(conversation_id, STATE)
+        self.assertIsNone(store.get("first"))
+        self.assertEqual(2 * snapshot_size, store.get_total_bytes())
+        store.delete("second")
+        store.delete("third")
+        self.assertEqual(0, store.get_total_bytes())
+
+        # A state larger than the whole store is not kept, and does not evict the others
+        store.set("first", STATE)
+        store.set("large", dict(STATE, last_chat_response="x" * 2 * snapshot_size))
+        self.assertIsNone(store.get("large"))
+        self.assertEqual(STATE, store.get("first"))
+
+
+class TestSqliteConversationStateStore(ConversationStateStoreTests, TestCase):
+    """
+    Tests the store keeping the conversation states in a SQLite database file
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.temp_dir.name, "conversations.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_store(self, ttl_in_seconds: float = 86400) -> ConversationStateStore:
+        return SqliteConversationStateStore(self.database_path, ttl_in_seconds=ttl_in_seconds)
+
+    def test_shared_between_stores(self):
+        """
+        The states are kept in the database file, where another store, e.g. of another worker, reads them
+        """
+        store = self.create_store()
+        other_store = self.create_store()
+        store.set("conversation", STATE)
+        self.assertEqual(STATE, other_store.get("conversation"))
+        other_store.delete("conversation")
+        self.assertIsNone(store.get("conversation"))
+        store.close()
+        other_store.close()
+
+
+class TestConversationStateStoreFactory(TestCase):
+    """
+    Tests the creation of the conversation state stores from their URL
+    """
+
+    def test_create_store(self):
+        """
+        "none" keeps no state, the other URLs create their store, and an unknown URL is refused
+        """
+        self.assertIsNone(ConversationStateStoreFactory.create_store("none"))
+        self.assertIsInstance(ConversationStateStoreFactory.create_store("memory"), InMemoryConversationStateStore)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = ConversationStateStoreFactory.create_store(f"sqlite:///{temp_dir}/conversations.db")
+            self.assertIsInstance(store, SqliteConversationStateStore)
+            store.close()
+        with self.assertRaises(ValueError):
+            ConversationStateStoreFactory.create_store("postgres://localhost")
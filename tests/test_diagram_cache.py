@@ -0,0 +1,129 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import List
+from unittest import TestCase
+
+from neuro_san_web_client.agents_diagram_builder import DiagramBuilder
+from neuro_san_web_client.diagram_cache import DiagramCache
+
+
+class TestDiagramCache(TestCase):
+    """
+    Tests that the graphs of the agent networks are only built when their .hocon file changes,
+    within the bounds of the cache
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # The .hocon files whose graph was built, in order
+        self.builds: List[str] = []
+        self.build_delay_in_seconds: float = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_cache(self, **kwargs) -> DiagramCache:
+        """
+        :return: A cache recording the graphs it builds
+        """
+        cache = DiagramCache(**kwargs)
+
+        def load_agent_graph(hocon_file):
+            self.builds.append(os.path.basename(hocon_file))
+            time.sleep(self.build_delay_in_seconds)
+            return DiagramBuilder.load_agent_graph(hocon_file)
+        cache.diagram_builder.load_agent_graph = load_agent_graph
+        return cache
+
+    def write_network(self, name: str, tools: List[str], mtime_ns: int = None) -> str:
+        """
+        Writes an agent network whose front man calls the given tools
+        :return: The path to its .hocon file
+        """
+        hocon_file = os.path.join(self.temp_dir.name, f"{name}.hocon")
+        agents = [{"name": "front_man", "instructions": "Answer", "tools": tools}] + \
+            [{"name": tool, "instructions": "Help"} for tool in tools]
+        # JSON is valid HOCON
+        with open(hocon_file, "w", encoding="utf-8") as file:
+            json.dump({"tools": agents}, file)
+        if mtime_ns is not None:
+            os.utime(hocon_file, ns=(mtime_ns, mtime_ns))
+        return hocon_file
+
+    def test_hit_and_invalidation(self):
+        """
+        A graph is built once, then rebuilt when its .hocon file changes or is invalidated
+        """
+        cache = self.create_cache()
+        hocon_file = self.write_network("network", ["a"], mtime_ns=10**18)
+        payload, etag = cache.get_graph(hocon_file)
+        self.assertEqual((payload, etag), cache.get_graph(hocon_file))
+        self.assertEqual(["network.hocon"], self.builds)
+
+        # Same size, another modification time
+        self.write_network("network", ["b"], mtime_ns=2 * 10**18)
+        changed_payload, changed_etag = cache.get_graph(hocon_file)
+        self.assertNotEqual(etag, changed_etag)
+        self.assertIn(b'"b"', changed_payload)
+        self.assertEqual(["network.hocon"] * 2, self.builds)
+
+        cache.invalidate(hocon_file)
+        self.assertEqual(0, cache.graph_bytes)
+        self.assertEqual((changed_payload, changed_etag), cache.get_graph(hocon_file))
+        self.assertEqual(["network.hocon"] * 3, self.builds)
+
+    def test_lru_bounds(self):
+        """
+        The least recently used graphs are dropped beyond max_entries or max_total_bytes,
+        but the most recently used one is always kept
+        """
+        cache = self.create_cache(max_entries=2)
+        first, second, third = [self.write_network(name, ["a"]) for name in ("first", "second", "third")]
+        cache.get_graph(first)
+        cache.get_graph(second)
+        cache.get_graph(first)
+        cache.get_graph(third)
+        self.assertEqual(2, len(cache.graphs))
+        # The second graph was the least recently used
+        cache.get_graph(first)
+        cache.get_graph(second)
+        self.assertEqual(["first.hocon", "second.hocon", "third.hocon", "second.hocon"], self.builds)
+        self.assertEqual(sum(len(entry["payload"]) for entry in cache.graphs.values()), cache.graph_bytes)
+
+        cache = self.create_cache(max_total_bytes=1)
+        cache.get_graph(first)
+        cache.get_graph(second)
+        self.assertEqual([os.path.abspath(second)], list(cache.graphs))
+
+    def test_concurrent_misses_build_once(self):
+        """
+        Concurrent requests for a graph that is not cached wait for a single build
+        """
+        cache = self.create_cache()
+        hocon_file = self.write_network("network", ["a"])
+        self.build_delay_in_seconds = 0.2
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_graph(hocon_file))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        self.assertEqual(["network.hocon"], self.builds)
+        self.assertEqual(8, len(results))
+        self.assertEqual(1, len(set(results)))
+        self.assertEqual({}, cache.builds)
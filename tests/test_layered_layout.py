@@ -0,0 +1,68 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Dict
+from typing import Tuple
+from unittest import TestCase
+
+from neuro_san_web_client.layered_layout import LayeredLayout
+
+
+def get_layers(positions: Dict[str, Tuple[float, float]], layer_spacing: float = 150) -> Dict[str, int]:
+    """
+    :return: Node id -> index of its layer
+    """
+    return {node_id: round(y / layer_spacing) for node_id, (_, y) in positions.items()}
+
+
+class TestLayeredLayout(TestCase):
+    """
+    Tests the layer assignment of the agent network layout, with cycles and disconnected nodes
+    """
+
+    def test_longest_path_layers(self):
+        """
+        Each node is on the layer after its deepest predecessor, and the layers are centered
+        """
+        positions = LayeredLayout().compute(
+            ["front_man", "a", "b", "c"],
+            [("front_man", "a"), ("front_man", "b"), ("a", "c"), ("front_man", "c")])
+        self.assertEqual({"front_man": 0, "a": 1, "b": 1, "c": 2}, get_layers(positions))
+        self.assertEqual((0.0, 0.0), positions["front_man"])
+        self.assertEqual([-90.0, 90.0], sorted([positions["a"][0], positions["b"][0]]))
+
+    def test_cycles(self):
+        """
+        The edges closing a cycle are reversed, starting the search from the first node, and self calls are ignored
+        """
+        positions = LayeredLayout().compute(
+            ["front_man", "a", "b"],
+            [("front_man", "a"), ("a", "b"), ("b", "front_man"), ("b", "a"), ("a", "a")])
+        self.assertEqual({"front_man": 0, "a": 1, "b": 2}, get_layers(positions))
+
+    def test_disconnected_nodes(self):
+        """
+        The nodes nobody calls start their own part of the graph on the first layer,
+        and the nodes only found in the edges are laid out too
+        """
+        positions = LayeredLayout(layer_spacing=100, node_spacing=50).compute(
+            ["front_man", "alone"], [("front_man", "a"), ("other", "b")])
+        self.assertEqual({"front_man": 0, "alone": 0, "other": 0, "a": 1, "b": 1},
+                         get_layers(positions, layer_spacing=100))
+        # Each layer is centered, with distinct positions
+        self.assertEqual([-50.0, 0.0, 50.0], sorted(x for x, y in positions.values() if y == 0))
+        self.assertEqual([-25.0, 25.0], sorted(x for x, y in positions.values() if y == 100))
+
+    def test_empty(self):
+        """
+        An empty graph has no positions
+        """
+        self.assertEqual({}, LayeredLayout().compute([], []))
@@ -0,0 +1,51 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import threading
+from unittest import TestCase
+
+from neuro_san_web_client.metrics import MetricsRegistry
+
+
+class TestMetrics(TestCase):
+    """
+    Tests that the metrics updated by short-lived threads keep their values, without keeping a shard per thread
+    """
+
+    def test_short_lived_threads(self):
+        """
+        The shards of the threads that exited are folded into the retired shard
+        """
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter", label_names=("agent",))
+        histogram = registry.histogram("test_seconds", "Test histogram", buckets=(0.1, 1.0))
+
+        def update():
+            counter.inc("front_man")
+            histogram.observe(0.5)
+
+        num_threads = 200
+        for _ in range(num_threads):
+            thread = threading.Thread(target=update)
+            thread.start()
+            thread.join()
+        # This thread's shard, and the retired one
+        counter.inc("front_man")
+        histogram.observe(2.0)
+        self.assertLessEqual(len(counter.shards), 2)
+        self.assertLessEqual(len(histogram.shards), 2)
+
+        self.assertEqual({("front_man",): num_threads + 1}, counter.sum_shards())
+        rendered = registry.render()
+        self.assertIn('test_total{agent="front_man"} 201', rendered)
+        self.assertIn('test_seconds_bucket{le="1"} 200', rendered)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 201', rendered)
+        self.assertIn("test_seconds_sum 102", rendered)
@@ -0,0 +1,71 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from neuro_san_web_client.thinking_file_processor import ThinkingFileWriter
+
+
+def wait_for_file(file_path: str, timeout_in_seconds: float = 10) -> bool:
+    """
+    :return: True if the file exists before the timeout
+    """
+    deadline = time.monotonic() + timeout_in_seconds
+    while not os.path.exists(file_path):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestThinkingFileWriter(TestCase):
+    """
+    Tests the background writer of the thinking files
+    """
+
+    def test_delete_after_pending_lines(self):
+        """
+        A file deleted while its lines span several batches of the writer is not recreated by the later batches
+        """
+        writer = ThinkingFileWriter(max_pending_lines=100000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            deleted_file = os.path.join(temp_dir, "deleted.txt")
+            other_file = os.path.join(temp_dir, "other.txt")
+            for index in range(10000):
+                writer.write(deleted_file, f"line {index}")
+            writer.delete(deleted_file)
+            # Written once the writer is past the delete marker
+            writer.write(other_file, "last line")
+
+            self.assertTrue(wait_for_file(other_file))
+            self.assertFalse(os.path.exists(deleted_file))
+            self.assertEqual(0, writer.num_pending_lines)
+
+    def test_drop_lines_beyond_max_pending_lines(self):
+        """
+        The lines beyond max_pending_lines are dropped, but deleting a file is never dropped
+        """
+        writer = ThinkingFileWriter(max_pending_lines=10)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "thinking.txt")
+            for index in range(1000):
+                writer.write(file_path, f"line {index}")
+            self.assertGreater(writer.num_dropped_lines, 0)
+            self.assertTrue(wait_for_file(file_path))
+            writer.delete(file_path)
+            other_file = os.path.join(temp_dir, "other.txt")
+            writer.write(other_file, "last line")
+
+            self.assertTrue(wait_for_file(other_file))
+            self.assertFalse(os.path.exists(file_path))
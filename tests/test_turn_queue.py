@@ -0,0 +1,160 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+import asyncio
+import threading
+from unittest import TestCase
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+
+from neuro_san_web_client.turn_cancellation_processor import TurnCancellationProcessor
+from neuro_san_web_client.turn_cancelled_error import TurnCancelledError
+from neuro_san_web_client.turn_queue import TurnQueue
+
+
+def run_turn(turn_queue: TurnQueue, started: threading.Event, stop: threading.Event, results: list):
+    """
+    Plays a turn the way the web client does: waits for it, then receives messages until it is cancelled or stopped
+    """
+    processor = TurnCancellationProcessor(turn_queue)
+    turn = turn_queue.admit()
+    turn_queue.wait(turn)
+    turn_queue.start(turn)
+    try:
+        if turn["cancelled"] is not None:
+            raise TurnCancelledError(turn["cancelled"])
+        started.set()
+        while not stop.wait(timeout=0.01):
+            processor.process_message({}, ChatMessageType.AGENT)
+        results.append("completed")
+    except TurnCancelledError as error:
+        results.append(str(error))
+    finally:
+        turn_queue.leave(turn)
+
+
+class TestTurnQueue(TestCase):
+    """
+    Tests the ordering and the cancellation of the turns of a user session
+    """
+
+    def test_queue_policy(self):
+        """
+        The next messages wait for the running turn, in order, and the ones beyond max_depth are rejected
+        """
+        turn_queue = TurnQueue(max_depth=1, policy='queue')
+        first = turn_queue.admit()
+        with turn_queue.condition:
+            self.assertTrue(turn_queue.is_ready(first))
+        turn_queue.start(first)
+        second = turn_queue.admit()
+        third = turn_queue.admit()
+        self.assertIsNone(second["cancelled"])
+        self.assertEqual("rejected", third["cancelled"])
+
+        with turn_queue.condition:
+            self.assertFalse(turn_queue.is_ready(second))
+        self.assertTrue(turn_queue.is_busy())
+        turn_queue.leave(first)
+
+        with turn_queue.condition:
+            self.assertTrue(turn_queue.is_ready(second))
+        turn_queue.start(second)
+        turn_queue.leave(second)
+        self.assertFalse(turn_queue.is_busy())
+
+    def test_reject_policy(self):
+        """
+        A message arriving while a turn is running is rejected
+        """
+        turn_queue = TurnQueue(policy='reject')
+        first = turn_queue.admit()
+        turn_queue.start(first)
+        self.assertEqual("rejected", turn_queue.admit()["cancelled"])
+        turn_queue.leave(first)
+        self.assertIsNone(turn_queue.admit()["cancelled"])
+
+    def test_coalesce_policy(self):
+        """
+        A new message supersedes the running turn and the waiting messages
+        """
+        turn_queue = TurnQueue(policy='coalesce')
+        running = turn_queue.admit()
+        turn_queue.start(running)
+        waiting = turn_queue.admit()
+        latest = turn_queue.admit()
+        self.assertEqual("superseded", running["cancelled"])
+        self.assertEqual("superseded", waiting["cancelled"])
+        self.assertIsNone(latest["cancelled"])
+        with self.assertRaises(TurnCancelledError):
+            turn_queue.check_cancelled()
+
+        # The latest message only starts once the superseded turn stops
+        with turn_queue.condition:
+            self.assertFalse(turn_queue.is_ready(latest))
+        turn_queue.leave(running)
+        with turn_queue.condition:
+            self.assertTrue(turn_queue.is_ready(latest))
+
+    def test_abandoned_turns_stop(self):
+        """
+        Closing the queue when the user disconnects stops the running turn at its next message,
+        cancels the waiting ones, and the abandoned turns running drop back to zero
+        """
+        abandoned_before = TurnQueue.get_stats()["abandoned_turns_running"]
+        turn_queue = TurnQueue(max_depth=4, policy='queue')
+        started = threading.Event()
+        stop = threading.Event()
+        results = []
+        threads = [threading.Thread(target=run_turn, args=(turn_queue, started, stop, results)) for _ in range(3)]
+        threads[0].start()
+        self.assertTrue(started.wait(timeout=5))
+        for thread in threads[1:]:
+            thread.start()
+
+        turn_queue.close("disconnected")
+        for thread in threads:
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+
+        self.assertEqual(["disconnected"] * 3, results)
+        self.assertEqual(abandoned_before, TurnQueue.get_stats()["abandoned_turns_running"])
+        self.assertFalse(turn_queue.is_busy())
+        # The messages arriving after the disconnection are cancelled right away
+        self.assertEqual("disconnected", turn_queue.admit()["cancelled"])
+
+    def test_wait_async(self):
+        """
+        A turn waits on the event loop until the running turn leaves, or until it is cancelled
+        """
+        async def wait_for_turns():
+            turn_queue = TurnQueue(policy='queue')
+            first = turn_queue.admit()
+            turn_queue.start(first)
+            second = turn_queue.admit()
+            waiting = asyncio.create_task(turn_queue.wait_async(second))
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiting.done())
+            # Leaves from another thread, like the thread pool running the turns
+            await asyncio.get_running_loop().run_in_executor(None, turn_queue.leave, first)
+            await asyncio.wait_for(waiting, timeout=5)
+            turn_queue.start(second)
+
+            third = turn_queue.admit()
+            waiting = asyncio.create_task(turn_queue.wait_async(third))
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiting.done())
+            turn_queue.close("disconnected")
+            await asyncio.wait_for(waiting, timeout=5)
+            self.assertEqual("disconnected", third["cancelled"])
+            turn_queue.leave(second)
+
+        asyncio.run(wait_for_turns())
@@ -0,0 +1,79 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+from neuro_san.internals.messages.chat_message_type import ChatMessageType
+
+from neuro_san_web_client.turn_trace_recorder import TurnTraceRecorder
+from neuro_san_web_client.turn_trace_store import TurnTraceStore
+
+
+class TestTurnTraceRecorder(TestCase):
+    """
+    Tests that each turn ends its own trace only, and that only its owner reads it
+    """
+
+    def test_end_own_turn_only(self):
+        """
+        Ending a turn that is not in progress, e.g. a rejected message's, leaves the running turn's trace alone
+        """
+        trace_store = TurnTraceStore()
+        recorder = TurnTraceRecorder(trace_store, "client", "network")
+        running = recorder.start_turn()
+        recorder.process_message({"origin": [{"tool": "front_man"}], "text": "hi"}, ChatMessageType.AGENT)
+
+        self.assertIsNone(recorder.end_turn("rejected message", "rejected"))
+        self.assertIsNone(trace_store.get(running, "client"))
+
+        self.assertEqual(running, recorder.end_turn(running, "completed"))
+        trace = trace_store.get(running, "client")
+        self.assertEqual("completed", trace["status"])
+        self.assertEqual(1, trace["agents"]["front_man"]["messages"])
+        # A failure after the turn completed does not end it again
+        self.assertIsNone(recorder.end_turn(running, "failed"))
+        self.assertEqual("completed", trace_store.get(running, "client")["status"])
+
+    def test_owner_only(self):
+        """
+        The traces are only listed and returned to their owner
+        """
+        trace_store = TurnTraceStore()
+        for owner in ("client", "other client", None):
+            recorder = TurnTraceRecorder(trace_store, owner, "network")
+            recorder.end_turn(recorder.start_turn(), "completed")
+
+        summaries = trace_store.get_summaries("client")
+        self.assertEqual(1, len(summaries))
+        self.assertNotIn("sid", summaries[0])
+        self.assertNotIn("owner", summaries[0])
+        trace_id = summaries[0]["id"]
+        self.assertIsNotNone(trace_store.get(trace_id, "client"))
+        self.assertIsNone(trace_store.get(trace_id, "other client"))
+        self.assertIsNone(trace_store.get(trace_id, None))
+        self.assertEqual([], trace_store.get_summaries(None))
+
+    def test_store_bounds(self):
+        """
+        The oldest traces are dropped beyond max_traces or max_total_bytes, but the most recent one is always kept
+        """
+        trace_store = TurnTraceStore(max_traces=2)
+        recorder = TurnTraceRecorder(trace_store, "client", "network")
+        trace_ids = [recorder.end_turn(recorder.start_turn(), "completed") for _ in range(3)]
+        self.assertEqual(trace_ids[1:], [summary["id"] for summary in reversed(trace_store.get_summaries("client"))])
+
+        trace_store = TurnTraceStore(max_total_bytes=1)
+        recorder = TurnTraceRecorder(trace_store, "client", "network")
+        trace_ids = [recorder.end_turn(recorder.start_turn(), "completed") for _ in range(3)]
+        self.assertEqual([trace_ids[-1]], [summary["id"] for summary in trace_store.get_summaries("client")])
+        stats = trace_store.get_stats()
+        self.assertEqual(1, stats["traces"])
+        self.assertGreater(stats["estimated_bytes"], 1)
@@ -0,0 +1,122 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-web-client SDK Software in commercial settings.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from unittest import TestCase
+
+from neuro_san_web_client.user_session_store import UserSessionStore
+
+
+class TestUserSessionStore(TestCase):
+    """
+    Tests the bounds of the user sessions: their number, their idle time and their estimated memory,
+    and that the sessions with a turn in flight are never evicted
+    """
+
+    def setUp(self):
+        # (sid, session) of the evicted sessions, in order
+        self.evicted: List[Tuple[str, Dict[str, Any]]] = []
+
+    def create_store(self, **kwargs) -> UserSessionStore:
+        """
+        :return: A store recording its evictions, where the sessions with "busy" set have a turn in flight
+        """
+        return UserSessionStore(on_evict=lambda sid, user_session: self.evicted.append((sid, user_session)),
+                                is_busy=lambda user_session: user_session["busy"], **kwargs)
+
+    @staticmethod
+    def make_idle(store: UserSessionStore, sid: str, seconds: float):
+        """
+        Moves the last access of a session back in time
+        """
+        store.last_access[sid] -= seconds
+
+    def test_lru_eviction_at_max_sessions(self):
+        """
+        Adding a session beyond max_sessions evicts the least recently used one
+        """
+        store = self.create_store(max_sessions=2)
+        first = store.set_default("first", {"busy": False})
+        store.set_default("second", {"busy": False})
+        self.assertIs(first, store.get("first"))
+        # An existing session is kept
+        self.assertIs(first, store.set_default("first", {"busy": False}))
+
+        store.set_default("third", {"busy": False})
+        self.assertEqual(["second"], [sid for sid, _ in self.evicted])
+        self.assertIsNone(store.get("second"))
+        self.assertEqual(2, len(store))
+        self.assertEqual(1, store.get_stats()["evicted_sessions"])
+
+    def test_idle_sweep(self):
+        """
+        The sweeper evicts the sessions idle for more than idle_timeout_in_seconds
+        """
+        store = self.create_store(idle_timeout_in_seconds=60)
+        store.set_default("idle", {"busy": False})
+        store.set_default("active", {"busy": False})
+        self.make_idle(store, "idle", 120)
+
+        store.sweep()
+        self.assertEqual(["idle"], [sid for sid, _ in self.evicted])
+        self.assertIsNone(store.get("idle"))
+        self.assertIsNotNone(store.get("active"))
+
+    def test_eviction_by_max_total_bytes(self):
+        """
+        The sweeper evicts the least recently used sessions while their estimated memory exceeds max_total_bytes
+        """
+        store = self.create_store(max_total_bytes=1000)
+        for sid in ("first", "second", "third"):
+            store.set_default(sid, {"busy": False})
+            store.record_size(sid, 400)
+        # Sizes are only recorded for the sessions in the store
+        store.record_size("unknown", 10000)
+        self.assertEqual(1200, store.get_stats()["estimated_bytes"])
+
+        store.sweep()
+        self.assertEqual(["first"], [sid for sid, _ in self.evicted])
+        self.assertEqual(800, store.get_stats()["estimated_bytes"])
+
+    def test_busy_sessions_never_evicted(self):
+        """
+        The sessions with a turn in flight stay, whatever the bounds, until their turn ends
+        """
+        store = self.create_store(max_sessions=1, idle_timeout_in_seconds=60, max_total_bytes=1000)
+        busy = store.set_default("busy", {"busy": True})
+        store.record_size("busy", 10000)
+        self.make_idle(store, "busy", 120)
+        store.set_default("other", {"busy": False})
+        store.sweep()
+        self.assertEqual(["other"], [sid for sid, _ in self.evicted])
+        self.assertIs(busy, store.get("busy"))
+
+        # Once its turn ended, it is evicted like the others
+        busy["busy"] = False
+        store.set_default("new", {"busy": False})
+        self.assertEqual(["other", "busy"], [sid for sid, _ in self.evicted])
+
+    def test_on_evict(self):
+        """
+        on_evict gets the sid and the session of each evicted session, but not of the sessions popped by a disconnect
+        """
+        store = self.create_store(max_sessions=1)
+        first = store.set_default("first", {"busy": False})
+        store.set_default("second", {"busy": False})
+        self.assertEqual([("first", first)], self.evicted)
+
+        self.assertIsNotNone(store.pop("second"))
+        self.assertIsNone(store.pop("second"))
+        self.assertEqual([("first", first)], self.evicted)
+        self.assertEqual(0, len(store))